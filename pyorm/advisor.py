@@ -0,0 +1,398 @@
+import collections
+import threading
+
+from pyorm.cache import QueryCache
+from pyorm.join import JoinPlanner
+from pyorm.schema import IndexDef
+from pyorm.token import *
+
+
+# Comparisons an index can be searched with, either for a single value, or
+# for a range of values.
+EQUALITY_OPS = (OP_EQ, OP_NULLEQ)
+RANGE_OPS = (OP_LT, OP_LE, OP_GE, OP_GT, OP_SW, OP_BT)
+
+# The columns of a model's own table used by a query (see access()), by their
+# names in the database.  `order` holds (column, descending) pairs.
+Access = collections.namedtuple(
+    'Access', ('model', 'table', 'equality', 'range', 'order', 'group'))
+
+
+def items(container):
+    return [token.value for token in container._tokens if token.type != T_OPR]
+
+
+def local_column(model, value):
+    """
+        Returns the database name of the column if `value` is a column on the
+        model's own table, otherwise None.
+    """
+    if getattr(value, 'token_type', None) != T_COL or len(value._path) != 1:
+        return None
+
+    field = vars(model.c).get(value._path[0])
+    return field.trans_name if field is not None else None
+
+
+def access(model):
+    """
+        Returns the Access for the model's query, found from its filters
+        (including Meta.auto_filters), ordering and grouping.  Only filters
+        comparing a column of the model's own table to a value are counted,
+        since those are the only ones an index on the table can be searched
+        with.
+    """
+    equality, ranges, order, group = [], [], [], []
+
+    for expression in JoinPlanner(model).conjuncts():
+        tokens = [token for token in getattr(expression, 'tokens', ())
+                  if token.type != T_OPR or token.value not in (OP_OPAR, OP_CPAR)]
+
+        if len(tokens) != 3 or tokens[1].type != T_OPR:
+            continue
+
+        column = local_column(model, tokens[0].value)
+        if column is None or tokens[2].type == T_COL:
+            continue
+
+        if tokens[1].value in EQUALITY_OPS and column not in equality:
+            equality.append(column)
+        elif tokens[1].value in RANGE_OPS and column not in ranges:
+            ranges.append(column)
+
+    for item in items(model._order):
+        descending = False
+        if getattr(item, 'token_type', None) == T_EXP and \
+                item.op in (OP_ASC, OP_DESC) and len(item._tokens) == 1:
+            descending = item.op == OP_DESC
+            item = item._tokens[0].value
+
+        column = local_column(model, item)
+        if column is None:
+            break
+        order.append((column, descending))
+
+    for item in items(model._group):
+        column = local_column(model, item)
+        if column is None:
+            break
+        group.append(column)
+
+    return Access(type(model), model.Meta.db_table, tuple(equality),
+                  tuple(ranges), tuple(order), tuple(group))
+
+
+def candidate(access):
+    """
+        Returns the columns of the index best suited to the query: the
+        columns compared for equality, followed by the first column compared
+        against a range, or otherwise the columns it is ordered (or grouped)
+        by.
+    """
+    columns = list(access.equality)
+
+    if access.range:
+        columns.append(access.range[0])
+    elif access.order and len(set(desc for column, desc in access.order)) == 1:
+        columns.extend(column for column, desc in access.order
+                       if column not in columns)
+    elif access.group:
+        columns.extend(column for column in access.group if column not in columns)
+
+    return tuple(columns)
+
+
+def serves(columns, access):
+    """
+        Returns how many of the index's leading columns can be used by the
+        query, 0 meaning the index is no use to it.
+    """
+    wanted = candidate(access)
+    used = 0
+
+    while used < len(columns) and columns[used] in access.equality:
+        used += 1
+
+    if used < len(access.equality):
+        # The index can only be searched by the equality columns leading it,
+        # the columns after the first one the query doesn't compare are no use.
+        return used
+
+    if used < len(columns) and used < len(wanted) and columns[used] == wanted[used]:
+        used += 1
+
+    return used
+
+
+def declared_indexes(model):
+    """
+        Returns the IndexDefs declared on the model (a class or an instance),
+        including the primary key (named `PRIMARY`), with the database names
+        of their columns.
+    """
+    instance = model() if isinstance(model, type) else model
+    names = dict((field.name, field.trans_name) for field in vars(instance.c).values())
+    primary_key = type(instance)._primary_key
+    indexes = []
+
+    if primary_key:
+        indexes.append(IndexDef('PRIMARY', tuple(
+            names.get(name, name) for name in primary_key), True))
+
+    for name in instance.Indexes._unbound:
+        index = getattr(instance.Indexes, name)
+        if not index.primary:
+            indexes.append(IndexDef(index.name, tuple(
+                names.get(field, field) for field in index.fields), index.unique))
+
+    return indexes
+
+
+def used_columns(model):
+    """
+        Returns the database names of the columns of the model's own table
+        used anywhere in its query (fields, filters, ordering, grouping and
+        having), including the primary key, or None if the query uses a column
+        of another table.
+    """
+    names = dict((field.name, field.trans_name) for field in vars(model.c).values())
+    used = set(names[name] for name in type(model)._primary_key if name in names)
+
+    values = JoinPlanner(model).conjuncts()
+    for container in (model._fields, model._compound_fields, model._order,
+                      model._group, model._having):
+        values.extend(items(container))
+
+    for value in values:
+        if getattr(value, 'token_type', None) == T_COL:
+            tokens = [Token(T_COL, value)]
+        else:
+            tokens = getattr(value, 'tokens', ())
+
+        for token in tokens:
+            if token.type != T_COL:
+                continue
+
+            column = local_column(model, token.value)
+            if column is None:
+                return None
+            used.add(column)
+
+    return used
+
+
+def covering_index(model, includes_primary_key=True):
+    """
+        Returns the IndexDef of the declared index holding every column the
+        model's query uses (see used_columns()), so that the query can be
+        answered from the index alone, without reading the table's rows.
+        `includes_primary_key` is set for servers whose indexes hold the
+        primary key of each row as well (SQLite and InnoDB).
+
+        Where several indexes cover the query, the one whose leading columns
+        the query can search with (see serves()) is preferred, then the
+        narrowest.
+    """
+    used = used_columns(model)
+    if not used:
+        return None
+
+    primary_key = set()
+    if includes_primary_key:
+        names = dict((field.name, field.trans_name) for field in vars(model.c).values())
+        primary_key = set(names.get(name, name) for name in type(model)._primary_key)
+
+    indexes = [index for index in declared_indexes(model) if index.name != 'PRIMARY'
+               and used.issubset(primary_key.union(index.columns))]
+    if not indexes:
+        return None
+
+    pattern = access(model)
+    return max(indexes, key=lambda index: (
+        serves(index.columns, pattern), -len(index.columns)))
+
+
+class IndexAdvisor(object):
+    """
+        Records how the queries run through a session search their tables
+        (the columns compared in their filters, and the columns they are
+        ordered and grouped by, see access()), grouped by the fingerprint of
+        their sql like QueryStats, and compares them with the indexes
+        declared on each model:
+            advisor = session.enable_advisor()
+            ...
+            advisor.suggestions()
+
+        Missing indexes are ranked by the time spent running the queries they
+        would serve, which is an upper bound on the time they would save.
+        Unused indexes are declared indexes (other than primary and unique
+        keys, which are constraints as well) that none of the recorded
+        queries could use, ranked by the number of writes to their table,
+        each of which has to update the index.
+
+        The first sql and literals recorded for each query are kept, unless
+        `redact` is set, so that the plan the database uses for them can be
+        checked (see IndexAdvisor.explain()).
+    """
+    def __init__(self, redact=False):
+        self.redact = redact
+        self._queries = {}
+        self._writes = collections.Counter()
+        self._lock = threading.Lock()
+
+    def __call__(self, event):
+        if event.sql is None:
+            return
+
+        pattern = event.access
+
+        if pattern is None:
+            match = QueryCache.write_pattern.match(event.sql)
+            if match is not None:
+                with self._lock:
+                    self._writes[match.group(2)] += max(event.rows, 1)
+            return
+
+        key = event.fingerprint
+
+        with self._lock:
+            query = self._queries.get(key)
+
+            if query is None:
+                query = self._queries[key] = {
+                    'access': pattern,
+                    'sql': event.sql,
+                    'literals': None if self.redact else tuple(event.literals),
+                    'calls': 0,
+                    'time': 0.0}
+
+            query['calls'] += 1
+            query['time'] += event.elapsed
+
+    def __len__(self):
+        return len(self._queries)
+
+    def reset(self):
+        with self._lock:
+            self._queries = {}
+            self._writes = collections.Counter()
+
+    def missing(self):
+        """
+            Returns a suggested index for each set of queries that none of
+            the model's declared indexes serve fully, the most beneficial
+            first.
+        """
+        with self._lock:
+            queries = list(self._queries.items())
+
+        suggestions = collections.OrderedDict()
+        declared = {}
+
+        for key, query in queries:
+            pattern = query['access']
+            columns = candidate(pattern)
+            if not columns:
+                continue
+
+            if pattern.model not in declared:
+                declared[pattern.model] = declared_indexes(pattern.model)
+
+            best = max([serves(index.columns, pattern)
+                        for index in declared[pattern.model]] or [0])
+            if best >= len(columns):
+                continue
+
+            suggestion = suggestions.get((pattern.model, columns))
+            if suggestion is None:
+                suggestion = suggestions[(pattern.model, columns)] = {
+                    'model': pattern.model.__name__,
+                    'table': pattern.table,
+                    'columns': columns,
+                    'index': '{0} = Index({1})'.format(
+                        '_'.join(columns), ', '.join(repr(str(column))
+                                                     for column in columns)),
+                    'queries': [],
+                    'calls': 0,
+                    'benefit': 0.0}
+
+            suggestion['queries'].append(key)
+            suggestion['calls'] += query['calls']
+            suggestion['benefit'] += query['time']
+
+        return sorted(suggestions.values(), key=lambda suggestion: (
+            -suggestion['benefit'], -suggestion['calls']))
+
+    def unused(self, models):
+        """
+            Returns the declared indexes on `models` that none of the recorded
+            queries could use, those on the most written tables first.
+        """
+        with self._lock:
+            patterns = [query['access'] for query in self._queries.values()]
+            writes = dict(self._writes)
+
+        suggestions = []
+
+        for model in models:
+            table = model().Meta.db_table
+
+            for index in declared_indexes(model):
+                if index.unique:
+                    continue
+
+                if any(serves(index.columns, pattern) for pattern in patterns
+                       if pattern.model is model):
+                    continue
+
+                suggestions.append({
+                    'model': model.__name__,
+                    'table': table,
+                    'index': index.name,
+                    'columns': index.columns,
+                    'writes': writes.get(table, 0)})
+
+        return sorted(suggestions, key=lambda suggestion: (
+            -suggestion['writes'], -len(suggestion['columns'])))
+
+    def suggestions(self, models=None):
+        """
+            Returns the missing and unused index suggestions, for `models`
+            (or the models of the recorded queries).
+        """
+        if models is None:
+            with self._lock:
+                models = set(query['access'].model for query in self._queries.values())
+            models = sorted(models, key=lambda model: model.__name__)
+
+        return {'missing': self.missing(), 'unused': self.unused(models)}
+
+    def explain(self, session, suggestion, server=None):
+        """
+            Returns the plan the database uses for each query behind a missing
+            index suggestion (by fingerprint), so the change in the plan can
+            be checked once the index is added.  Queries recorded with
+            `redact` set are left out.
+        """
+        plans = {}
+
+        for key in suggestion['queries']:
+            query = self._queries.get(key)
+            if query is None or query['literals'] is None:
+                continue
+
+            name = server or session.read_server(query['access'].model())
+            sql = session.dialect(name).explain(query['sql'])
+            connection = session.checkout(name)
+
+            try:
+                cursor = connection.cursor()
+                try:
+                    cursor.execute(sql, list(query['literals']))
+                    plans[key] = [tuple(row) for row in cursor.fetchall()]
+                finally:
+                    cursor.close()
+            finally:
+                session.release(name, connection)
+
+        return plans
@@ -0,0 +1,190 @@
+import binascii
+import collections
+import hashlib
+import os
+import re
+import threading
+import time
+
+
+class CacheBackend(object):
+    """
+        Interface for the storage used by QueryCache.  Any object with these
+        methods can be used, so a memcached client can be used directly.
+    """
+    def get(self, key):
+        """
+            Returns the value stored for `key`, or None if there isn't one.
+        """
+        raise NotImplementedError()
+
+    def set(self, key, value, ttl=0):
+        """
+            Stores `value` for `ttl` seconds (forever if 0).
+        """
+        raise NotImplementedError()
+
+    def delete(self, key):
+        raise NotImplementedError()
+
+
+class LRUCache(CacheBackend):
+    """
+        Thread-safe in-process cache backend, holding up to `max_size` values,
+        dropping the least recently used values first.
+    """
+    def __init__(self, max_size=1000):
+        self.max_size = max_size
+        self._values = collections.OrderedDict()
+        self._lock = threading.Lock()
+
+    def __len__(self):
+        return len(self._values)
+
+    def get(self, key):
+        with self._lock:
+            try:
+                value, expires = self._values.pop(key)
+            except KeyError:
+                return None
+
+            if expires and expires <= time.time():
+                return None
+
+            self._values[key] = (value, expires)
+            return value
+
+    def set(self, key, value, ttl=0):
+        with self._lock:
+            self._values.pop(key, None)
+            self._values[key] = (value, time.time() + ttl if ttl else 0)
+
+            while len(self._values) > self.max_size:
+                self._values.popitem(last=False)
+
+    def delete(self, key):
+        with self._lock:
+            self._values.pop(key, None)
+
+
+# Shared by every session that doesn't have a backend configured, so that
+# they share cached results (and invalidations).
+default_backend = LRUCache()
+
+
+def new_generation():
+    """
+        Returns a random id for a table's generation.  The uuid module isn't
+        used for this, since importing it pulls in ctypes, which takes longer
+        than importing the rest of the package.
+    """
+    return binascii.hexlify(os.urandom(16))
+
+
+class QueryCache(object):
+    """
+        Caches query results, keyed by the sql and literals of the query.
+
+        Each table has a generation stored in the backend, which is
+        part of the key of every query reading from the table.  Writing to a
+        table bumps its generation, so the results cached for every query
+        reading from it are never looked up again (and eventually drop out
+        of the backend), without having to keep track of which queries read
+        from which tables.
+
+        Since the backend is shared between sessions, a table written to in
+        a session's open transaction is marked as pending (see
+        QueryCache.pending()), so that no session caches the results of
+        queries reading from it, and its generation is bumped again once the
+        transaction is committed or rolled back, dropping anything cached
+        from before the writes were visible.
+    """
+    # Matches the table written to by INSERT, UPDATE, DELETE, REPLACE and
+    # TRUNCATE statements.
+    write_pattern = re.compile(
+        r'^\s*(?:INSERT(?:\s+OR\s+\w+|\s+IGNORE)?\s+INTO|REPLACE\s+INTO|UPDATE|DELETE\s+FROM|'
+        r'TRUNCATE(?:\s+TABLE)?)\s+([`"\[]?)([^\s`"\]\(]+)', re.IGNORECASE)
+
+    # Marks the generation of a table with uncommitted writes.
+    pending_marker = 'pending:'
+
+    # How long a table is treated as having uncommitted writes, in case the
+    # session writing to it never commits or rolls back.
+    pending_ttl = 300
+
+    def __init__(self, backend=None, prefix='pyorm'):
+        self.backend = backend if backend is not None else default_backend
+        self.prefix = prefix
+        self.hits = 0
+        self.misses = 0
+
+    def generation(self, table):
+        key = '{0}:table:{1}'.format(self.prefix, table)
+        generation = self.backend.get(key)
+
+        # If the backend lost the generation, a new one needs to be started,
+        # otherwise results cached before the last write could be used again.
+        if generation is None:
+            generation = new_generation()
+            self.backend.set(key, generation)
+
+        return generation
+
+    def invalidate(self, *tables):
+        """
+            Drops the cached results for every query reading from the tables.
+        """
+        for table in tables:
+            # A random value is used rather than a counter, so that
+            # generations don't repeat if the backend loses the current one.
+            self.backend.set('{0}:table:{1}'.format(self.prefix, table),
+                             new_generation())
+
+    def pending(self, *tables):
+        """
+            Drops the cached results for every query reading from the tables,
+            and stops the results of those queries from being cached until
+            QueryCache.invalidate() is called for the tables, once the writes
+            to them have been committed or rolled back.
+        """
+        for table in tables:
+            self.backend.set('{0}:table:{1}'.format(self.prefix, table),
+                             self.pending_marker + new_generation(),
+                             self.pending_ttl)
+
+    def key(self, server, tables, sql, literals):
+        """
+            Returns the key the results of the query are cached under, or
+            None if one of the tables it reads from has uncommitted writes,
+            in which case the results shouldn't be cached.
+        """
+        generations = [(table, self.generation(table)) for table in sorted(tables)]
+        if any(generation.startswith(self.pending_marker)
+               for table, generation in generations):
+            return None
+
+        digest = hashlib.sha1(repr(
+            (server, sql, list(literals), generations)).encode('utf-8')).hexdigest()
+
+        return '{0}:query:{1}'.format(self.prefix, digest)
+
+    def get(self, key):
+        value = self.backend.get(key)
+
+        if value is None:
+            self.misses += 1
+        else:
+            self.hits += 1
+
+        return value
+
+    def set(self, key, value, ttl):
+        self.backend.set(key, value, ttl)
+
+    def written_table(self, sql):
+        """
+            Returns the table written to by the statement, or None if the
+            statement doesn't write to a table.
+        """
+        match = self.write_pattern.match(sql)
+        return match.group(2) if match else None
@@ -34,6 +34,9 @@ class Column(object):
                 Expression(
                     Expression(Column.field, 4, op=OP_MUL),
                     Column.field2, op=OP_EQ)
+
+        Negating a column marks it as descending when used in Model.order():
+            SampleModel.order(-Column.field)
     """
 
     __slots__ = (
@@ -67,15 +70,18 @@ class Column(object):
 
         self._alias = None
         self._scope = scope
+        self._owner = None
+        self._owner_ref = None
 
     def __copy__(self):
-        instance = self.__class__(self._path[:], scope=self.scope)
+        instance = self.__class__(self._path[:], scope=self._scope)
         instance._owner = self._owner
+        instance._owner_ref = self._owner_ref
         instance._alias = self._alias
 
         return instance
 
-    def __deepcopy__(self):
+    def __deepcopy__(self, memo):
         instance = self.__copy__()
         memo[id(self)] = instance
         return instance
@@ -137,6 +143,12 @@ class Column(object):
     def __rpow__(self, other):
         return Expression(other, self, op=OP_POW)
 
+    def __pos__(self):
+        return Expression(self, op=OP_ASC)
+
+    def __neg__(self):
+        return Expression(self, op=OP_DESC)
+
     def __ne__(self, other):
         if other is None:
             return Equation(self, other, op=OP_NULLNE)
@@ -178,7 +190,8 @@ class Column(object):
         return Expression(self, other, op=OP_GT)
 
     def __hash__(self):
-        return hash(tuple(self._path + [self._alias, self._scope, self._owner_ref()]))
+        owner = self._owner_ref() if self._owner_ref is not None else None
+        return hash(tuple(self._path + [self._alias, self._scope, owner]))
 
     def set_alias(self, alias):
         self._alias = alias
@@ -0,0 +1,824 @@
+import collections
+import re
+
+from pyorm.advisor import covering_index
+from pyorm.join import JoinPlanner
+from pyorm.schema import ColumnDef, IndexDef, TableDef
+from pyorm.token import *
+
+
+class Dialect(object):
+    """
+        Converts the tokens stored on a model (fields, filters, ordering, etc.)
+        into a sql statement and the list of literals to be passed to the
+        database along with it.
+
+        Subclasses only need to override the bits of syntax that differ
+        between databases (identifier quoting, parameter placeholders, etc.).
+    """
+    quote_char = '"'
+    placeholder = '?'
+
+    # Prefixed to a query to get the plan the database uses for it.
+    explain_prefix = 'EXPLAIN QUERY PLAN'
+
+    # Added after the model's table to have a query read from the index
+    # covering it (see Dialect.covering_index()), None for servers which
+    # don't take index hints.
+    index_hint = 'INDEXED BY {0}'
+
+    # Whether every index holds the primary key of its rows, which an index
+    # then covers without declaring it.
+    index_includes_primary_key = True
+
+    # Used as the LIMIT when only an offset is given, since not every database
+    # accepts OFFSET on its own.
+    no_limit = '-1'
+
+    ops = {
+        OP_ADD: '+',
+        OP_SUB: '-',
+        OP_MUL: '*',
+        OP_DIV: '/',
+        OP_MOD: '%',
+        OP_POW: '^',
+        OP_AND: 'AND',
+        OP_OR: 'OR',
+        OP_NE: '!=',
+        OP_LT: '<',
+        OP_LE: '<=',
+        OP_EQ: '=',
+        OP_GE: '>=',
+        OP_GT: '>',
+        OP_NULLNE: 'IS NOT',
+        OP_NULLEQ: 'IS',
+        OP_OPAR: '(',
+        OP_CPAR: ')',
+        OP_COMMA: ','}
+
+    joins = {
+        'inner': 'INNER JOIN',
+        'left': 'LEFT JOIN',
+        'right': 'RIGHT JOIN',
+        'outer': 'FULL OUTER JOIN'}
+
+    # The statement used for each kind of insert (see Model.insert() and
+    # Model.replace()).
+    inserts = {
+        'insert': 'INSERT INTO',
+        'ignore': 'INSERT OR IGNORE INTO',
+        'replace': 'INSERT OR REPLACE INTO'}
+
+    # The column type used for each kind of field (see Dialect.column_type()),
+    # found using the name of the field's class (or the closest base class).
+    column_types = {
+        'Integer': 'INTEGER',
+        'Decimal': 'DECIMAL({precision},{scale})',
+        'Char': 'VARCHAR({length})',
+        'Timestamp': 'TIMESTAMP',
+        'Field': 'TEXT'}
+
+    # Whether an autoincrementing primary key is declared on the column itself
+    # (see Dialect.column_definition()), rather than after the columns.
+    inline_primary_key = True
+
+    # Lists (table, column, type, nullable, primary, autoincrement) for every
+    # column of every table, and (table, index, column, unique) for every
+    # column of every index other than the primary key, used by
+    # Dialect.introspect().
+    schema_columns = (
+        "SELECT m.name, p.name, p.type, NOT p.\"notnull\", p.pk > 0, "
+        "p.pk = 1 AND upper(p.type) = 'INTEGER' AND (SELECT count(*) FROM "
+        "pragma_table_info(m.name) WHERE pk > 0) = 1 "
+        "FROM sqlite_master m JOIN pragma_table_info(m.name) p "
+        "WHERE m.type = 'table' AND m.name NOT LIKE 'sqlite_%' "
+        "ORDER BY m.name, p.cid")
+    schema_indexes = (
+        "SELECT m.name, l.name, i.name, l.\"unique\" "
+        "FROM sqlite_master m JOIN pragma_index_list(m.name) l "
+        "JOIN pragma_index_info(l.name) i "
+        "WHERE m.type = 'table' AND m.name NOT LIKE 'sqlite_%' AND l.origin = 'c' "
+        "ORDER BY m.name, l.name, i.seqno")
+
+    def quote(self, name):
+        return '{0}{1}{0}'.format(
+            self.quote_char, name.replace(self.quote_char, self.quote_char * 2))
+
+    def trans_name(self, name):
+        """
+            Strips the trailing `_` used to avoid conflicts between field names
+            and the methods on the model.
+        """
+        return name[:-1] if name[-1] == '_' else name
+
+    def alias(self, model, path):
+        """
+            Returns the quoted alias used for the table at the end of the
+            relationship path passed (the model's table for an empty path).
+        """
+        if not path:
+            return self.quote(model.Meta.db_table)
+
+        return self.quote('___'.join(path))
+
+    def column(self, model, column, prefix=()):
+        """
+            Returns the qualified name of a column.  The path of the column is
+            taken to be relative to the relationship path in `prefix`.
+        """
+        path = tuple(prefix) + tuple(column._path)
+
+        return '{0}.{1}'.format(
+            self.alias(model, path[:-1]), self.quote(self.trans_name(path[-1])))
+
+    def join_sql(self, parts):
+        """
+            Joins sql fragments with spaces, except directly inside of
+            parenthesis or before a comma.
+        """
+        sql = ''
+        for part in parts:
+            if sql and not sql.endswith('(') and part not in (')', ','):
+                sql += ' '
+            sql += part
+
+        return sql
+
+    def expression(self, model, value, prefix=()):
+        """
+            Compiles a column, expression or literal to sql, returning the sql
+            and the literals it references.
+
+            Equalities against a list of values are compiled to `IN (...)`, and
+            comparisons against None are compiled to `IS NULL`/`IS NOT NULL`.
+        """
+        token_type = getattr(value, 'token_type', None)
+
+        if token_type == T_COL:
+            return self.column(model, value, prefix), []
+        elif token_type is None:
+            return self.placeholder, [value]
+
+        tokens = value.tokens
+        parts = []
+        literals = []
+
+        for idx, token in enumerate(tokens):
+            if token.type == T_OPR:
+                following = tokens[idx + 1] if idx + 1 < len(tokens) else None
+
+                if token.value in (OP_EQ, OP_NE) and following is not None and \
+                        following.type == T_LIT and \
+                        isinstance(following.value, (list, tuple, set, frozenset)):
+                    parts.append('IN' if token.value == OP_EQ else 'NOT IN')
+                else:
+                    parts.append(self.ops[token.value])
+            elif token.type == T_COL:
+                parts.append(self.column(model, token.value, prefix))
+            elif token.type == T_KWD:
+                parts.append(token.value)
+            elif isinstance(token.value, (list, tuple, set, frozenset)):
+                values = list(token.value)
+                parts.append('({0})'.format(
+                    ', '.join([self.placeholder] * len(values)) or 'NULL'))
+                literals.extend(values)
+            elif token.value is None:
+                parts.append('NULL')
+            else:
+                parts.append(self.placeholder)
+                literals.append(token.value)
+
+        return self.join_sql(parts), literals
+
+    def items(self, container):
+        """
+            Returns the top level values stored in a comma/and separated
+            expression (Model._fields, Model._filters, etc.)
+        """
+        return [token.value for token in container._tokens if token.type != T_OPR]
+
+    def conditions(self, model, expressions, prefix=()):
+        sql = []
+        literals = []
+
+        for expression in expressions:
+            expression_sql, expression_literals = self.expression(
+                model, expression, prefix)
+            sql.append(expression_sql)
+            literals.extend(expression_literals)
+
+        return ' AND '.join(sql), literals
+
+    def field(self, model, field):
+        return '{0}.{1} AS {2}'.format(
+            self.alias(model, ()), self.quote(field.trans_name),
+            self.quote(field.name))
+
+    def fields(self, model, covering=None):
+        """
+            Returns the list of (sql, literals) pairs for the columns selected.
+            If no fields have been requested, every field on the model is
+            selected, except for deferred fields.
+
+            If fields have been requested, the primary and unique key fields
+            are selected as well, so that the rows can be updated, and any
+            other fields loaded later on.  Where the query reads from a
+            `covering` index, only the unique keys held by the index are added,
+            so that the query can still be answered from the index alone.
+        """
+        fields = []
+        columns = self.items(model._fields)
+        bound = sorted(vars(model.c).values(), key=lambda field: field.idx)
+
+        if not columns:
+            for field in bound:
+                if not (field.deferred or field.name in model._deferred):
+                    fields.append((self.field(model, field), []))
+
+        for column in columns:
+            sql, literals = self.expression(model, column)
+            fields.append(('{0} AS {1}'.format(
+                sql, self.quote('.'.join(column._path))), literals))
+
+        if columns:
+            selected = set(column._path[0] for column in columns
+                           if len(column._path) == 1)
+            names = dict((field.name, field.trans_name) for field in bound)
+            keys = set(model._primary_key)
+            for unique_key in model._unique_keys:
+                if covering is None or all(names.get(name) in covering.columns
+                                           for name in unique_key):
+                    keys.update(unique_key)
+
+            for field in bound:
+                if field.name in keys and field.name not in selected:
+                    fields.append((self.field(model, field), []))
+
+        for expression in self.items(model._compound_fields):
+            sql, literals = self.expression(model, expression)
+            fields.append(('{0} AS {1}'.format(
+                sql, self.quote(expression.alias)), literals))
+
+        return fields
+
+    def on(self, model, node):
+        """
+            Returns the condition used to join the node to its parent.
+        """
+        relationship = node.relationship
+        prefix = node.path[:-1]
+
+        if relationship.filters:
+            return self.conditions(model, relationship.filters, prefix)
+
+        sql = []
+        for local, remote in relationship.keys:
+            sql.append('{0}.{1} = {2}.{3}'.format(
+                self.alias(model, node.path), self.quote(self.trans_name(remote)),
+                self.alias(model, prefix), self.quote(self.trans_name(local))))
+
+        return ' AND '.join(sql), []
+
+    def table(self, model, node):
+        return '{0} AS {1}'.format(
+            self.quote(node.model.Meta.db_table), self.alias(model, node.path))
+
+    def from_joins(self, model, node):
+        """
+            Returns the joins for every (non semi-join) node below `node`.
+        """
+        sql = []
+        literals = []
+
+        for child in node.children.values():
+            if child.semi:
+                continue
+
+            on_sql, on_literals = self.on(model, child)
+            sql.append('{0} {1} ON {2}'.format(
+                self.joins[child.join], self.table(model, child), on_sql))
+            literals.extend(on_literals)
+
+            child_sql, child_literals = self.from_joins(model, child)
+            if child_sql:
+                sql.append(child_sql)
+                literals.extend(child_literals)
+
+        return ' '.join(sql), literals
+
+    def exists(self, model, node):
+        """
+            Returns the `EXISTS (...)` subquery for a semi-join node.
+        """
+        sql = 'SELECT 1 FROM {0}'.format(self.table(model, node))
+        literals = []
+
+        joins_sql, joins_literals = self.from_joins(model, node)
+        if joins_sql:
+            sql = '{0} {1}'.format(sql, joins_sql)
+            literals.extend(joins_literals)
+
+        on_sql, on_literals = self.on(model, node)
+        where_sql, where_literals = self.conditions(model, node.filters)
+        literals.extend(on_literals + where_literals)
+
+        where = [part for part in (on_sql, where_sql) if part]
+        return 'EXISTS ({0} WHERE {1})'.format(sql, ' AND '.join(where)), literals
+
+    def semi_joins(self, node):
+        """
+            Returns the semi-join nodes which are reachable from `node`
+            through regular joins.
+        """
+        for child in node.children.values():
+            if child.semi:
+                yield child
+            else:
+                for semi_join in self.semi_joins(child):
+                    yield semi_join
+
+    def where(self, model, root):
+        sql, literals = self.conditions(model, root.filters)
+        sql = [sql] if sql else []
+
+        for node in self.semi_joins(root):
+            exists_sql, exists_literals = self.exists(model, node)
+            sql.append(exists_sql)
+            literals.extend(exists_literals)
+
+        return ' AND '.join(sql), literals
+
+    def covering_index(self, model, live_indexes=None):
+        """
+            Returns the IndexDef of the declared index covering the model's
+            query (see pyorm.advisor.covering_index()), if index hints are
+            enabled for the query (see Model.index_hints()) and it requests
+            specific fields, otherwise None.
+
+            A hint naming an index the server doesn't have fails the query, so
+            when `live_indexes` is given (a function returning the names of the
+            indexes on a table, such as SchemaCache.indexes()), the index is
+            only returned if it exists.
+        """
+        enabled = model._index_hints
+        if enabled is None:
+            enabled = model.Meta.index_hints
+
+        if not enabled or not self.items(model._fields):
+            return None
+
+        covering = covering_index(model, self.index_includes_primary_key)
+        if covering is not None and live_indexes is not None:
+            # Indexes are created as `<table>_<name>`, see pyorm.schema.declared().
+            name = '{0}_{1}'.format(model.Meta.db_table, covering.name)
+            if name not in live_indexes(model.Meta.db_table):
+                return None
+
+        return covering
+
+    def select(self, model, live_indexes=None):
+        """
+            Returns the select statement for the model, along with the
+            literals that need to be passed to the database with it.
+            `live_indexes` is used to check that the index covering the query
+            exists before naming it (see Dialect.covering_index()).
+        """
+        root = JoinPlanner(model).plan()
+        literals = []
+
+        covering = self.covering_index(model, live_indexes)
+        table = self.alias(model, ())
+        if covering is not None and self.index_hint is not None:
+            # Indexes are created as `<table>_<name>`, see pyorm.schema.declared().
+            table = '{0} {1}'.format(table, self.index_hint.format(self.quote(
+                '{0}_{1}'.format(model.Meta.db_table, covering.name))))
+
+        fields = self.fields(model, covering)
+        sql = 'SELECT {0} FROM {1}'.format(
+            ', '.join(field_sql for field_sql, field_literals in fields), table)
+        for field_sql, field_literals in fields:
+            literals.extend(field_literals)
+
+        clauses = [
+            ('', self.from_joins(model, root)),
+            ('WHERE ', self.where(model, root)),
+            ('GROUP BY ', self.list(model, model._group)),
+            ('HAVING ', self.conditions(model, self.items(model._having))),
+            ('ORDER BY ', self.order(model)),
+            ('LIMIT ', self.limit(model))]
+
+        for keyword, (clause_sql, clause_literals) in clauses:
+            if clause_sql:
+                sql = '{0} {1}{2}'.format(sql, keyword, clause_sql)
+                literals.extend(clause_literals)
+
+        return sql, literals
+
+    def bounds(self, model, column):
+        """
+            Returns the statement used to find the lowest and highest values
+            of `column` in the rows matching the model's filters.
+        """
+        root = JoinPlanner(model).plan()
+        column_sql = self.column(model, column)
+        sql = 'SELECT MIN({0}), MAX({0}) FROM {1}'.format(
+            column_sql, self.alias(model, ()))
+        literals = []
+
+        clauses = [
+            ('', self.from_joins(model, root)),
+            ('WHERE ', self.where(model, root))]
+
+        for keyword, (clause_sql, clause_literals) in clauses:
+            if clause_sql:
+                sql = '{0} {1}{2}'.format(sql, keyword, clause_sql)
+                literals.extend(clause_literals)
+
+        return sql, literals
+
+    def insert(self, table, columns, action='insert'):
+        """
+            Returns the statement inserting a row into `table`, taking one
+            literal per column.
+        """
+        if action not in self.inserts:
+            raise Exception('{0} does not support `{1}` inserts.'.format(
+                type(self).__name__, action))
+
+        return '{0} {1} ({2}) VALUES ({3})'.format(
+            self.inserts[action], self.quote(table),
+            ', '.join(self.quote(column) for column in columns),
+            ', '.join([self.placeholder] * len(columns)))
+
+    def update(self, table, columns, keys):
+        """
+            Returns the statement setting `columns` on the row of `table`
+            matching `keys`, taking the literals for the columns followed by
+            the literals for the keys.
+        """
+        return 'UPDATE {0} SET {1} WHERE {2}'.format(
+            self.quote(table),
+            ', '.join('{0} = {1}'.format(self.quote(column), self.placeholder)
+                      for column in columns),
+            self.key_conditions(keys))
+
+    def delete(self, table, keys):
+        """
+            Returns the statement deleting the row of `table` matching `keys`.
+        """
+        return 'DELETE FROM {0} WHERE {1}'.format(
+            self.quote(table), self.key_conditions(keys))
+
+    def truncate(self, table):
+        """
+            Returns the statement deleting every row of `table`.  SQLite has
+            no TRUNCATE, but runs a DELETE without conditions the same way.
+        """
+        return 'DELETE FROM {0}'.format(self.quote(table))
+
+    def key_conditions(self, keys):
+        return ' AND '.join('{0} = {1}'.format(self.quote(key), self.placeholder)
+                            for key in keys)
+
+    def explain(self, sql):
+        return '{0} {1}'.format(self.explain_prefix, sql)
+
+    def column_type(self, field):
+        """
+            Returns the column type for the field, leaving out the size if
+            the field doesn't set it.
+        """
+        for cls in type(field).__mro__:
+            if cls.__name__ in self.column_types:
+                template = self.column_types[cls.__name__]
+                break
+
+        params = re.findall(r'{(\w+)}', template)
+        if [param for param in params if getattr(field, param, None) is None]:
+            column_type = template.split('(')[0]
+        else:
+            column_type = template.format(
+                **dict((param, getattr(field, param)) for param in params))
+
+        if getattr(field, 'unsigned', False):
+            column_type = self.unsigned(column_type)
+
+        return column_type
+
+    def unsigned(self, column_type):
+        return column_type
+
+    def normalize_type(self, column_type):
+        """
+            Returns the column type in the form used to compare the type of
+            a live column to the type of a field.
+        """
+        column_type = ' '.join(column_type.upper().split())
+        return re.sub(r'\s*\)', ')', re.sub(r'\s*([(,])\s*', r'\1', column_type))
+
+    def default(self, value):
+        if isinstance(value, basestring):
+            return "'{0}'".format(value.replace("'", "''"))
+        return str(value)
+
+    def column_definition(self, column, primary=False):
+        """
+            Returns the column's definition for CREATE TABLE and ALTER TABLE,
+            `primary` is set when the column is the table's only primary key
+            column.
+        """
+        sql = '{0} {1}'.format(self.quote(column.name), column.type)
+
+        if not column.null:
+            sql += ' NOT NULL'
+
+        # An INTEGER PRIMARY KEY column is an alias for the rowid, which
+        # autoincrements.
+        if primary and column.autoincrement:
+            sql += ' PRIMARY KEY'
+        elif column.default is not None:
+            sql += ' DEFAULT {0}'.format(self.default(column.default))
+
+        return sql
+
+    def create_table(self, table):
+        """
+            Returns the CREATE TABLE statement for the table (a
+            pyorm.schema.TableDef), not including its indexes.
+        """
+        single = len(table.primary_key) == 1
+        definitions = [
+            self.column_definition(column, single and column.name in table.primary_key)
+            for column in table.columns.values()]
+
+        inline = single and table.columns[table.primary_key[0]].autoincrement
+        if table.primary_key and not (inline and self.inline_primary_key):
+            definitions.append('PRIMARY KEY ({0})'.format(
+                ', '.join(self.quote(column) for column in table.primary_key)))
+
+        return 'CREATE TABLE {0} ({1})'.format(
+            self.quote(table.name), ', '.join(definitions))
+
+    def create_index(self, table, index):
+        return 'CREATE {0}INDEX {1} ON {2} ({3})'.format(
+            'UNIQUE ' if index.unique else '', self.quote(index.name),
+            self.quote(table), ', '.join(self.quote(column) for column in index.columns))
+
+    def drop_index(self, table, index):
+        return 'DROP INDEX {0}'.format(self.quote(index.name))
+
+    def alter_table(self, diff):
+        """
+            Returns the statements making the changes in `diff` (see
+            pyorm.schema.TableDiff) to the live table.  SQLite only allows a
+            single change per ALTER TABLE, and can't change existing columns.
+        """
+        if diff.alter_columns:
+            raise Exception('{0} can not change the columns {1} of `{2}`.'.format(
+                type(self).__name__, ', '.join(
+                    '`{0}`'.format(column.name) for column in diff.alter_columns),
+                diff.table.name))
+
+        table = self.quote(diff.table.name)
+        statements = [self.drop_index(diff.table.name, index)
+                      for index in diff.drop_indexes]
+        statements.extend('ALTER TABLE {0} ADD COLUMN {1}'.format(
+            table, self.column_definition(column)) for column in diff.add_columns)
+        statements.extend('ALTER TABLE {0} DROP COLUMN {1}'.format(
+            table, self.quote(column.name)) for column in diff.drop_columns)
+        statements.extend(self.create_index(diff.table.name, index)
+                          for index in diff.add_indexes)
+
+        return statements
+
+    def introspect(self, run):
+        """
+            Returns the live tables (pyorm.schema.TableDef) by name, `run`
+            being used to run the statements listing them (see
+            Dialect.schema_columns and Dialect.schema_indexes).
+        """
+        tables = collections.OrderedDict()
+
+        for table, name, column_type, null, primary, auto in run(self.schema_columns)[1]:
+            if table not in tables:
+                tables[table] = TableDef(table, collections.OrderedDict(), {}, [])
+
+            tables[table].columns[name] = ColumnDef(
+                name, column_type, bool(null), bool(auto), None)
+            if primary:
+                tables[table].primary_key.append(name)
+
+        for table, name, column, unique in run(self.schema_indexes)[1]:
+            if table in tables:
+                index = tables[table].indexes.get(name)
+                tables[table].indexes[name] = IndexDef(
+                    name, (index.columns if index else ()) + (column,), bool(unique))
+
+        return dict((name, table._replace(primary_key=tuple(table.primary_key)))
+                    for name, table in tables.items())
+
+    def order(self, model):
+        """
+            Returns the ORDER BY list for the model, columns wrapped using
+            `-Column.field` (or `+Column.field`) are sorted descending
+            (or ascending).
+        """
+        sql = []
+        literals = []
+
+        for item in self.items(model._order):
+            direction = None
+            if getattr(item, 'token_type', None) == T_EXP and \
+                    item.op in (OP_ASC, OP_DESC) and len(item._tokens) == 1:
+                direction = 'DESC' if item.op == OP_DESC else 'ASC'
+                item = item._tokens[0].value
+
+            item_sql, item_literals = self.expression(model, item)
+            sql.append(item_sql if direction is None else '{0} {1}'.format(
+                item_sql, direction))
+            literals.extend(item_literals)
+
+        return ', '.join(sql), literals
+
+    def limit(self, model):
+        """
+            Returns the LIMIT/OFFSET clause (without the LIMIT keyword) for
+            a sliced model.
+        """
+        if model._limit is None and not model._offset:
+            return '', []
+
+        if model._limit is None:
+            sql, literals = self.no_limit, []
+        else:
+            sql, literals = self.placeholder, [model._limit]
+
+        if model._offset:
+            sql = '{0} OFFSET {1}'.format(sql, self.placeholder)
+            literals.append(model._offset)
+
+        return sql, literals
+
+    def list(self, model, container):
+        sql = []
+        literals = []
+
+        for item in self.items(container):
+            item_sql, item_literals = self.expression(model, item)
+            sql.append(item_sql)
+            literals.extend(item_literals)
+
+        return ', '.join(sql), literals
+
+
+class SQLiteDialect(Dialect):
+    pass
+
+
+class MySQLDialect(Dialect):
+    quote_char = '`'
+    placeholder = '%s'
+    no_limit = '18446744073709551615'
+    explain_prefix = 'EXPLAIN'
+    index_hint = 'USE INDEX ({0})'
+    inserts = {
+        'insert': 'INSERT INTO',
+        'ignore': 'INSERT IGNORE INTO',
+        'replace': 'REPLACE INTO'}
+    column_types = {
+        'Integer': 'INT',
+        'TinyInt': 'TINYINT',
+        'SmallInt': 'SMALLINT',
+        'MediumInt': 'MEDIUMINT',
+        'BigInt': 'BIGINT',
+        'Decimal': 'DECIMAL({precision},{scale})',
+        'Char': 'VARCHAR({length})',
+        'Timestamp': 'TIMESTAMP',
+        'Field': 'TEXT'}
+    inline_primary_key = False
+    schema_columns = (
+        "SELECT TABLE_NAME, COLUMN_NAME, COLUMN_TYPE, IS_NULLABLE = 'YES', "
+        "COLUMN_KEY = 'PRI', EXTRA LIKE '%%auto_increment%%' "
+        "FROM information_schema.COLUMNS WHERE TABLE_SCHEMA = DATABASE() "
+        "ORDER BY TABLE_NAME, ORDINAL_POSITION")
+    schema_indexes = (
+        "SELECT TABLE_NAME, INDEX_NAME, COLUMN_NAME, NON_UNIQUE = 0 "
+        "FROM information_schema.STATISTICS WHERE TABLE_SCHEMA = DATABASE() "
+        "AND INDEX_NAME != 'PRIMARY' ORDER BY TABLE_NAME, INDEX_NAME, SEQ_IN_INDEX")
+
+    def unsigned(self, column_type):
+        return column_type + ' UNSIGNED'
+
+    def normalize_type(self, column_type):
+        # The display width of integer columns (`int(10)`) doesn't matter.
+        return re.sub(r'^(TINYINT|SMALLINT|MEDIUMINT|INT|BIGINT)\(\d+\)', r'\1',
+                      super(MySQLDialect, self).normalize_type(column_type))
+
+    def column_definition(self, column, primary=False):
+        sql = super(MySQLDialect, self).column_definition(column)
+        return sql + ' AUTO_INCREMENT' if column.autoincrement else sql
+
+    def drop_index(self, table, index):
+        return 'DROP INDEX {0} ON {1}'.format(self.quote(index.name), self.quote(table))
+
+    def truncate(self, table):
+        return 'TRUNCATE TABLE {0}'.format(self.quote(table))
+
+    def alter_table(self, diff):
+        """
+            Returns a single ALTER TABLE statement making every change in
+            `diff`, including the index changes.
+        """
+        changes = ['DROP INDEX {0}'.format(self.quote(index.name))
+                   for index in diff.drop_indexes]
+        changes.extend('ADD COLUMN {0}'.format(self.column_definition(column))
+                       for column in diff.add_columns)
+        changes.extend('MODIFY COLUMN {0}'.format(self.column_definition(column))
+                       for column in diff.alter_columns)
+        changes.extend('DROP COLUMN {0}'.format(self.quote(column.name))
+                       for column in diff.drop_columns)
+        changes.extend('ADD {0}INDEX {1} ({2})'.format(
+            'UNIQUE ' if index.unique else '', self.quote(index.name),
+            ', '.join(self.quote(column) for column in index.columns))
+            for index in diff.add_indexes)
+
+        return ['ALTER TABLE {0} {1}'.format(
+            self.quote(diff.table.name), ', '.join(changes))] if changes else []
+
+
+class PostgreSQLDialect(Dialect):
+    placeholder = '%s'
+    no_limit = 'ALL'
+    explain_prefix = 'EXPLAIN'
+    index_hint = None
+    index_includes_primary_key = False
+    inserts = {'insert': 'INSERT INTO'}
+    column_types = {
+        'Integer': 'integer',
+        'TinyInt': 'smallint',
+        'SmallInt': 'smallint',
+        'BigInt': 'bigint',
+        'Decimal': 'numeric({precision},{scale})',
+        'Char': 'character varying({length})',
+        'Timestamp': 'timestamp without time zone',
+        'Field': 'text'}
+    serial_types = {'INTEGER': 'serial', 'SMALLINT': 'smallserial',
+                    'BIGINT': 'bigserial'}
+    inline_primary_key = False
+    schema_columns = (
+        "SELECT c.relname, a.attname, format_type(a.atttypid, a.atttypmod), "
+        "NOT a.attnotnull, EXISTS (SELECT 1 FROM pg_index i WHERE "
+        "i.indrelid = c.oid AND i.indisprimary AND a.attnum = ANY(i.indkey)), "
+        "COALESCE(pg_get_expr(d.adbin, d.adrelid) LIKE 'nextval(%%', false) "
+        "FROM pg_attribute a JOIN pg_class c ON c.oid = a.attrelid "
+        "JOIN pg_namespace n ON n.oid = c.relnamespace "
+        "LEFT JOIN pg_attrdef d ON d.adrelid = a.attrelid AND d.adnum = a.attnum "
+        "WHERE c.relkind = 'r' AND n.nspname = current_schema() "
+        "AND a.attnum > 0 AND NOT a.attisdropped ORDER BY c.relname, a.attnum")
+    schema_indexes = (
+        "SELECT t.relname, i.relname, a.attname, x.indisunique "
+        "FROM pg_index x JOIN pg_class t ON t.oid = x.indrelid "
+        "JOIN pg_class i ON i.oid = x.indexrelid "
+        "JOIN pg_namespace n ON n.oid = t.relnamespace "
+        "JOIN pg_attribute a ON a.attrelid = t.oid AND a.attnum = ANY(x.indkey) "
+        "WHERE n.nspname = current_schema() AND NOT x.indisprimary "
+        "ORDER BY t.relname, i.relname, "
+        "array_position(x.indkey::int[], a.attnum::int)")
+
+    def column_definition(self, column, primary=False):
+        if column.autoincrement:
+            column = column._replace(type=self.serial_types.get(
+                self.normalize_type(column.type), column.type))
+
+        return super(PostgreSQLDialect, self).column_definition(column)
+
+    def truncate(self, table):
+        return 'TRUNCATE TABLE {0}'.format(self.quote(table))
+
+    def alter_table(self, diff):
+        """
+            Returns a single ALTER TABLE statement making every change to the
+            columns in `diff`, along with the statements dropping and creating
+            its indexes (which can't be part of an ALTER TABLE).
+        """
+        changes = ['ADD COLUMN {0}'.format(self.column_definition(column))
+                   for column in diff.add_columns]
+
+        for column in diff.alter_columns:
+            name = self.quote(column.name)
+            changes.append('ALTER COLUMN {0} TYPE {1}'.format(name, column.type))
+            changes.append('ALTER COLUMN {0} {1} NOT NULL'.format(
+                name, 'DROP' if column.null else 'SET'))
+
+        changes.extend('DROP COLUMN {0}'.format(self.quote(column.name))
+                       for column in diff.drop_columns)
+
+        statements = [self.drop_index(diff.table.name, index)
+                      for index in diff.drop_indexes]
+        if changes:
+            statements.append('ALTER TABLE {0} {1}'.format(
+                self.quote(diff.table.name), ', '.join(changes)))
+        statements.extend(self.create_index(diff.table.name, index)
+                          for index in diff.add_indexes)
+
+        return statements
@@ -0,0 +1,127 @@
+import hashlib
+import re
+import threading
+import time
+
+
+# The phases of a query, in the order they happen.
+PHASES = ('flatten', 'compile', 'cache', 'checkout', 'execute', 'fetch',
+          'convert', 'map')
+
+
+_whitespace = re.compile(r'\s+')
+_literal_lists = re.compile(r'\(\s*(?:\?|%s)(?:\s*,\s*(?:\?|%s))*\s*\)')
+_literals = re.compile(r"'(?:[^']|'')*'|\b\d+(?:\.\d+)?\b")
+
+
+def normalize(sql):
+    """
+        Returns the statement with any literals written into it replaced by
+        placeholders, and lists of placeholders (from IN filters) collapsed,
+        so that every run of the same query has the same text.
+    """
+    sql = _whitespace.sub(' ', sql.strip())
+    sql = _literals.sub('?', sql)
+    return _literal_lists.sub('(...)', sql)
+
+
+def fingerprint(sql):
+    """
+        Returns a short hash identifying the query `sql` was built from.
+    """
+    return hashlib.sha1(normalize(sql).encode('utf-8')).hexdigest()[:16]
+
+
+class QueryEvent(object):
+    """
+        The timings for a single query, passed to the listeners registered on
+        the session (see Instrumentation).  `phases` maps each phase of the
+        query that was timed (see PHASES) to the seconds spent in it.
+
+        `access` holds the columns the query searches its table by, for
+        queries run by a model while the session's IndexAdvisor is enabled
+        (see pyorm.advisor).
+    """
+    __slots__ = ('model', 'server', 'sql', 'literals', 'rows', 'cached',
+                 'phases', 'access', '_fingerprint')
+
+    def __init__(self, model=None):
+        self.model = model
+        self.server = None
+        self.sql = None
+        self.literals = ()
+        self.rows = 0
+        self.cached = False
+        self.phases = {}
+        self.access = None
+        self._fingerprint = None
+
+    @property
+    def fingerprint(self):
+        if self._fingerprint is None and self.sql is not None:
+            self._fingerprint = fingerprint(self.sql)
+
+        return self._fingerprint
+
+    @property
+    def elapsed(self):
+        return sum(self.phases.values())
+
+    def time(self, phase, start):
+        """
+            Adds the time since `start` to `phase`, returning the current time
+            so the next phase can be timed from it.
+        """
+        now = time.time()
+        self.phases[phase] = self.phases.get(phase, 0.0) + now - start
+        return now
+
+
+class Instrumentation(object):
+    """
+        Passes a QueryEvent for every query run through a session to the
+        listeners registered on it:
+            def listener(event):
+                print(event.model, event.fingerprint, event.rows, event.phases)
+
+            session.instrumentation.listen(listener)
+
+        An event is sent once the rows of a query have been loaded, and
+        another event holding just the `map` phase once a model using
+        Model.map() has been iterated over.
+
+        Nothing is timed unless a listener is registered, so leaving the
+        instrumentation off costs a single attribute check per query.
+    """
+    def __init__(self, listeners=()):
+        self.listeners = list(listeners)
+        self.enabled = bool(self.listeners)
+        self._lock = threading.Lock()
+
+    def listen(self, listener):
+        with self._lock:
+            self.listeners = self.listeners + [listener]
+            self.enabled = True
+
+    def remove(self, listener):
+        with self._lock:
+            self.listeners = [item for item in self.listeners if item != listener]
+            self.enabled = bool(self.listeners)
+
+    def start(self, model=None, force=False):
+        """
+            Returns a new event for a query on `model` (a Model instance or
+            the name of one), or None if there are no listeners (unless
+            `force` is set).
+        """
+        if not (self.enabled or force):
+            return None
+
+        if model is not None and not isinstance(model, basestring):
+            model = model.Meta.verbose_name
+
+        return QueryEvent(model)
+
+    def emit(self, event):
+        for listener in self.listeners:
+            listener(event)
@@ -0,0 +1,57 @@
+"""
+    Measures the cost of reading and assigning a field on a model whose rows
+    have been loaded, along with reading a relationship's `<name>_id` field.
+
+        python pyorm/experimental/fieldbenchmark.py [number] [repeat]
+"""
+import sys
+import timeit
+
+from pyorm.field import Char, Integer
+from pyorm.identity import Row
+from pyorm.model import Model
+from pyorm.relationship import OneToOne
+
+
+class BenchmarkAuthor(Model):
+    name = Char(length=20)
+
+
+class BenchmarkBook(Model):
+    title = Char(length=20)
+    pages = Integer()
+    author = OneToOne(BenchmarkAuthor)
+
+
+def best(statement, number, repeat):
+    """
+        Returns the lowest time taken by one call of `statement`, in seconds
+        (including the cost of the call itself).
+    """
+    timer = timeit.Timer(statement)
+    return min(timer.repeat(repeat=repeat, number=number)) / number
+
+
+def measure(number=100000, repeat=25):
+    book = BenchmarkBook()
+    book._records = [Row(id=1, title='one', pages=10, author_id=2)]
+    book.result_loaded = True
+
+    def write():
+        book.pages = 5
+
+    read = best(lambda: book.pages, number, repeat)
+    written = best(write, number, repeat)
+    key = best(lambda: book.author_id, number, repeat)
+
+    return read, written, key
+
+
+if __name__ == '__main__':
+    number = int(sys.argv[1]) if len(sys.argv) > 1 else 100000
+    repeat = int(sys.argv[2]) if len(sys.argv) > 2 else 25
+    read, written, key = measure(number, repeat)
+
+    print('field read:                  {0:8.3f} us'.format(read * 1000000))
+    print('field write:                 {0:8.3f} us'.format(written * 1000000))
+    print('relationship key read:       {0:8.3f} us'.format(key * 1000000))
@@ -0,0 +1,154 @@
+"""
+    Measures how long it takes to import a schema of 500 models (50 modules
+    of 10 models each, every model having a few fields, an index and a
+    relationship to a model in another module), and to then instantiate a
+    couple of them.
+
+    A command line tool touching two tables only imports the modules of
+    those two models though, leaving the modules of their relationships'
+    targets to be imported through pyorm.registry when first used, so that
+    case is measured separately, in a fresh interpreter each time, along
+    with the import of pyorm itself.
+
+        python pyorm/experimental/importbenchmark.py [models] [repeat]
+"""
+import importlib
+import os
+import shutil
+import subprocess
+import sys
+import tempfile
+import time
+
+
+MODULE = '''from pyorm.field import Char, Integer
+from pyorm.indexes import Index
+from pyorm.model import Model
+from pyorm.relationship import OneToOne
+'''
+
+MODEL = '''
+
+class Model{0}(Model):
+    name = Char(length=20)
+    code = Char(length=10)
+    status = Integer()
+    total = Integer()
+    other = OneToOne('Model{1}', import_from='{2}.module{3}')
+
+    class Indexes:
+        code = Index('code', 'status')
+'''
+
+
+# Run in a fresh interpreter, printing the seconds spent importing pyorm,
+# importing the modules of the two models used, and using them (which
+# imports the module their relationships point to), along with the number of
+# schema modules imported in the end.
+LAZY = '''import sys
+import time
+
+start = time.time()
+import pyorm.model
+loaded = time.time()
+from {0}.module0 import Model0
+from {0}.module1 import Model10
+imported = time.time()
+for model in (Model0(), Model10()):
+    model.r.other.target
+used = time.time()
+
+print('%f %f %f %d' % (loaded - start, imported - loaded, used - imported,
+                       len([name for name, module in sys.modules.items()
+                            if name.startswith('{0}.') and module is not None])))
+'''
+
+
+def build(path, package, models, per_module=10):
+    os.mkdir(os.path.join(path, package))
+    open(os.path.join(path, package, '__init__.py'), 'w').close()
+    modules = (models + per_module - 1) // per_module
+
+    for module in range(modules):
+        source = [MODULE]
+
+        for idx in range(module * per_module, min((module + 1) * per_module, models)):
+            target = (idx + per_module) % models
+            source.append(MODEL.format(idx, target, package, target // per_module))
+
+        with open(os.path.join(path, package, 'module{0}.py'.format(module)), 'w') as f:
+            f.write(''.join(source))
+
+    return modules
+
+
+def measure(models=500, repeat=5):
+    results = []
+
+    for run in range(repeat):
+        path = tempfile.mkdtemp()
+        package = 'benchmark_schema_{0}'.format(run)
+        modules = build(path, package, models)
+        sys.path.insert(0, path)
+
+        try:
+            start = time.time()
+            for module in range(modules):
+                importlib.import_module('{0}.module{1}'.format(package, module))
+            imported = time.time() - start
+
+            start = time.time()
+            first = getattr(sys.modules[package + '.module0'], 'Model0')()
+            second = getattr(sys.modules[package + '.module1'], 'Model10')()
+            for model in (first, second):
+                model.r.other.target
+            instantiated = time.time() - start
+
+            start = time.time()
+            for i in range(1000):
+                getattr(sys.modules[package + '.module0'], 'Model0')()
+            repeated = (time.time() - start) / 1000
+
+            results.append((imported, instantiated, repeated))
+        finally:
+            sys.path.remove(path)
+            shutil.rmtree(path)
+
+    return [min(values) for values in zip(*results)]
+
+
+def measure_lazy(models=500, repeat=5):
+    path = tempfile.mkdtemp()
+    package = 'benchmark_schema_lazy'
+    build(path, package, models)
+
+    root = os.path.dirname(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+    env = dict(os.environ, PYTHONPATH=os.pathsep.join([path, root]))
+    results = []
+
+    try:
+        # The first run only compiles the schema modules.
+        for run in range(repeat + 1):
+            output = subprocess.check_output(
+                [sys.executable, '-c', LAZY.format(package)], env=env)
+            results.append([float(value) for value in output.split()])
+    finally:
+        shutil.rmtree(path)
+
+    return [min(values) for values in zip(*results[1:])]
+
+
+if __name__ == '__main__':
+    models = int(sys.argv[1]) if len(sys.argv) > 1 else 500
+    repeat = int(sys.argv[2]) if len(sys.argv) > 2 else 5
+    imported, instantiated, repeated = measure(models, repeat)
+
+    print('import {0} models:           {1:8.2f} ms'.format(models, imported * 1000))
+    print('first use of 2 models:       {0:8.2f} ms'.format(instantiated * 1000))
+    print('instantiate a model:         {0:8.3f} ms'.format(repeated * 1000))
+
+    orm, imported, used, modules = measure_lazy(models, repeat)
+    print('import pyorm.model:          {0:8.2f} ms'.format(orm * 1000))
+    print('import 2 models\' modules:    {0:8.2f} ms'.format(imported * 1000))
+    print('use 2 models:                {0:8.2f} ms ({1:d} modules imported)'.format(
+        used * 1000, int(modules)))
@@ -0,0 +1,50 @@
+"""
+    Measures the cost of reading an attribute of a model's Indexes class,
+    which binding every index on each instantiation does, and of
+    instantiating the model (3 fields and 2 indexes).
+
+        python pyorm/experimental/indexesbenchmark.py [number] [repeat]
+"""
+import sys
+import timeit
+
+from pyorm.field import Char, Integer
+from pyorm.indexes import Index, Unique
+from pyorm.model import Model
+
+
+class BenchmarkOrder(Model):
+    code = Char(length=10)
+    status = Integer()
+    total = Integer()
+
+    class Indexes:
+        code = Unique('code')
+        status = Index('status', 'total')
+
+
+def best(statement, number, repeat):
+    """
+        Returns the lowest time taken by one call of `statement`, in seconds
+        (including the cost of the call itself).
+    """
+    timer = timeit.Timer(statement)
+    return min(timer.repeat(repeat=repeat, number=number)) / number
+
+
+def measure(number=100000, repeat=25):
+    indexes = BenchmarkOrder.Indexes
+
+    attribute = best(lambda: indexes.status, number, repeat)
+    instantiate = best(BenchmarkOrder, number // 10, repeat)
+
+    return attribute, instantiate
+
+
+if __name__ == '__main__':
+    number = int(sys.argv[1]) if len(sys.argv) > 1 else 100000
+    repeat = int(sys.argv[2]) if len(sys.argv) > 2 else 25
+    attribute, instantiate = measure(number, repeat)
+
+    print('Indexes attribute access:    {0:8.3f} us'.format(attribute * 1000000))
+    print('instantiate a model:         {0:8.3f} us'.format(instantiate * 1000000))
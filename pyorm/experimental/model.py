@@ -32,10 +32,10 @@ class Manager(object):
     def session(self):
         """
             If no session has been set on the model previously, go ahead and
-            grab the default session, otherwise, just return the current one.
+            grab the current session, otherwise, just return the current one.
         """
         if not hasattr(self, '_session'):
-            self._session = session.default_session
+            self._session = session.current_session()
 
         return self._session
 
@@ -163,7 +163,8 @@ class Expression(object):
         # Alias should always be a string/unicode object, so we
         # shouldn't need to deep copy it.
         instance.alias = self.alias
-        instance.owner = self._owner_ref()
+        if self._owner is not None:
+            instance.owner = self._owner_ref()
 
         return instance
 
@@ -215,6 +216,19 @@ class Expression(object):
     def __rpow__(self, other):
         return Expression(other, self, op=OP_POW)
 
+    def __pos__(self):
+        return Expression(self, op=OP_ASC)
+
+    def __neg__(self):
+        # Negating an already ordered expression flips the direction, rather
+        # than wrapping it again.
+        if self.op == OP_DESC and len(self._tokens) == 1:
+            return Expression(self._tokens[0].value, op=OP_ASC)
+        elif self.op == OP_ASC and len(self._tokens) == 1:
+            return Expression(self._tokens[0].value, op=OP_DESC)
+
+        return Expression(self, op=OP_DESC)
+
     def __ne__(self, other):
         if other is None:
             return Expression(self, other, op=OP_NULLNE)
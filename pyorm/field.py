@@ -1,6 +1,8 @@
 import datetime
 import numbers
 import time
+import warnings
+import weakref
 
 
 class UnboundField(object):
@@ -53,8 +55,30 @@ class Field(object):
     @property
     def value(self):
         if self._idx != self.owner.current_idx:
-            self._value = self.owner._records[self.owner.current_idx]
-            self._value = self.to_python(self._value)
+            record = self.owner._records[self.owner.current_idx]
+
+            # Deferred fields (and fields left out by Model.fields()) aren't
+            # part of the original result set, so they are pulled back for
+            # the current batch of rows the first time they are accessed.
+            if self.name not in record:
+                if not (self.deferred or self.name in self.owner._deferred):
+                    warnings.warn(
+                        'Field `{0}` was not requested, loading it '
+                        'separately.'.format(self.name))
+
+                self.owner.load_deferred(self.name)
+
+            # Rows shared through the session's identity map keep the
+            # converted values, so they are only converted once.
+            converted = getattr(record, 'converted', None)
+
+            if converted is not None and self.name in converted:
+                self._value = converted[self.name]
+            else:
+                self._value = self.to_python(record[self.name])
+                if converted is not None:
+                    converted[self.name] = self._value
+
             self._idx = self.owner.current_idx
 
         return self._value
@@ -65,18 +89,22 @@ class Field(object):
             self._changed = True
             self._value = val
 
-    def __init__(self, default=None, null=False, **kwargs):
+    def __init__(self, default=None, null=False, deferred=False, **kwargs):
+        self.name = kwargs.get('_name')
+        self.trans_name = kwargs.get('_trans_name')
+        self.owner = weakref.proxy(kwargs['_owner'])
         self.default = default
         self.null = null
+        self.deferred = deferred
         self._idx = None
         self._changed = False
         self._value = None
 
     def to_python(self, val):
-        return value
+        return val
 
     def to_db(self, val):
-        return value
+        return val
 
 
 class Integer(Field):
@@ -130,7 +158,7 @@ class UnixTimestamp(Integer):
 
 class Decimal(Field):
     def __init__(self, precision=None, scale=None, unsigned=False, **kwargs):
-        super(Field, self).__init__(self, **kwargs)
+        super(Decimal, self).__init__(**kwargs)
         self.precision = precision
         self.scale = scale
         self.unsigned = unsigned
@@ -138,11 +166,11 @@ class Decimal(Field):
 
 class Char(Field):
     def __init__(self, length=None, **kwargs):
-        super(Field, self).__init__(self, **kwargs)
+        super(Char, self).__init__(**kwargs)
         self.length = length
 
 
 class Timestamp(Field):
     def __init__(self, on_update=None, **kwargs):
-        super(Field, self).__init__(self, **kwargs)
+        super(Timestamp, self).__init__(**kwargs)
         self.on_update = on_update
@@ -0,0 +1,69 @@
+import threading
+import weakref
+
+
+class Row(dict):
+    """
+        A single row of a result set, which can be shared between result sets
+        through the IdentityMap.  Values converted by the fields (see
+        Field.to_python()) are kept in `converted`, so each value is only
+        converted once, no matter how many result sets the row is in.
+    """
+    __slots__ = ('converted', '__weakref__')
+
+    def __init__(self, *args, **kwargs):
+        super(Row, self).__init__(*args, **kwargs)
+        self.converted = {}
+
+    def refresh(self, values):
+        """
+            Updates the row with values pulled back by another query.
+        """
+        for key, value in values.items():
+            self[key] = value
+            self.converted.pop(key, None)
+
+
+class IdentityMap(object):
+    """
+        Maps (table, primary key) to the Row loaded for it, so that loading a
+        row that is already in use somewhere else in the session returns the
+        same Row, and Model.get_by_pk() can skip the query altogether.
+
+        Rows are only held by weak reference, so once no result set is using
+        a row it drops out of the map, rather than the map holding onto every
+        row the session has ever loaded.
+    """
+    def __init__(self):
+        self._rows = weakref.WeakValueDictionary()
+        self._lock = threading.Lock()
+
+    def __len__(self):
+        return len(self._rows)
+
+    def get(self, table, key):
+        return self._rows.get((table, key))
+
+    def merge(self, table, key, row):
+        """
+            Returns the Row already loaded for `key`, refreshed with the values
+            in `row`, or adds `row` to the map if it hasn't been loaded.
+        """
+        with self._lock:
+            existing = self._rows.get((table, key))
+
+            if existing is None:
+                self._rows[(table, key)] = row
+                return row
+
+        existing.refresh(row)
+        return existing
+
+    def invalidate(self, table=None):
+        """
+            Drops every row for `table` (or every row, if no table is given).
+        """
+        with self._lock:
+            for key in list(self._rows.keys()):
+                if table is None or key[0] == table:
+                    self._rows.pop(key, None)
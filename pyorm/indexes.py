@@ -7,45 +7,38 @@ class MetaIndexes(type):
         definitions on Model.__new__().  This handles collection of unbound objects,
         as well as the binding when the Indexes class for that model is instantiated.
     """
-    def __getattribute__(cls, attr):
+    def __init__(cls, name, bases, attrs):
+        super(MetaIndexes, cls).__init__(name, bases, attrs)
+        cls.collect()
+
+    def __setattr__(cls, attr, value):
+        type.__setattr__(cls, attr, value)
+
+        # Keep the unbound list up to date when an index is added later on.
+        if hasattr(value, 'bind'):
+            cls.collect()
+
+    def collect(cls):
         """
-            Return the given unbound index class.  If the _unbound list has not
-            yet been generated, we generate it here (which also sets the translated
-            name on the unbound object).
+            Pushes the names of the defined indexes into the _unbound list (and
+            sets the translated name on each unbound object).  This is done
+            once when the class is created (see MetaModel.__new__), so that
+            attribute lookups on the class don't need to do any extra work.
         """
-        def generate_unbound(cls):
-            cls._unbound = []
-
-            for name, item in cls.__dict__.items():
-                if hasattr(item, 'bind'):
-                    cls._unbound.append(name)
-
-                    if name[-1] == '_':
-                        trans_name = name[:-1]
-                    else:
-                        trans_name = name
-
-                    item.name = trans_name
-
-            return cls._unbound
-
-        try:
-            if attr == '_unbound':
-                # push the defined indexes into a list on the model the first time
-                # the _unbound object is accessed.
-                try:
-                    return type.__getattribute__(cls, '_unbound')
-                except AttributeError:
-                    return generate_unbound(cls)
-            else:
-                try:
-                    type.__getattribute__(cls, '_unbound')
-                except AttributeError:
-                    generate_unbound(cls)
-
-                return type.__getattribute__(cls, attr)
-        except AttributeError:
-            raise AttributeError(attr)
+        unbound = []
+
+        for name, item in cls.__dict__.items():
+            if hasattr(item, 'bind'):
+                unbound.append(name)
+
+                if name[-1] == '_':
+                    trans_name = name[:-1]
+                else:
+                    trans_name = name
+
+                item.name = trans_name
+
+        type.__setattr__(cls, '_unbound', unbound)
 
     def __call__(cls, *args, **kwargs):
         """
@@ -60,13 +53,68 @@ class MetaIndexes(type):
         del(kwargs['_owner'])
 
         for name in cls._unbound:
-            if name[-1] == '_':
-                trans_name = name[:-1]
-            else:
-                trans_name = name
-
-            setattr(instance, name, getattr(instance, name).bind(
-                name=trans_name, owner=kwargs.get('_owner', None)))
+            item = cls.__dict__[name]
+            setattr(instance, name, item.bind(
+                name=item.name, owner=instance._owner))
 
         instance.__init__(*args, **kwargs)
         return instance
+
+
+class UnboundIndex(object):
+    """
+        Uninitialized version of all index objects, see UnboundField.
+    """
+    def __init__(self, cls, *fields, **kwargs):
+        self.index_type = cls
+        self.fields = fields
+        self.kwargs = kwargs
+        self.name = None
+
+    def bind(self, name, owner):
+        kwargs = dict(self.kwargs)
+        kwargs.update({'_name': name, '_owner': owner})
+        instance = self.index_type(*self.fields, **kwargs)
+        instance.unbound_index = self
+        return instance
+
+
+class MetaIndex(type):
+    """
+        Returns an unbound index if we don't know all the information about
+        the index yet.
+    """
+    def __call__(cls, *fields, **kwargs):
+        if len({'_owner', '_name'} & set(kwargs.keys())) == 2:
+            instance = cls.__new__(cls)
+            instance.__init__(*fields, **kwargs)
+            return instance
+        else:
+            return UnboundIndex(cls, *fields, **kwargs)
+
+
+class Index(object):
+    """
+        An index across one or more fields on the model, fields are referenced
+        by the name used for them on the model:
+            Index('code', 'status', unique=True)
+    """
+    __metaclass__ = MetaIndex
+
+    primary = False
+
+    def __init__(self, *fields, **kwargs):
+        self.name = kwargs.get('_name')
+        self.owner = kwargs.get('_owner')
+        self.fields = fields
+        self.unique = kwargs.get('unique', self.primary)
+
+
+class Unique(Index):
+    def __init__(self, *fields, **kwargs):
+        kwargs['unique'] = True
+        super(Unique, self).__init__(*fields, **kwargs)
+
+
+class PrimaryKey(Unique):
+    primary = True
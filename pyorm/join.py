@@ -0,0 +1,181 @@
+import collections
+
+from pyorm.token import *
+
+
+class JoinNode(object):
+    """
+        A single relationship in the join tree built by JoinPlanner.  Each node
+        keeps track of the relationship it was built from, an instance of the
+        model on the other side of that relationship, and any relationships
+        joined through it.
+
+        Nodes marked as `semi` are only used to check for the existence of a
+        related row, so they are written as `EXISTS (...)` subqueries instead
+        of joins, with the filters that reference them (`filters`) moved into
+        the subquery.
+    """
+    def __init__(self, path, relationship=None, model=None):
+        self.path = path
+        self.relationship = relationship
+        self.model = model
+        self.join = getattr(relationship, 'join', None)
+        self.semi = False
+        self.filters = []
+        self.children = collections.OrderedDict()
+
+    def __iter__(self):
+        """
+            Iterates over every node below this one, depth first.
+        """
+        for child in self.children.values():
+            yield child
+            for node in child:
+                yield node
+
+
+class JoinPlanner(object):
+    """
+        Builds the minimal set of joins needed to run a query for a model,
+        based on the relationship paths referenced by the columns used in the
+        model's fields, filters, ordering, grouping and having clauses.
+
+        Relationships which are never referenced are not joined at all, with
+        the exception of relationships joined explicitly via Model.join()
+        using an inner join, as those still restrict the rows returned.
+
+        Inner joins whose columns are only referenced by filters (and whose
+        filters don't also reference another relationship) are turned into
+        semi-joins, which means the database only needs to check for the
+        existence of a related row rather than joining (and possibly
+        multiplying) the rows on the other side.
+    """
+    def __init__(self, model):
+        self.model = model
+
+    def paths(self, value):
+        """
+            Returns the set of relationship paths referenced by the columns in
+            the value passed.
+        """
+        if getattr(value, 'token_type', None) == T_COL:
+            columns = [value]
+        elif hasattr(value, 'tokens'):
+            columns = [token.value for token in value.tokens if token.type == T_COL]
+        else:
+            columns = []
+
+        return set(tuple(column._path[:-1]) for column in columns
+                   if len(column._path) > 1)
+
+    def conjuncts(self):
+        """
+            Returns each top level filter (including Meta.auto_filters) that
+            has to be true for a row to be returned.
+        """
+        conjuncts = [token.value for token in self.model._filters._tokens
+                     if token.type != T_OPR]
+        conjuncts.extend(self.model.Meta.auto_filters)
+        return conjuncts
+
+    def referenced(self):
+        """
+            Returns the set of relationship paths (along with every prefix of
+            those paths) which are referenced outside of the filters, these
+            always need to be joined.
+        """
+        paths = set()
+
+        for expression in (self.model._fields, self.model._compound_fields,
+                           self.model._order, self.model._group,
+                           self.model._having):
+            paths.update(self.paths(expression))
+
+        return set(path[:idx] for path in paths for idx in range(1, len(path) + 1))
+
+    def node(self, parent, name):
+        """
+            Returns the child node called `name` below `parent`, creating it
+            if it doesn't exist yet.
+        """
+        if name not in parent.children:
+            owner = parent.model if parent.model is not None else self.model
+            relationship = getattr(owner.r, name, None)
+
+            if relationship is None:
+                raise AttributeError(
+                    'Model `{0}` has no relationship `{1}`'.format(
+                        owner.Meta.verbose_name, name))
+
+            parent.children[name] = JoinNode(
+                path=parent.path + (name,), relationship=relationship,
+                model=relationship.target())
+
+        return parent.children[name]
+
+    def plan(self):
+        """
+            Returns the root node of the join tree.  Filters that remain in
+            the WHERE clause of the query (rather than being moved into a
+            semi-join) are stored as the filters of the root node.
+        """
+        root = JoinNode(path=())
+        referenced = self.referenced()
+        conjuncts = [(expression, self.paths(expression))
+                     for expression in self.conjuncts()]
+
+        paths = set(referenced)
+        for expression, expression_paths in conjuncts:
+            paths.update(expression_paths)
+
+        for path in sorted(paths):
+            parent = root
+            for name in path:
+                parent = self.node(parent, name)
+
+        # Explicitly joined relationships are only kept if they change which
+        # rows are returned (inner joins), otherwise joining them is wasted
+        # work, since none of their columns are used.
+        for name in self.model._joined_tables:
+            if name not in root.children:
+                relationship = getattr(self.model.r, name)
+                if relationship.join == 'inner':
+                    self.node(root, name).semi = True
+
+        self.plan_semi_joins(root, referenced, conjuncts)
+        root.filters = [expression for expression, expression_paths in conjuncts]
+
+        return root
+
+    def plan_semi_joins(self, parent, referenced, conjuncts):
+        """
+            Marks any inner join below `parent` that can be turned into a
+            semi-join, and moves the filters that reference it into the node.
+        """
+        for node in parent.children.values():
+            if node.semi:
+                continue
+
+            if node.join != 'inner' or node.path in referenced:
+                self.plan_semi_joins(node, referenced, conjuncts)
+                continue
+
+            size = len(node.path)
+            related = [(expression, paths) for expression, paths in conjuncts
+                       if [path for path in paths if path[:size] == node.path]]
+
+            # Each filter moved into the subquery can only reference this
+            # relationship (or those joined through it), and relationships
+            # that are available outside of the subquery.
+            movable = all(
+                path[:size] == node.path or node.path[:len(path)] == path
+                for expression, paths in related for path in paths)
+
+            if movable:
+                moved = set(id(expression) for expression, paths in related)
+                node.semi = True
+                node.filters = [expression for expression, paths in related]
+                conjuncts[:] = [(expression, paths) for expression, paths in conjuncts
+                                if id(expression) not in moved]
+            else:
+                self.plan_semi_joins(node, referenced, conjuncts)
@@ -0,0 +1,197 @@
+from pyorm.column import Column
+from pyorm.expression import Expression
+from pyorm.token import *
+
+
+class Loader(object):
+    """
+        Base class for loaders which pull back data for a whole batch of the
+        owner's result set at a time, rather than one row at a time.
+
+        Loaders are stored on the owner's result set (Model._loaders), which
+        is shared by any clone of the owner made from the same result set
+        (RecordProxy objects clone the owner), so anything loaded for one row
+        is reused by the rest of the rows in the same batch.
+    """
+    def __init__(self, batch_size=None):
+        self.batch_size = batch_size
+        self._batches = set()
+
+    def key(self, record, fields):
+        return tuple(record.get(field) for field in fields)
+
+    def batch(self, records, idx):
+        """
+            Returns the (start, end) range of the batch that contains `idx`.
+        """
+        if not self.batch_size:
+            return 0, len(records)
+
+        start = idx - (idx % self.batch_size)
+        return start, min(start + self.batch_size, len(records))
+
+    def filters(self, fields, keys):
+        """
+            Builds the filter used to pull back the rows matching any of the
+            keys passed in.  Single field keys are pulled back using
+            `field IN (...)`, while multi-field keys are OR'd together.
+        """
+        if len(fields) == 1:
+            return Column(path=list(fields)) == sorted(key[0] for key in keys)
+
+        expression = Expression(op=OP_OR)
+        for key in sorted(keys):
+            expression.append(Expression(*[
+                Column(path=[field]) == value
+                for field, value in zip(fields, key)], op=OP_AND))
+
+        return expression
+
+    def fetch(self, records):
+        raise NotImplementedError()
+
+    def load_batch(self, records, idx):
+        """
+            Loads the batch containing `idx`, unless it was loaded already.
+        """
+        start, end = self.batch(records, idx)
+
+        if start not in self._batches:
+            self.fetch(records[start:end])
+            self._batches.add(start)
+
+
+class BatchLoader(Loader):
+    """
+        Dataloader style loading for relationships.  When a relationship is
+        first accessed while on row `idx` of the owner, the keys for every row
+        in the batch containing `idx` are collected, and the related rows for
+        all of them are pulled back with a single query.  The rows are then
+        grouped by key and cached, so accessing the relationship from any
+        other row in the same batch doesn't hit the database.
+
+        With a batch size of 500, iterating over 2000 rows and touching the
+        relationship on each one results in 4 queries rather than 2000.
+
+        A loader which has fetched the related rows for the whole result set
+        up front (see Model.prefetch()) is `complete`, and can be shared by
+        every model it hands out, through `child_loaders`.
+    """
+    def __init__(self, relationship, batch_size=None):
+        super(BatchLoader, self).__init__(batch_size=batch_size)
+        owner = relationship.owner
+        self.target = relationship.target
+        self.keys = relationship.keys
+        self.session = owner._session
+        self.complete = False
+        self.queries = 0
+        self.records = []
+        self.child_loaders = {}
+        self._cache = {}
+
+        # The result set the owner's rows were loaded for, and the path of
+        # relationships followed from it, used to spot N+1 queries (see
+        # pyorm.nplusone).
+        self.scope = owner._scope
+        self.path = (owner._load_path or (owner.__class__.__name__,)) + (
+            relationship.name,)
+
+    def fetch(self, records):
+        """
+            Pulls back the related rows for all of the records passed in, and
+            adds them to the cache.
+        """
+        local_fields = [local for local, remote in self.keys]
+        remote_fields = [remote for local, remote in self.keys]
+
+        keys = set(self.key(record, local_fields) for record in records)
+        keys.discard(tuple(None for field in local_fields))
+
+        for key in keys:
+            self._cache.setdefault(key, [])
+
+        if not keys:
+            return
+
+        model = self.target(session=self.session).filters(
+            self.filters(remote_fields, keys))
+        model.get()
+        self.queries += 1
+        self.records.extend(model._records)
+
+        for record in model._records:
+            self._cache.setdefault(
+                self.key(record, remote_fields), []).append(record)
+
+    def load(self, records, idx):
+        """
+            Returns a new instance of the target model, holding the related
+            rows for `records[idx]`, loading the rows for the rest of the batch
+            at the same time if this batch hasn't been loaded yet.
+        """
+        if not self.complete:
+            self.load_batch(records, idx)
+
+        local_fields = [local for local, remote in self.keys]
+        model = self.target(session=self.session)
+        model._records = self._cache.get(self.key(records[idx], local_fields), [])
+        model._loaders = dict(self.child_loaders)
+        model._scope = self.scope
+        model._load_path = self.path
+        model.result_loaded = True
+
+        return model
+
+    def fetch_all(self, records):
+        """
+            Pulls back the related rows for every record passed, `batch_size`
+            records at a time, marking the loader as complete.
+        """
+        size = self.batch_size or len(records) or 1
+
+        for start in range(0, len(records), size):
+            self.fetch(records[start:start + size])
+
+        self.complete = True
+
+
+class DeferredLoader(Loader):
+    """
+        Loads a deferred field for a whole batch of the owner's result set at
+        a time, using a single `primary key IN (...)` query.  The values are
+        written back into the owner's records, so they are only ever loaded
+        once.
+    """
+    def __init__(self, model, name, batch_size=None):
+        super(DeferredLoader, self).__init__(batch_size=batch_size)
+        self.model = type(model)
+        self.session = model._session
+        self.name = name
+        self.primary_key = model._primary_key
+
+        if not self.primary_key:
+            raise Exception(
+                'Cannot load deferred field `{0}` for model `{1}` without a '
+                'primary key.'.format(name, model.Meta.verbose_name))
+
+    def fetch(self, records):
+        records = [record for record in records if self.name not in record]
+        keys = set(self.key(record, self.primary_key) for record in records)
+
+        if not keys:
+            return
+
+        model = self.model(session=self.session).fields(*[
+            Column(path=[field]) for field in self.primary_key + (self.name,)])
+        model = model.filters(self.filters(self.primary_key, keys))
+        model.get()
+
+        values = dict(
+            (self.key(record, self.primary_key), record.get(self.name))
+            for record in model._records)
+
+        for record in records:
+            record[self.name] = values.get(self.key(record, self.primary_key))
+
+    def load(self, records, idx):
+        self.load_batch(records, idx)
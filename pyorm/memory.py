@@ -0,0 +1,136 @@
+import sys
+import warnings
+
+
+class MemoryBudgetException(Exception):
+    pass
+
+
+class MemoryBudgetWarning(UserWarning):
+    pass
+
+
+def row_size(row):
+    """
+        Returns the approximate number of bytes held by a row of a result set
+        (a Row, dict or tuple), not counting the keys, which are shared by
+        every row.
+    """
+    values = row.values() if isinstance(row, dict) else row
+    return sys.getsizeof(row) + sum(sys.getsizeof(value) for value in values)
+
+
+def records_size(records, seen):
+    """
+        Returns the bytes held by the records (and their converted values),
+        skipping records in `seen`, which are counted somewhere else already.
+    """
+    size = converted = 0
+
+    for record in records:
+        if id(record) in seen:
+            continue
+
+        seen.add(id(record))
+        size += row_size(record)
+
+        values = getattr(record, 'converted', None)
+        if values:
+            converted += row_size(values)
+
+    return size, converted
+
+
+def usage(model, seen=None):
+    """
+        Returns the approximate bytes held by the result set of a model (see
+        Model.memory_usage()).
+    """
+    seen = set() if seen is None else seen
+    records, converted = records_size(model._records, seen)
+
+    fields = 0
+    for field in vars(model.c).values():
+        if field._idx is not None:
+            fields += sys.getsizeof(field._value)
+
+    relationships = loaders_size(model._loaders, seen)
+
+    return {
+        'rows': len(model._records),
+        'records': records,
+        'converted': converted,
+        'fields': fields,
+        'relationships': relationships,
+        'total': records + converted + fields + relationships,
+    }
+
+
+def loaders_size(loaders, seen):
+    """
+        Returns the bytes held by the rows lazily loaded for relationships,
+        including the relationships of those rows.
+    """
+    size = 0
+
+    for loader in loaders.values():
+        for records in getattr(loader, '_cache', {}).values():
+            size += sum(records_size(records, seen))
+
+        size += loaders_size(getattr(loader, 'child_loaders', {}), seen)
+
+    return size
+
+
+class FetchBudget(object):
+    """
+        Limits the approximate number of bytes a single query's rows can take
+        up.  The rows are fetched `chunk_size` at a time, and the size of the
+        rows fetched so far is estimated from a sample of each chunk, so a
+        query returning far too many rows is stopped (`raise`) or reported
+        (`warn`) before every row has been pulled into memory.
+
+        This is set up using `fetch_budget` (in bytes) on the session's config
+        (along with `fetch_budget_action`).
+    """
+    def __init__(self, max_bytes, action='raise', chunk_size=1000, sample_size=50):
+        self.max_bytes = max_bytes
+        self.action = action
+        self.chunk_size = chunk_size
+        self.sample_size = sample_size
+
+    def estimate(self, rows):
+        if not rows:
+            return 0
+
+        step = max(len(rows) // self.sample_size, 1)
+        sample = rows[::step]
+        return sum(row_size(row) for row in sample) * len(rows) // len(sample)
+
+    def fetch(self, cursor, sql=None):
+        """
+            Returns every row from the cursor, raising a MemoryBudgetException
+            (or warning) once they take up more than the budget.
+        """
+        rows = []
+        size = 0
+        warned = False
+
+        while True:
+            chunk = cursor.fetchmany(self.chunk_size)
+            if not chunk:
+                return rows
+
+            rows.extend(chunk)
+            size += self.estimate(chunk)
+
+            if size > self.max_bytes and not warned:
+                message = ('The result set for `{0}` is over the budget of {1} '
+                           'bytes ({2} bytes for the first {3} rows).'.format(
+                               sql, self.max_bytes, size, len(rows)))
+
+                if self.action == 'warn':
+                    warnings.warn(message, MemoryBudgetWarning)
+                    warned = True
+                else:
+                    raise MemoryBudgetException(message)
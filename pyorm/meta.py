@@ -16,33 +16,86 @@ class Meta(type):
             cls.auto_primary_key = True
         elif attr == 'auto_filters':
             cls.auto_filters = []
+        elif attr == 'lazy_batch_size':
+            cls.lazy_batch_size = 500
+        elif attr in ('read_server', 'write_server'):
+            setattr(cls, attr, None)
+        elif attr == 'cache_ttl':
+            cls.cache_ttl = None
+        elif attr == 'index_hints':
+            cls.index_hints = False
         else:
             raise AttributeError(attr)
 
         return getattr(cls, attr)
 
+    def __setattr__(cls, attr, value):
+        type.__setattr__(cls, attr, value)
+
+        # Changing an option drops the options cached by options().
+        if attr != '_options':
+            type.__setattr__(cls, '_options', None)
+
+    def options(cls):
+        """
+            Returns the (name, value) pairs of the options copied over to each
+            instance, worked out once and then reused until one of the options
+            is changed.
+        """
+        options = cls.__dict__.get('_options')
+
+        if options is None:
+            options = []
+
+            # Make sure that all the meta options are copied over to the
+            # instance if they are of the correct type, otherwise we assume the
+            # user is doing things that will still return the proper data, and
+            # doesn't need to be copied.
+            if isinstance(cls.db_table, basestring):
+                options.append(('db_table', cls.db_table))
+
+            if isinstance(cls.verbose_name, basestring):
+                options.append(('verbose_name', cls.verbose_name))
+
+            if isinstance(cls.auto_primary_key, bool):
+                options.append(('auto_primary_key', cls.auto_primary_key))
+
+            if isinstance(cls.lazy_batch_size, int) or cls.lazy_batch_size is None:
+                options.append(('lazy_batch_size', cls.lazy_batch_size))
+
+            if isinstance(cls.cache_ttl, (int, float)) or cls.cache_ttl is None:
+                options.append(('cache_ttl', cls.cache_ttl))
+
+            if isinstance(cls.index_hints, bool):
+                options.append(('index_hints', cls.index_hints))
+
+            for server_type in ('read_server', 'write_server'):
+                server = getattr(cls, server_type)
+                if isinstance(server, basestring) or server is None:
+                    options.append((server_type, server))
+                elif isinstance(server, (list, tuple)):
+                    options.append((server_type, tuple(server)))
+
+            cls._options = options
+
+        return options
+
     def __call__(cls, *args, **kwargs):
         instance = cls.__new__(cls)
 
-        # Make sure that all the meta options are copied over to the instance if
-        # they are of the correct type, otherwise we assume the user is doing
-        # things that will still return the proper data, and doesn't need to be
-        # copied.
         instance.owner = weakref.proxy(kwargs['_owner'])
         instance.owner_ref = weakref.ref(kwargs['_owner'])
         del(kwargs['_owner'])
 
-        if isinstance(cls.db_table, basestring):
-            instance.db_table = cls.db_table
-        else:
+        if not isinstance(cls.db_table, basestring):
             instance.db_table = instance.owner.__class__.__name__
 
-        if isinstance(cls.verbose_name, basestring):
-            instance.verbose_name = cls.verbose_name
-
-        if isinstance(cls.auto_primary_key, bool):
-            instance.auto_primary_key = cls.auto_primary_key
+        for name, value in cls.options():
+            if isinstance(value, tuple):
+                value = list(value)
+            setattr(instance, name, value)
 
+        # Filters are copied for each instance, since they can be changed.
         if isinstance(cls.auto_filters, (tuple, list)):
             instance.auto_filters = copy.deepcopy(cls.auto_filters)
 
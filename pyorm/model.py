@@ -1,16 +1,32 @@
 import copy
 import collections
 import functools
+import time
 import weakref
 
-from pyorm.indexes import MetaIndexes
+from pyorm import memory, session
+from pyorm.advisor import access
+from pyorm.column import Column
+from pyorm.dialect import Dialect
+from pyorm.field import Integer, UnboundField
+from pyorm.join import JoinPlanner
+from pyorm.indexes import MetaIndexes, PrimaryKey, Unique
+from pyorm.identity import Row
+from pyorm.loader import BatchLoader, DeferredLoader, Loader
 from pyorm.meta import Meta
 from pyorm.expression import Expression
+from pyorm.registry import registry
+from pyorm.relationship import Relationship, UnboundRelationship
+from pyorm.schema import Migration
 from pyorm.token import *
 
 
 Mapping = collections.namedtuple('Mapping', ('function', 'key_map'))
 
+# Values assigned to a model that are bound to it as a new field or
+# relationship, rather than set as the value of an existing field.
+UNBOUND_TYPES = (UnboundField, UnboundRelationship)
+
 
 class RecordProxy(object):
     """
@@ -43,10 +59,71 @@ class RecordProxy(object):
         self._cloned = False
 
     def __getattr__(self, attr):
-        if not self._cloned and self.idx != self.model.current_idx:
-            self.model = self.model.clone(idx=self.idx)
+        if not self._cloned and self._idx != self._model.current_idx:
+            self._model = self._model.clone(idx=self._idx)
             self._cloned = True
-        return getattr(self.model, attr)
+        return getattr(self._model, attr)
+
+
+class FieldDescriptor(object):
+    """
+        Installed on the model class for each field (see
+        MetaModel.install_descriptors()), so that reading Model.field returns
+        Model.c.field.value, and assigning to it sets the value, without going
+        through Model.__getattr__ or probing the model's fields first.
+
+        A result set is pulled back the first time a field is read if one
+        hasn't been yet.
+    """
+    __slots__ = ('name',)
+
+    def __init__(self, name):
+        self.name = name
+
+    def __get__(self, instance, owner):
+        if instance is None:
+            return type(owner).__getattr__(owner, self.name)
+
+        bound = instance.c.__dict__
+        if self.name not in bound:
+            raise AttributeError(self.name)
+
+        if not instance._result_loaded:
+            instance.get()
+
+        return bound[self.name].value
+
+    def __set__(self, instance, val):
+        try:
+            field = instance.c.__dict__[self.name]
+        except KeyError:
+            raise AttributeError(self.name)
+
+        field.value = val
+
+
+class RelationshipDescriptor(FieldDescriptor):
+    """
+        Installed on the model class for each relationship, so that reading
+        Model.relationship returns Model.r.relationship.model.
+    """
+    __slots__ = ()
+
+    def __get__(self, instance, owner):
+        if instance is None:
+            return type(owner).__getattr__(owner, self.name)
+
+        bound = instance.r.__dict__
+        if self.name not in bound:
+            raise AttributeError(self.name)
+
+        if not instance._result_loaded:
+            instance.get()
+
+        return bound[self.name].model
+
+    def __set__(self, instance, val):
+        raise Exception('Cannot override relationship with another value')
 
 
 def clones(func):
@@ -64,9 +141,12 @@ def clones(func):
     @functools.wraps(func)
     def wrapper(instance, *args, **kwargs):
         new_instance = instance.clone()
+        new_instance.clear_results()
         func(new_instance, *args, **kwargs)
         return new_instance
 
+    return wrapper
+
 
 def results_loaded(func):
     """
@@ -78,6 +158,8 @@ def results_loaded(func):
         instance.result_loaded = True
         return result
 
+    return wrapper
+
 
 class MetaModel(type):
     def __new__(cls, name, bases, attrs):
@@ -95,36 +177,142 @@ class MetaModel(type):
                 new_class._unbound[name] = item
                 delattr(new_class, name)
 
-        indexes = getattr(new_class, 'Indexes', None)
+        # Indexes are only taken from the model itself, since the fields they
+        # refer to aren't inherited.
+        indexes = new_class.__dict__.get('Indexes', None)
 
         if indexes is None:
             new_class.Indexes = type('Indexes', (object,), {})
             indexes = new_class.Indexes
 
+        meta = getattr(new_class, 'Meta', None)
+
+        if meta is None:
+            new_class.Meta = type('Meta', (object,), {})
+            meta = new_class.Meta
+
+        if not hasattr(meta, '__metaclass__'):
+            new_class.Meta = Meta(
+                meta.__name__, meta.__bases__, dict(meta.__dict__.items()))
+
+        new_class.Meta.owner = new_class
+
+        index_attrs = dict((key, val) for key, val in indexes.__dict__.items()
+                           if key != '_unbound')
+        index_defs = [val for val in index_attrs.values() if hasattr(val, 'bind')]
+
+        # If no primary key was defined, build an `id` field to use as the
+        # primary key (unless Meta.auto_primary_key is turned off).
+        if not [index for index in index_defs if index.index_type.primary] and \
+                new_class.Meta.auto_primary_key:
+            if 'id' not in new_class._unbound:
+                new_class._unbound['id'] = Integer(unsigned=True, autoincrement=True)
+                new_class._unbound['id'].idx = 0
+
+            index_attrs['pk'] = PrimaryKey('id')
+            index_defs.append(index_attrs['pk'])
+
         # we add a metaclass here so that when a model is added, it can send itself
         # and have a proxy available when the Index.__init__() method is called. This
         # allows the user to reference the instance in Indexes.__init__() if they
         # choose to do so.
         if not hasattr(indexes, '__metaclass__'):
             new_class.Indexes = MetaIndexes(
-                indexes.__name__, indexes.__bases__, dict(indexes.__dict__.items()))
+                indexes.__name__, indexes.__bases__, index_attrs)
+        elif 'pk' in index_attrs and 'pk' not in indexes.__dict__:
+            new_class.Indexes.pk = index_attrs['pk']
 
         new_class.Indexes.owner = new_class
+        registry.register(new_class)
 
-        meta = getattr(new_class, 'Meta', None)
+        # Record the fields making up the primary and unique keys, so that they
+        # can always be pulled back with the rest of the data (see
+        # Model.fields()), allowing the rows to be updated later on.
+        new_class._primary_key = ()
+        new_class._unique_keys = []
 
-        if meta is None:
-            new_class.Meta = type('Meta', (object,), {})
-            meta = new_class.Meta
+        for index in index_defs:
+            if index.index_type.primary:
+                new_class._primary_key = tuple(index.fields)
+            elif issubclass(index.index_type, Unique) or index.kwargs.get('unique'):
+                new_class._unique_keys.append(tuple(index.fields))
 
-        if not hasattr(meta, '__metaclass__'):
-            new_class.Meta = Meta(
-                meta.__name__, meta.__bases__, dict(meta.__dict__.items()))
+        new_class.install_descriptors()
 
-        new_class.Meta.owner = new_class
-        
         return new_class
 
+    def bindings(cls):
+        """
+            Returns a (name, translated name, unbound object) tuple for each
+            field and relationship to bind to new instances of the model, in
+            the order they were defined.  This is worked out when the class
+            is created (see MetaModel.install_descriptors()), and reused by
+            every instantiation after that.
+        """
+        bindings = cls.__dict__.get('_bindings')
+
+        if bindings is None:
+            bindings = []
+
+            for name, item in cls._unbound.items():
+                # If the name the user was using in the db interfered with one
+                # of the internal model objects, the user is allowed to suffix
+                # the name with '_', so the field 'save' would become 'save_'
+                # in the model definition, and referred to as such in the
+                # python code, but when the field is actually assigned in the
+                # database, it is named 'save' the same can also be done to
+                # avoid conflicts with python keywords.
+                trans_name = name[:-1] if name[-1] == '_' else name
+                bindings.append((item.idx, name, trans_name, item))
+
+            bindings = [binding[1:] for binding in sorted(bindings)]
+            cls._bindings = bindings
+
+        return bindings
+
+    def install_descriptors(cls):
+        """
+            Installs a FieldDescriptor or RelationshipDescriptor on the class
+            for each of its fields and relationships, including the
+            `<name>_id` field added for each relationship without filters.
+            Names that are already taken by something else on the class (a
+            method, say) or used for the state of each instance (`c`, `r` and
+            names starting with `_`) are left to Model.__getattr__, as are
+            fields added to a single instance.
+        """
+        names = []
+
+        for name, trans_name, unbound in cls.bindings():
+            if not isinstance(unbound, UnboundRelationship):
+                names.append((name, FieldDescriptor))
+                continue
+
+            names.append((name, RelationshipDescriptor))
+
+            args = unbound.args
+            if not unbound.kwargs.get('filter', args[2] if len(args) > 2 else None):
+                names.append(('{0}_id'.format(trans_name), FieldDescriptor))
+
+        descriptors = {}
+
+        for name, descriptor_type in names:
+            if name in descriptors or name[0] == '_' or name in ('c', 'r'):
+                continue
+
+            existing = None
+            for base in cls.__mro__:
+                if name in base.__dict__:
+                    existing = base.__dict__[name]
+                    break
+
+            if existing is not None and not isinstance(existing, FieldDescriptor):
+                continue
+
+            descriptors[name] = descriptor_type(name)
+            setattr(cls, name, descriptors[name])
+
+        cls._descriptors = descriptors
+
     def __getattr__(cls, name):
         try:
             return weakref.proxy(cls._unbound[name])
@@ -159,7 +347,9 @@ class MetaModel(type):
         # that is registered as the default.  If this is not done when the
         # model is first instantiated and the session is already dirty, it will
         # make it impossible to change without committing/reverting the session.
-        #instance.objects.session = kwargs.pop('session', default_session)
+        # Otherwise the current session is kept (see Session.use()), so that
+        # the model (and its clones) stay with it once the block has ended.
+        instance._session = kwargs.pop('session', None) or session.current_session()
 
         # Bind actual instances of fields and relationships to the new model
         # instance, so that each model instance has it's own unique copy, and
@@ -168,23 +358,10 @@ class MetaModel(type):
         # This also allows us to automagically pass the name of the unbound
         # object to bound object, so it knows what it is supposed to call itself
         # when it is parsed into sql.
-        for name in cls._unbound:
-
-            # If the name the user was using in the db interfered with one of
-            # the internal model objects, the user is allowed to suffix the name
-            # with '_', so the field 'save' would become 'save_' in the model
-            # definition, and referred to as such in the python code, but when
-            # the field is actually assigned in the database, it is named 'save'
-            # the same can also be done to avoid conflicts with python keywords.
-            if name[-1] == '_':
-                trans_name = name[:-1]
-            else:
-                trans_name = name
-
+        for name, trans_name, unbound in cls.bindings():
             # Place the bound version on the instance as a replacement for the
             # unbound version that exists on the class.
-            getattr(cls, name).bind(name=name, trans_name=trans_name,
-                                    owner=instance)
+            unbound.bind(name=name, trans_name=trans_name, owner=instance)
 
         # Instantiate the indexes class so that any methods defined on it
         # will work properly (including properties)
@@ -196,30 +373,44 @@ class MetaModel(type):
         # method.
         instance.Meta = cls.Meta(_owner=instance)
 
-        # TODO: Move this section to pyorm.meta.Meta
-        # if the read or write server are not defined, use the defaults from the
-        # session data.  If the session doesn't include a default, blow up.
-        for server_type in ('read_server', 'write_server'):
-            '''
-            server = getattr(instance.Meta, server_type,
-                getattr(instance.objects.session, 'default_{0}'.format(server)))
-
-            if isinstance(server, basestring):
-                servers = [copy.copy(server), ]
-                setattr(instance.Meta, server_type, servers)
-            elif isinstance(server, (list, tuple)):
-                servers = copy.deepcopy(server)
-                setattr(instance.Meta, server_type, servers)
-            '''
-
-        instance._fields = Expression(op=OP_COMMA)
-        instance._compound_fields = Expression(op=OP_COMMA)
-        instance._filters = Expression(op=OP_AND)
-        instance._order = Expression(op=OP_COMMA)
-        instance._having = Expression(op=OP_AND)
-        instance._group = Expression(op=OP_COMMA)
-        instance._joined_tables = []
-        instance._mapping = None
+        # If the read or write server are not defined on Meta, the defaults
+        # from the session config are used (see Session.read_server()).
+
+        # The query and result set state is placed straight into the instance
+        # dict, since none of it are fields or relationships, and going through
+        # Model.__setattr__ for each of them is a large part of the cost of
+        # instantiating a model.
+        instance.__dict__.update(
+            _fields=Expression(op=OP_COMMA),
+            _compound_fields=Expression(op=OP_COMMA),
+            _filters=Expression(op=OP_AND),
+            _order=Expression(op=OP_COMMA),
+            _having=Expression(op=OP_AND),
+            _group=Expression(op=OP_COMMA),
+            _joined_tables=[],
+            _deferred=set(),
+            _limit=None,
+            _offset=None,
+            _map=None,
+            _event=None,
+            _prefetch=[],
+            _index_hints=None,
+
+            # Result set state.  `_records` holds the raw rows returned by the
+            # database, while `_loaders` holds the lazy relationship loaders
+            # for the result set, which is shared by any clones made from the
+            # same result set (see RecordProxy), so that a relationship is only
+            # loaded once per batch of rows, rather than once per row.
+            _records=[],
+            _loaders={},
+            _current_idx=0,
+            _result_loaded=False,
+
+            # The result set these rows were loaded for, and the relationships
+            # followed from it to reach them (see pyorm.nplusone).
+            _scope=None,
+            _load_path=None,
+        )
 
         instance.__init__(*args, **kwargs)
 
@@ -229,29 +420,44 @@ class MetaModel(type):
 class Model(object):
     __metaclass__ = MetaModel
 
+    # The descriptors installed for the fields and relationships of the model
+    # (see MetaModel.install_descriptors()), by name.
+    _descriptors = {}
+
     @property
     def owner(self):
-        pass
+        return getattr(self, '_owner', None)
 
     @owner.setter
     def owner(self, val):
-        pass
+        if val is not None:
+            self._owner = weakref.proxy(val)
+            self._owner_ref = weakref.ref(val)
+
+    @property
+    def session(self):
+        """
+            Returns the session the model was created with (or the current
+            session when it was created, see Session.use()), falling back on
+            the current session if there was none at the time.
+        """
+        return self._session or session.current_session()
 
     @property
     def current_idx(self):
-        pass
+        return self._current_idx
 
     @current_idx.setter
     def current_idx(self, idx):
-        pass
+        self._current_idx = idx
 
     @property
     def result_loaded(self):
-        pass
+        return self._result_loaded
 
     @result_loaded.setter
     def result_loaded(self, val):
-        pass
+        self._result_loaded = val
 
     def __copy__(self):
         pass
@@ -268,6 +474,9 @@ class Model(object):
             Also triggers a .get() to be run when a field or relationship
             is accessed but no result has been returned yet.
         """
+        # Fields and relationships defined on the model are read through
+        # their descriptors, so this only handles the ones added to a single
+        # instance.
         if hasattr(self.c, attr):
             if not self.result_loaded:
                 self.get()
@@ -289,7 +498,11 @@ class Model(object):
             overwritten.  If you need to modify a relationship on the fly, they
             can be accessed via Model.r.rel_name.
         """
-        if hasattr(val, 'bind'):
+        descriptor = self._descriptors.get(attr)
+
+        if descriptor is not None and not isinstance(val, UNBOUND_TYPES):
+            descriptor.__set__(self, val)
+        elif hasattr(val, 'bind'):
             if attr[-1] == '_':
                 trans_name = attr[:-1]
             else:
@@ -312,12 +525,100 @@ class Model(object):
         if not self.result_loaded:
             self.get()
 
-        for idx, row in enumerate(self._result):
+        if self._map is not None:
+            for item in self.iter_mapped():
+                yield item
+            return
+
+        for idx, row in enumerate(self._records):
             self.current_idx = idx
-            if self._map is not None:
-                yield self._map.function(**map.args)
-            else:
-                yield RecordProxy(model=self, idx=idx)
+            yield RecordProxy(model=self, idx=idx)
+
+    def iter_mapped(self):
+        """
+            Yields the result of the mapping (see Model.map()) for each row,
+            timing the mapping if the session has any listeners.
+        """
+        session = self.session
+        event = session.instrumentation.start(self) if session is not None else None
+        elapsed = 0.0
+
+        for idx, row in enumerate(self._records):
+            self.current_idx = idx
+
+            if event is not None:
+                start = time.time()
+
+            item = self._map.function(**dict(
+                (key, arg() if isinstance(arg, functools.partial) else arg)
+                for key, arg in self._map.key_map.items()))
+
+            if event is not None:
+                elapsed += time.time() - start
+
+            yield item
+
+        if event is not None:
+            event.rows = len(self._records)
+            event.phases['map'] = elapsed
+            session.instrumentation.emit(event)
+
+    def __reversed__(self):
+        if not self.result_loaded:
+            self.get()
+
+        for idx in range(len(self._records) - 1, -1, -1):
+            self.current_idx = idx
+            yield RecordProxy(model=self, idx=idx)
+
+    def __len__(self):
+        if not self.result_loaded:
+            self.get()
+
+        return len(self._records)
+
+    def __getitem__(self, key):
+        """
+            Slicing a model returns a clone limited to the rows in the slice,
+            which is done by the database using LIMIT/OFFSET:
+                SampleModel.order(C.field1)[20:40]
+
+            Slicing a sliced model slices within the rows of the first slice.
+            Indexing a model pulls back just the row requested, and returns a
+            clone holding that row.
+
+            Large offsets still make the database read (and throw away) every
+            row before the offset, use Model.paginate_after() for deep pages.
+        """
+        if isinstance(key, slice):
+            if key.step not in (None, 1):
+                raise Exception('Models cannot be sliced using a step.')
+
+            start, stop = key.start or 0, key.stop
+            if start < 0 or (stop is not None and stop < 0):
+                raise Exception('Models cannot be sliced using negative indexes.')
+
+            instance = self.clone()
+            instance.clear_results()
+
+            if self._limit is not None:
+                stop = self._limit if stop is None else min(stop, self._limit)
+
+            instance._offset = (self._offset or 0) + start or None
+            instance._limit = None if stop is None else max(stop - start, 0)
+
+            return instance
+
+        if key < 0:
+            raise Exception('Models cannot be indexed using negative indexes.')
+
+        instance = self[key:key + 1]
+        instance.get()
+
+        if not instance._records:
+            raise IndexError(key)
+
+        return instance
 
     @clones
     def fields(self, *fields, **compound_fields):
@@ -336,14 +637,15 @@ class Model(object):
             rows are necessary.  It also allows the user to push some of the
             calculations to the database server when it is quicker to 
         """
-        # TODO: Build out field creation objects (CharField, IntField, etc.)
         # we compute the hashes of the already selected fields, so that we only
         # pull back a single instance of the data.  This prevents us from using
         # more bandwidth than necessary.
-        hashed_fields = [hash(field) for field in self._fields]
+        hashed_fields = [hash(token.value) for token in self._fields._tokens
+                         if token.type != T_OPR]
         for field in fields:
-            if hash(arg) not in hashed_fields:
-                self._fields.append(arg)
+            if hash(field) not in hashed_fields:
+                self._fields.append(field)
+                hashed_fields.append(hash(field))
 
         for key, val in compound_fields.items():
             # If the user redefines an already existing key here, and the
@@ -353,64 +655,583 @@ class Model(object):
 
             # It should be noted that they cannot replace a column defined on
             # this table, and attempting to do so will throw an exception.
-            if not (hasattr(self.c, key) or
-                    hasattr(self.r, key)) or issubclass(getattr(self.c, key), CompoundField):
-                if issubclass(val.__class__, Model):
-                    val.parent = self
-                setattr(self.c, key, CompoundField(name=key, expression=val))
-            else:
-                raise('Failed to add field `{0}` item already exists for this model.')
+            if hasattr(self.c, key) or hasattr(self.r, key):
+                raise Exception(
+                    'Failed to add field `{0}` item already exists for this '
+                    'model.'.format(key))
+
+            if not isinstance(val, Expression):
+                val = Expression(val)
+            val.alias = key
+
+            self._compound_fields = Expression(*[
+                token.value for token in self._compound_fields._tokens
+                if token.type != T_OPR and token.value.alias != key] + [val],
+                op=OP_COMMA)
+
+    @clones
+    def defer(self, *fields):
+        """
+            Leaves the fields passed out of the query, unless they are
+            explicitly requested using Model.fields().  Deferred fields are
+            pulled back for the whole batch of rows the first time one of them
+            is accessed (see Meta.lazy_batch_size).  Fields can also be
+            deferred by default using `deferred=True` when defining the field.
+
+            Useful for tables containing binary data or large text fields
+            which are rarely needed:
+                SampleModel.defer(C.blob)
+        """
+        for field in fields:
+            if len(field._path) > 1:
+                raise Exception(
+                    'Only fields on the model itself can be deferred, not '
+                    '`{0}`.'.format('.'.join(field._path)))
+
+            self._deferred.add(field._path[0])
+
+    def load_deferred(self, name):
+        """
+            Loads the deferred field `name` for the batch of rows containing
+            the current row.
+        """
+        loader = self._loaders.get(name)
+
+        if loader is None:
+            loader = DeferredLoader(
+                self, name, batch_size=self.Meta.lazy_batch_size)
+            self._loaders[name] = loader
+
+        loader.load(self._records, self.current_idx)
+
+    @clones
+    def prefetch(self, *paths):
+        """
+            Loads the relationships passed for the whole result set as soon as
+            it is pulled back, using one query per relationship (or per
+            Meta.lazy_batch_size rows), rather than loading them as they are
+            accessed:
+                SampleModel.prefetch('relationship1', 'relationship1.other')
+
+            Relationships of related models are given as dotted paths, and are
+            loaded for every row of the related model at once, rather than
+            separately for the related rows of each row.
+        """
+        self._prefetch.extend(path for path in paths if path not in self._prefetch)
+
+    def prefetch_path(self, names):
+        owner = self
+        records = self._records
+        loaders = self._loaders
+
+        for name in names:
+            relationship = getattr(owner.r, name, None)
+            if relationship is None:
+                raise Exception('Model `{0}` has no relationship `{1}`.'.format(
+                    owner.Meta.verbose_name, name))
+
+            loader = loaders.get(name)
+            if loader is None or not loader.complete:
+                loader = BatchLoader(relationship,
+                                     batch_size=owner.Meta.lazy_batch_size)
+                loader.fetch_all(records)
+                loaders[name] = loader
+
+            records = loader.records
+            loaders = loader.child_loaders
+            owner = relationship.target(session=self._session)
+
+    @clones
+    def index_hints(self, enabled=True):
+        """
+            Turns index hints on or off for this query, overriding
+            Meta.index_hints (off by default).  With hints on, a query whose
+            fields, filters, ordering and grouping only use columns held by one
+            of the model's Indexes is told to read from that index (using
+            `INDEXED BY` on SQLite and `USE INDEX` on MySQL, PostgreSQL takes
+            no hints), and the unique key fields added by Model.fields() are
+            limited to those the index holds, so that the database can answer
+            the query from the index without reading the table:
+                SampleModel.fields(C.name).filters(C.group_id == 1).index_hints()
+
+            Since naming an index the server doesn't have makes the query
+            fail, the index is first looked up in the live schema of the read
+            server (see pyorm.schema.SchemaCache), and the query is left as it
+            would be without hints if it's missing.  Model.compile() has no
+            server to check, so it always names the index.
+        """
+        self._index_hints = enabled
 
     @clones
     def filters(self, *args):
         for arg in args:
-            for token in arg.tokens:
-                if token.type == T_COL:
-                    pass
+            self._filters.append(arg)
 
     @clones
     def order(self, *args):
-        pass
+        for arg in args:
+            self._order.append(arg)
+
+    def paginate_after(self, last_row=None, size=None):
+        """
+            Returns the page of `size` rows following `last_row`, using the
+            values of the ordering columns (plus the primary key, to keep the
+            ordering stable) from `last_row` to filter out the rows which come
+            before it, rather than an OFFSET:
+                page = SampleModel.order(-C.created)[:50]
+                page = SampleModel.order(-C.created).paginate_after(page[49], 50)
+
+            Since the database can seek straight to the start of the page
+            (given an index on the ordering columns), every page costs about
+            the same as the first one, no matter how deep it is.
+
+            `last_row` can be a row from a previous page, or a dict of the
+            values for the ordering columns, keyed the same way as the columns
+            are labelled in the result set.  Passing None returns the first
+            page.  The ordering columns must be selected by the query, and
+            can't be NULL.
+        """
+        keys = self._keyset()
+        ordered = len(self._order_keys())
+        instance = self.order(*[
+            Column(path=list(path)) for path, descending in keys[ordered:]])
+
+        if last_row is not None:
+            if not isinstance(last_row, dict):
+                last_row = last_row._records[last_row.current_idx]
+
+            values = []
+            for path, descending in keys:
+                label = '.'.join(path)
+                if label not in last_row:
+                    raise Exception(
+                        'Cannot paginate after a row without a value for '
+                        '`{0}`, make sure it is selected.'.format(label))
+                elif last_row[label] is None:
+                    raise Exception(
+                        'Cannot paginate on `{0}`, since it is NULL.'.format(label))
+
+                values.append(last_row[label])
+
+            instance._filters.append(self._keyset_filter(keys, values))
+
+        instance._offset = None
+        instance._limit = size
+
+        return instance
+
+    def iter_chunks(self, size=10000):
+        """
+            Walks through every row matching the model's filters in primary key
+            order, `size` rows at a time, yielding each chunk as a separate
+            result set:
+                for chunk in SampleModel.filters(C.field1 == 1).iter_chunks():
+                    for row in chunk:
+                        # Do something with the row here
+
+            Each chunk is pulled back using `WHERE pk > last ORDER BY pk LIMIT
+            size`, so it can be read straight from the primary key index, and
+            no transaction or cursor needs to be held open between chunks.
+            This makes it suitable for migrations and backfills over huge
+            tables, where an OFFSET scan would get slower with every chunk.
+
+            Any ordering or slicing on the model is ignored.
+        """
+        instance = self.clone()
+        instance.clear_results()
+        instance._order = Expression(op=OP_COMMA)
+        last_row = None
+
+        while True:
+            chunk = instance.paginate_after(last_row, size)
+            chunk.get()
+
+            if not chunk._records:
+                return
+
+            yield chunk
+
+            if len(chunk._records) < size:
+                return
+
+            last_row = dict((field, chunk._records[-1][field])
+                            for field in self._primary_key)
+
+    def parallel_get(self, workers=None, partition=None):
+        """
+            Pulls back every row matching the model's filters by splitting the
+            range of values in `partition` (the primary key by default) into
+            one range per worker, and reading each range from a separate
+            process, each with its own connection to the model's read server:
+                columns = SampleModel.filters(C.field1 == 1).parallel_get(4)
+
+            The rows come back as a dict of columns (lists of values keyed by
+            column label), in the order of the ranges.  This is intended for
+            large analytics scans, where converting the rows is as expensive
+            as pulling them back, so only integer partition columns are
+            supported, and the model can't be sliced.
+        """
+        # Imported here, since multiprocessing is slow to import and most
+        # programs never need it.
+        from pyorm import parallel
+
+        if workers is None:
+            workers = parallel.multiprocessing.cpu_count()
+
+        if partition is None:
+            if len(self._primary_key) != 1:
+                raise Exception(
+                    'Model `{0}` needs a partition column, since it does not '
+                    'have a single column primary key.'.format(
+                        self.Meta.verbose_name))
+
+            partition = Column(path=[self._primary_key[0]])
+
+        if self._limit is not None or self._offset:
+            raise Exception('Sliced models cannot be read in parallel.')
+
+        return parallel.parallel_get(self, workers, partition)
+
+    def _order_keys(self):
+        """
+            Returns a (path, descending) pair for each of the ordering columns.
+        """
+        keys = []
+
+        for token in self._order._tokens:
+            if token.type == T_OPR:
+                continue
+
+            item, descending = token.value, False
+            if token.type == T_EXP and item.op in (OP_ASC, OP_DESC) and \
+                    len(item._tokens) == 1:
+                item, descending = item._tokens[0].value, item.op == OP_DESC
+
+            if getattr(item, 'token_type', None) != T_COL:
+                raise Exception(
+                    'Only columns can be used to paginate, not expressions.')
+
+            keys.append((tuple(item._path), descending))
+
+        return keys
+
+    def _keyset(self):
+        """
+            Returns the ordering columns, followed by any primary key columns
+            which aren't already used for ordering.
+        """
+        keys = self._order_keys()
+
+        if not self._primary_key:
+            raise Exception(
+                'Cannot paginate model `{0}` without a primary key.'.format(
+                    self.Meta.verbose_name))
+
+        paths = set(path for path, descending in keys)
+        for field in self._primary_key:
+            if (field,) not in paths:
+                keys.append(((field,), False))
+
+        return keys
+
+    def _keyset_filter(self, keys, values):
+        """
+            Builds the filter for the rows after `values`:
+                a >= 1 AND (a > 1 OR (a = 1 AND b > 2))
+
+            The leading range on the first column is redundant, but lets the
+            database use it to seek into the index.
+        """
+        def after(path, descending, value, inclusive=False):
+            column = Column(path=list(path))
+            if descending:
+                return column <= value if inclusive else column < value
+
+            return column >= value if inclusive else column > value
+
+        alternatives = Expression(op=OP_OR)
+        for idx, ((path, descending), value) in enumerate(zip(keys, values)):
+            alternatives.append(Expression(*[
+                Column(path=list(key_path)) == key_value
+                for (key_path, key_descending), key_value in zip(
+                    keys[:idx], values[:idx])] + [after(path, descending, value)],
+                op=OP_AND))
+
+        (path, descending), value = keys[0], values[0]
+        if len(keys) == 1:
+            return alternatives
+
+        return Expression(after(path, descending, value, inclusive=True),
+                          alternatives, op=OP_AND)
 
     @clones
     def having(self, *args):
-        pass
+        for arg in args:
+            self._having.append(arg)
 
     @clones
     def group(self, *args):
-        pass
+        for arg in args:
+            self._group.append(arg)
 
     @clones
     def join(self, label=None, model=None, join_type=None, filters=None):
-        pass
+        """
+            Forces a relationship to be joined, or changes the way it is
+            joined.  Relationships referenced by the fields, filters, grouping,
+            having or ordering are joined automatically, so this is only needed
+            to change the join type of an existing relationship:
+                SampleModel.join('relationship1', join_type='left')
+
+            or to join a model that doesn't have a relationship defined:
+                SampleModel.join('extra', model=ExtraModel,
+                                 filters=[C.field1 == C.extra.field1])
+
+            Inner joins whose columns are never used are still checked for
+            the existence of a matching row (using `EXISTS`), other joins whose
+            columns are never used are dropped from the query.
+        """
+        if model is not None:
+            setattr(self, label, Relationship(
+                model, filter=filters, join=join_type or 'inner'))
+        elif join_type is not None:
+            getattr(self.r, label).join = join_type
+
+        if label not in self._joined_tables:
+            self._joined_tables.append(label)
+
+    def compile(self, dialect=None):
+        """
+            Returns the select statement for the model's current fields,
+            filters, grouping, having and ordering, along with the list of
+            literals to be sent with it.
+        """
+        if dialect is None:
+            dialect = Dialect()
+
+        return dialect.select(self)
+
+    def execute(self, model=None):
+        """
+            Runs the select statement for `model` (this model by default) on
+            the model's read server, returning the column labels and rows.
+
+            If the session has any listeners (see pyorm.events), the query is
+            timed, and the event is sent once the rows are loaded.
+        """
+        if self.session is None:
+            raise Exception('No session is available to read `{0}` from.'.format(
+                self.Meta.verbose_name))
+
+        # Pending writes are sent first, so that they show up in the results.
+        self.session.flush()
+
+        model = self if model is None else model
+        server = self.session.read_server(self)
+        event = self.session.start_event(self)
+
+        if event is not None:
+            start = time.time()
+            if self.session.advisor is not None:
+                event.access = access(model)
+
+            for expression in (model._fields, model._compound_fields,
+                               model._filters, model._order, model._having,
+                               model._group):
+                expression.tokens
+            start = event.time('flatten', start)
+
+        sql, literals = self.session.dialect(server).select(
+            model, functools.partial(self.session.schema.indexes, server))
+
+        if event is not None:
+            event.time('compile', start)
+
+        # The tables read from are only needed to key the cached results.
+        ttl = self.Meta.cache_ttl
+        result = self.session.execute(
+            server, sql, literals, tables=model.tables() if ttl else (), ttl=ttl,
+            event=event)
+
+        self._event = event
+        return result
+
+    def tables(self):
+        """
+            Returns the tables read from by the model's select statement.
+        """
+        tables = set([self.Meta.db_table])
+
+        for node in JoinPlanner(self).plan():
+            tables.add(node.model.Meta.db_table)
+
+        return tables
+
+    def load(self, labels, rows):
+        """
+            Replaces the result set with the rows passed.  If the rows include
+            the primary key, rows already loaded by the session are reused
+            (and refreshed), so each row is only held once.
+        """
+        self.clear_results()
+        records = [Row(zip(labels, row)) for row in rows]
+
+        identity = getattr(self.session, 'identity', None)
+        primary_key = self._primary_key
+
+        if identity is not None and primary_key and \
+                not set(primary_key) - set(labels):
+            table = self.Meta.db_table
+            records = [identity.merge(
+                table, tuple(record[field] for field in primary_key), record)
+                for record in records]
+
+        self._records = records
+
+        detector = getattr(self.session, 'nplusone', None)
+        if detector is not None:
+            self._scope = detector.scope()
+
+        if self.session is not None:
+            self.session.track(self)
+
+        for path in self._prefetch:
+            self.prefetch_path(path.split('.'))
+
+        if self._event is not None:
+            self.convert(self._event)
+            self._event = None
+
+    def convert(self, event):
+        """
+            Converts every value in the result set up front (rather than as
+            each field is accessed), so that the time spent converting can be
+            added to `event`, which is then sent to the session's listeners.
+        """
+        start = time.time()
+
+        for name, field in vars(self.c).items():
+            for record in self._records:
+                converted = getattr(record, 'converted', None)
+                if converted is not None and name in record and \
+                        name not in converted:
+                    converted[name] = field.to_python(record[name])
+
+        event.time('convert', start)
+        self.session.instrumentation.emit(event)
+
+    def memory_usage(self):
+        """
+            Returns the approximate bytes held by the model's result set, as a
+            dict holding the number of `rows`, and the bytes held by the
+            `records` themselves, the `converted` values cached on them, the
+            values cached on the `fields`, and the rows loaded for
+            `relationships`, along with the `total`.
+
+            Clones of the model (such as the ones made by RecordProxy) share
+            the same result set, so they don't add to it.
+        """
+        return memory.usage(self)
+
+    def _pk_key(self, pk):
+        if not self._primary_key:
+            raise Exception('Model `{0}` does not have a primary key.'.format(
+                self.Meta.verbose_name))
+
+        key = tuple(pk) if isinstance(pk, (tuple, list)) else (pk,)
+        if len(key) != len(self._primary_key):
+            raise Exception('Expected {0} primary key values for `{1}`.'.format(
+                len(self._primary_key), self.Meta.verbose_name))
+
+        return key
+
+    def get_by_pk(self, pk):
+        """
+            Returns a clone of the model holding the row with the primary key
+            passed (a tuple for multi-column primary keys), or None if there
+            is no such row.
+
+            If the row is already loaded somewhere else in the session, it is
+            returned without running a query.  The model's filters are not
+            applied to rows found in the session.
+        """
+        result = self.get_many([pk])
+        return result if len(result._records) else None
+
+    def get_many(self, pks):
+        """
+            Returns a clone of the model holding the rows with the primary keys
+            passed, in the same order (skipping any that don't exist).  Rows
+            that are already loaded in the session are reused, and the rest
+            are pulled back using a single query.
+        """
+        keys = [self._pk_key(pk) for pk in pks]
+        identity = getattr(self.session, 'identity', None)
+        table = self.Meta.db_table
+        rows = {}
+
+        if identity is not None:
+            for key in keys:
+                row = identity.get(table, key)
+                if row is not None:
+                    rows[key] = row
+
+        missing = set(key for key in keys if key not in rows)
+        if missing:
+            model = self.filters(Loader().filters(self._primary_key, missing))
+            model._limit = model._offset = None
+            model.get()
+
+            for record in model._records:
+                rows[tuple(record[field] for field in self._primary_key)] = record
+
+        instance = self.clone()
+        instance.clear_results()
+        instance._records = [rows[key] for key in keys if key in rows]
+        instance.result_loaded = True
+
+        return instance
 
     @results_loaded
     def scalar(self):
         """
             Returns the first value of the first row based on the filters assigned.
         """
-        pass
+        labels, rows = self.execute(self[:1])
+
+        if not rows:
+            raise Exception('No rows were returned for `{0}`.'.format(
+                self.Meta.verbose_name))
+
+        self.load(labels, rows)
+        return rows[0][0]
 
     @results_loaded
     def one(self):
         """
             Returns a single row based on the filters assigned
         """
-        pass
+        self.load(*self.execute(self[:1]))
+        return self
 
     @results_loaded
     def get(self):
         """
             Returns all results based on the filters assigned
         """
-        pass
+        self.load(*self.execute())
+        return self
 
     @results_loaded
     def all(self):
         """
             Returns all results for the table, regardless of the filters assigned
         """
-        pass
+        model = self.clone()
+        model._filters = Expression(op=OP_AND)
+
+        self.load(*self.execute(model))
+        return self
 
     def clone(self, idx=None):
         """
@@ -423,8 +1244,64 @@ class Model(object):
             If you have custom code that needs to be run when a model is cloned, feel
             free to override this method, just make sure that Model.clone() is triggered
             before carrying out your operations.
+
+            The clone shares the result set (and the lazy relationship loaders
+            attached to it) with the original, so cloning from a RecordProxy
+            does not copy any row data.
         """
-        pass
+        cls = self.__class__
+        instance = cls(session=self._session)
+
+        # Fields and relationships added to this instance after it was
+        # created aren't known to the class, so they need to be re-bound to
+        # the clone.
+        for holder in (self.c, self.r):
+            for name, item in vars(holder).items():
+                if name not in cls._unbound:
+                    setattr(instance, name, item.unbound_field)
+
+        for name, relationship in vars(self.r).items():
+            getattr(instance.r, name).join = relationship.join
+
+        for attr in ('_fields', '_compound_fields', '_filters', '_order',
+                     '_having', '_group'):
+            setattr(instance, attr, copy.copy(getattr(self, attr)))
+
+        instance._joined_tables = self._joined_tables[:]
+        instance._deferred = set(self._deferred)
+        instance._limit = self._limit
+        instance._offset = self._offset
+        instance._map = self._map
+        instance._prefetch = self._prefetch[:]
+        instance._index_hints = self._index_hints
+        instance._records = self._records
+        instance._loaders = self._loaders
+        instance._scope = self._scope
+        instance._load_path = self._load_path
+        instance.result_loaded = self.result_loaded
+        instance.current_idx = self.current_idx if idx is None else idx
+
+        return instance
+
+    def clear_results(self):
+        """
+            Drops the result set from this model (without touching any of the
+            filters, fields, etc. that have been assigned), so that the next
+            access will trigger a new query.
+        """
+        self._records = []
+        self._loaders = {}
+        self.current_idx = 0
+        self.result_loaded = False
+
+        # The fields hold on to the value read for the row they were last
+        # accessed on, which would otherwise look current again once the new
+        # result set is loaded.  Values set on the model but not yet written
+        # are kept.
+        for field in vars(self.c).values():
+            field._idx = None
+            if not field._changed:
+                field._value = None
 
     def map(self, func, args):
         """
@@ -445,7 +1322,7 @@ class Model(object):
                 # This compiles the column path to a partial which can be run on
                 # iteration, that way there is no issue with accessing values prior to
                 # a Model.get() being performed.
-                return functools.partial(functools.reduce, (getattr, arg._path, self))
+                return functools.partial(functools.reduce, getattr, arg._path, self)
             else:
                 return arg
 
@@ -455,7 +1332,67 @@ class Model(object):
     def reset_map(self):
         self._map = None
 
-    def insert(self, ignore=False, *rows, **fields):
+    def _write_session(self):
+        if self.session is None:
+            raise Exception('No session is available to write `{0}` to.'.format(
+                self.Meta.verbose_name))
+
+        return self.session
+
+    def _changed_fields(self):
+        """
+            Returns the values set on the fields of the model since they were
+            last written, marking them as written.
+        """
+        values = {}
+
+        for name, field in vars(self.c).items():
+            if field._changed:
+                values[name] = field._value
+                field._changed = False
+
+        return values
+
+    def _columns(self, values):
+        """
+            Converts a dict of field names and python values into a list of
+            columns and a list of the values to send to the database, with the
+            columns in the order the fields were defined.
+        """
+        fields = []
+
+        for name in values:
+            field = getattr(self.c, name, None)
+            if field is None:
+                raise Exception('Model `{0}` has no field `{1}`.'.format(
+                    self.Meta.verbose_name, name))
+            fields.append(field)
+
+        fields.sort(key=lambda field: field.idx)
+
+        return ([field.trans_name for field in fields],
+                [field.to_db(values[field.name]) for field in fields])
+
+    def _insert(self, action, rows, fields):
+        session = self._write_session()
+        rows = list(rows)
+
+        if fields:
+            rows.append(fields)
+        elif not rows:
+            rows.append(self._changed_fields())
+
+        for row in rows:
+            if not row:
+                raise Exception('No values were given to insert into `{0}`.'.format(
+                    self.Meta.verbose_name))
+
+            columns, values = self._columns(row)
+            session.unit_of_work.register(self, action, columns, values)
+
+        return self
+
+    def insert(self, *rows, **fields):
         """
             Model.insert can be used one of three ways:
                 Using the data already set on the fields of Model:
@@ -467,8 +1404,15 @@ class Model(object):
 
                 Using the fields passed as keyword args to quickly insert data:
                     Model.insert(field1=data1, field2=data2, field3=data3)
+
+            Passing ignore=True skips rows which would break a unique key.
+
+            The rows are written when the session is next flushed (see
+            Session.flush()), along with any other pending writes to the same
+            table, using a single statement.
         """
-        pass
+        action = 'ignore' if fields.pop('ignore', False) else 'insert'
+        return self._insert(action, rows, fields)
 
     def replace(self, *rows, **fields):
         """
@@ -483,16 +1427,124 @@ class Model(object):
                 Using the fields passed as keyword args to quickly replace data:
                     Model.replace(field1=data1, field2=data2, field3=data3)
         """
-        pass
+        return self._insert('replace', rows, fields)
 
-    def update(self):
-        pass
+    def _current_key(self):
+        """
+            Returns the names and values of the primary key for the current
+            row, pulling back the result set if it hasn't been loaded yet.
+        """
+        if not self._primary_key:
+            raise Exception('Model `{0}` does not have a primary key.'.format(
+                self.Meta.verbose_name))
+
+        if not self.result_loaded:
+            self.get()
+
+        if not self._records:
+            raise Exception('No rows were returned for `{0}`.'.format(
+                self.Meta.verbose_name))
+
+        record = self._records[self.current_idx]
+        missing = [field for field in self._primary_key if field not in record]
+        if missing:
+            raise Exception('The primary key for `{0}` was not pulled back.'.format(
+                self.Meta.verbose_name))
+
+        columns = [getattr(self.c, field).trans_name for field in self._primary_key]
+        return columns, [record[field] for field in self._primary_key]
+
+    def update(self, **fields):
+        """
+            Writes the changes made to the current row, either through its
+            fields, or passed as keyword args:
+                model.field1 = data1
+                model.update()
+
+                for row in SampleModel.filters(C.field1 == 1):
+                    row.update(field2=data2)
+
+            As with inserts, the change is sent when the session is next
+            flushed.
+        """
+        session = self._write_session()
+        keys, key_values = self._current_key()
+
+        values = self._changed_fields()
+        values.update(fields)
+
+        if not values:
+            return self
+
+        columns, column_values = self._columns(values)
+        session.unit_of_work.register(
+            self, 'update', columns, column_values + key_values, keys=keys)
+
+        # Keep the current row in line with what was written.
+        record = self._records[self.current_idx]
+        converted = getattr(record, 'converted', None)
+
+        for name, value in values.items():
+            field = getattr(self.c, name)
+            record[name] = field.to_db(value)
+            if converted is not None:
+                converted[name] = value
+            field._value = value
+            field._idx = self.current_idx
+
+        return self
 
     def delete(self, cascade=False):
-        pass
+        """
+            Deletes every row in the result set (pulling it back first if it
+            hasn't been loaded yet) when the session is next flushed.
+        """
+        if cascade:
+            raise Exception('Cascading deletes are not supported.')
+
+        session = self._write_session()
+
+        if not self.result_loaded:
+            self.get()
+
+        for idx in range(len(self._records)):
+            self.current_idx = idx
+            keys, values = self._current_key()
+            session.unit_of_work.register(self, 'delete', (), values, keys=keys)
+
+        self.clear_results()
+        return self
 
     def truncate(self):
-        pass
+        """
+            Deletes every row of the model's table on each of the servers the
+            model writes to, straight away rather than on the next flush (any
+            pending writes are sent first).  The results cached for queries
+            reading from the table are dropped, like any other write.  Note
+            that MySQL commits the current transaction when truncating a table.
+        """
+        session = self._write_session()
+        session.flush()
+
+        for server in session.servers(self, 'write_server'):
+            session.execute(server, session.dialect(server).truncate(
+                self.Meta.db_table))
+
+        self.clear_results()
+        return self
 
     def create(self):
-        pass
+        """
+            Creates the model's table (along with its indexes) on each of the
+            servers the model writes to that doesn't have it yet, returning
+            the statements run on each server.  Use pyorm.schema.Migration to
+            bring existing tables up to date as well.
+        """
+        migration = Migration(self.session, [type(self)])
+        diffs = {}
+        for server, server_diffs in migration.diffs().items():
+            created = [diff for diff in server_diffs if diff.create]
+            if created:
+                diffs[server] = created
+
+        return migration.run(diffs)
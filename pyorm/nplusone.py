@@ -0,0 +1,95 @@
+import collections
+import random
+import warnings
+
+from pyorm.slowlog import call_site
+
+
+class NPlusOneWarning(UserWarning):
+    pass
+
+
+class NPlusOneException(Exception):
+    pass
+
+
+class LoadScope(object):
+    """
+        Counts the queries run to lazily load each relationship path (such as
+        `Author.books.reviews`) for a single result set, including the
+        relationships of the rows loaded through it.
+    """
+    __slots__ = ('sampled', 'counts', 'reported', '__weakref__')
+
+    def __init__(self, sampled=True):
+        self.sampled = sampled
+        self.counts = {}
+        self.reported = set()
+
+
+class NPlusOneDetector(object):
+    """
+        Watches the queries run to lazily load relationships (see
+        Relationship.model), and reports any relationship path that needs
+        more than `threshold` queries while working through a single result
+        set, which usually means the relationship is being loaded one row at
+        a time (the N+1 query problem).
+
+        Only `sample_rate` of the result sets are watched, so this can be
+        left on in production at a low rate.  Each report holds the
+        relationship path, the number of queries, the line of code that
+        caused the last of them, and the call that would load the
+        relationship up front (see Model.prefetch()).  Reports are kept in
+        `reports`, and depending on `action` a NPlusOneWarning is issued
+        (`warn`), a NPlusOneException is raised (`raise`), or the report is
+        passed to `action` if it is callable (to record a metric, say).
+
+        This is set up using `nplusone_threshold` on the session's config
+        (along with `nplusone_sample_rate` and `nplusone_action`).
+    """
+    def __init__(self, threshold=10, sample_rate=1.0, action='warn', limit=100):
+        self.threshold = threshold
+        self.sample_rate = sample_rate
+        self.action = action
+        self.reports = collections.deque(maxlen=limit)
+
+    def scope(self):
+        """
+            Returns the LoadScope for a newly loaded result set.
+        """
+        return LoadScope(self.sample_rate >= 1 or random.random() < self.sample_rate)
+
+    def record(self, scope, path):
+        """
+            Records a query run to lazily load the relationship `path` (a
+            tuple of the model name followed by relationship names) within
+            `scope`.
+        """
+        if scope is None or not scope.sampled:
+            return
+
+        count = scope.counts[path] = scope.counts.get(path, 0) + 1
+
+        if count > self.threshold and path not in scope.reported:
+            scope.reported.add(path)
+            self.report(path, count)
+
+    def report(self, path, count):
+        report = {
+            'path': '.'.join(path),
+            'queries': count,
+            'call_site': call_site(),
+            'suggestion': "{0}.prefetch('{1}')".format(path[0], '.'.join(path[1:])),
+        }
+        self.reports.append(report)
+
+        message = ('Relationship `{path}` was lazily loaded using {queries} '
+                   'queries (at {call_site}), consider loading it up front '
+                   'using {suggestion}.'.format(**report))
+
+        if self.action == 'raise':
+            raise NPlusOneException(message)
+        elif callable(self.action):
+            self.action(report)
+        else:
+            warnings.warn(message, NPlusOneWarning)
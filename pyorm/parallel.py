@@ -0,0 +1,118 @@
+import collections
+import functools
+import multiprocessing
+
+from pyorm.column import Column
+from pyorm.session import Session
+
+
+def partitions(lower, upper, count):
+    """
+        Splits the range of integers from `lower` to `upper` (inclusive) into
+        at most `count` (start, end) ranges of roughly equal size, `end` being
+        exclusive.
+    """
+    size = max(-(-(upper - lower + 1) // count), 1)
+
+    return [(start, min(start + size, upper + 1))
+            for start in range(lower, upper + 1, size)]
+
+
+def converters(model, labels):
+    """
+        Returns the function used to convert the values of each of the column
+        labels passed, following relationships for labels like `rel.field`.
+    """
+    functions = []
+
+    for label in labels:
+        path = label.split('.')
+        target = model
+
+        try:
+            for name in path[:-1]:
+                target = getattr(target.r, name).target()
+
+            functions.append(getattr(target.c, path[-1]).to_python)
+        except AttributeError:
+            # Compound fields aren't defined on the model, so the values are
+            # left as they are.
+            functions.append(None)
+
+    return functions
+
+
+def fetch_partition(task):
+    """
+        Runs the query for a single partition, and returns the labels for the
+        columns pulled back along with the converted values for each column.
+
+        This runs in a worker process, so it opens its own connection, and
+        only receives things that can be pickled (the model class rather than
+        the model instance).
+    """
+    model_class, config, server, sql, literals = task
+    connection = Session(config).connect(server)
+
+    try:
+        cursor = connection.cursor()
+        cursor.execute(sql, literals)
+        labels = [column[0] for column in cursor.description]
+        rows = cursor.fetchall()
+    finally:
+        connection.close()
+
+    columns = []
+    for function, values in zip(converters(model_class(), labels), zip(*rows)):
+        columns.append(list(values) if function is None else
+                       [function(value) for value in values])
+
+    return labels, columns or [[] for label in labels]
+
+
+def parallel_get(model, workers, partition):
+    """
+        Splits the rows matching the model's filters into `workers` ranges
+        of the `partition` column, pulls each range back in a separate
+        process, and concatenates the columns returned for each range.
+    """
+    session = model.session
+    if session is None:
+        raise Exception('No session is available to read `{0}` from.'.format(
+            model.Meta.verbose_name))
+
+    server = session.read_server(model)
+    dialect = session.dialect(server)
+
+    labels, rows = session.execute(server, *dialect.bounds(model, partition))
+    lower, upper = rows[0]
+
+    result = collections.OrderedDict()
+    if lower is None:
+        return result
+
+    if not all(isinstance(bound, (int, long)) for bound in (lower, upper)):
+        raise Exception(
+            'Only integer columns can be used to partition `{0}`.'.format(
+                model.Meta.verbose_name))
+
+    tasks = []
+    for start, end in partitions(lower, upper, workers):
+        column = Column(path=list(partition._path))
+        sql, literals = dialect.select(model.filters(
+            column >= start, Column(path=list(partition._path)) < end),
+            functools.partial(session.schema.indexes, server))
+        tasks.append((type(model), session._config_class, server, sql, literals))
+
+    pool = multiprocessing.Pool(processes=min(workers, len(tasks)))
+    try:
+        chunks = pool.map(fetch_partition, tasks)
+    finally:
+        pool.close()
+        pool.join()
+
+    for labels, columns in chunks:
+        for label, values in zip(labels, columns):
+            result.setdefault(label, []).extend(values)
+
+    return result
@@ -0,0 +1,469 @@
+import collections
+import os
+import re
+import threading
+import time
+
+from pyorm.cache import QueryCache
+
+
+# Statements which only read, unless a WITH or EXPLAIN holds a write (see
+# writes()).
+read_pattern = re.compile(r'^\s*(SELECT|WITH|EXPLAIN|SHOW)\b', re.IGNORECASE)
+
+# Matches a write anywhere in a statement, for the statements which can hold
+# one without starting with it (`WITH old AS (...) DELETE FROM ...`, or
+# `EXPLAIN ANALYZE UPDATE ...`, which runs the update).
+embedded_write_pattern = re.compile(
+    r'\b' + QueryCache.write_pattern.pattern.lstrip('^'), re.IGNORECASE)
+
+
+def writes(sql):
+    """
+        Returns whether running the statement can leave uncommitted changes
+        on the connection: any write matched by QueryCache.write_pattern,
+        along with schema changes and anything else which isn't a SELECT,
+        SHOW, or a WITH or EXPLAIN without a write in it.
+    """
+    if QueryCache.write_pattern.match(sql):
+        return True
+
+    match = read_pattern.match(sql)
+    if match is None:
+        return True
+
+    return match.group(1).upper() in ('WITH', 'EXPLAIN') and \
+        embedded_write_pattern.search(sql) is not None
+
+
+class PoolTimeoutException(Exception):
+    pass
+
+
+class StatementCache(object):
+    """
+        Holds onto the cursor each statement was last run on, for up to
+        `max_size` statements, closing the least recently used cursors first.
+
+        Running a statement again on the same cursor lets drivers which
+        prepare statements (or cache them per cursor) skip parsing and
+        planning it again, which for the handful of statements most queries
+        come from saves a round of work on the server for every query.
+    """
+    def __init__(self, max_size=50):
+        self.max_size = max_size
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+        self._cursors = collections.OrderedDict()
+        self._ids = set()
+
+    def __len__(self):
+        return len(self._cursors)
+
+    def get(self, sql):
+        """
+            Returns the cursor `sql` was last run on, or None if it isn't
+            cached.
+        """
+        try:
+            cursor = self._cursors.pop(sql)
+        except KeyError:
+            self.misses += 1
+            return None
+
+        self._cursors[sql] = cursor
+        self.hits += 1
+        return cursor
+
+    def add(self, sql, cursor):
+        self._cursors[sql] = cursor
+        self._ids.add(id(cursor))
+
+        while len(self._cursors) > self.max_size:
+            sql, evicted = self._cursors.popitem(last=False)
+            self._ids.discard(id(evicted))
+            self.evictions += 1
+            close(evicted)
+
+    def holds(self, cursor):
+        return id(cursor) in self._ids
+
+    def clear(self):
+        """
+            Closes every cached cursor.
+        """
+        while self._cursors:
+            close(self._cursors.popitem()[1])
+
+        self._ids.clear()
+
+    def stats(self):
+        return {'size': len(self._cursors), 'hits': self.hits,
+                'misses': self.misses, 'evictions': self.evictions}
+
+
+def close(cursor):
+    try:
+        cursor.close()
+    except Exception:
+        pass
+
+
+class PooledConnection(object):
+    """
+        Wraps a DB-API connection checked out of a Pool, keeping track of
+        whether it has uncommitted changes (`is_dirty`), and returning it to
+        the pool when closed, rather than actually closing it.
+
+        The cursors statements were run on are kept in `statements` (see
+        StatementCache), and reused when the same statement is run again.
+    """
+    def __init__(self, pool, connection, statement_cache_size=50):
+        self.pool = pool
+        self.connection = connection
+        self.statements = StatementCache(statement_cache_size)
+        self.created = time.time()
+        self.last_used = self.created
+        self.is_dirty = False
+        self.checked_out = False
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc_value, traceback):
+        self.close()
+
+    def cursor(self):
+        return self.connection.cursor()
+
+    def execute(self, sql, literals=()):
+        """
+            Runs the statement passed, returning the cursor it was run on,
+            which should be passed to release_cursor() once the rows have
+            been read.  Statements which can write (see writes()) mark the
+            connection as dirty, until it is committed or rolled back.
+        """
+        cursor = self.statements.get(sql) if self.statements.max_size else None
+
+        if cursor is None:
+            cursor = self.connection.cursor()
+            cursor.execute(sql, list(literals))
+            if self.statements.max_size:
+                self.statements.add(sql, cursor)
+        else:
+            cursor.execute(sql, list(literals))
+
+        if writes(sql):
+            self.is_dirty = True
+
+        return cursor
+
+    def executemany(self, sql, rows):
+        """
+            Runs the statement once for each list of literals in `rows`,
+            marking the connection as dirty.
+        """
+        cursor = self.connection.cursor()
+        cursor.executemany(sql, [list(literals) for literals in rows])
+        self.is_dirty = True
+
+        return cursor
+
+    def release_cursor(self, cursor):
+        """
+            Closes the cursor, unless it is being kept for its statement.
+        """
+        if not self.statements.holds(cursor):
+            close(cursor)
+
+    def ping(self):
+        """
+            Checks that the connection is still usable.
+        """
+        try:
+            cursor = self.connection.cursor()
+            cursor.execute('SELECT 1')
+            cursor.fetchall()
+            cursor.close()
+            return True
+        except Exception:
+            return False
+
+    def commit(self):
+        self.connection.commit()
+        self.is_dirty = False
+
+    def rollback(self):
+        self.connection.rollback()
+        self.is_dirty = False
+
+    def close(self):
+        """
+            Returns the connection to the pool it came from.
+        """
+        if self.checked_out:
+            self.pool.checkin(self)
+
+    def discard(self):
+        """
+            Actually closes the underlying connection.
+        """
+        self.statements.clear()
+        self.pool.retire(self)
+
+        try:
+            self.connection.close()
+        except Exception:
+            pass
+
+
+class Pool(object):
+    """
+        A thread-safe pool of connections to a single server.
+
+        Up to `max_size` connections are kept open, with up to `overflow`
+        extra connections opened when all of them are in use, which are
+        closed as soon as they are returned.  Once the pool is full, checking
+        out a connection waits up to `timeout` seconds for one to be returned.
+
+        Connections older than `recycle` seconds, or left idle for longer
+        than `idle_timeout` seconds (while more than `min_size` connections
+        are open) are closed.  If `pre_ping` is set, connections left idle
+        for longer than `ping_after` seconds are pinged before being handed
+        out, so dropped connections are replaced rather than handed out,
+        without adding a round trip to every checkout of a busy pool.
+
+        Each connection keeps the cursors for up to `statement_cache_size`
+        statements (see StatementCache), 0 turns this off.
+
+        Connections can't be shared between processes, so if the pool is
+        used after a fork, the connections inherited from the parent are
+        dropped (without being closed, since the parent still uses them) and
+        the child starts with an empty pool.
+    """
+    def __init__(self, connect, min_size=0, max_size=5, overflow=5,
+                 recycle=3600, idle_timeout=300, pre_ping=True, ping_after=30,
+                 timeout=30, statement_cache_size=50):
+        self.connect = connect
+        self.min_size = min_size
+        self.max_size = max_size
+        self.overflow = overflow
+        self.recycle = recycle
+        self.idle_timeout = idle_timeout
+        self.pre_ping = pre_ping
+        self.ping_after = ping_after
+        self.timeout = timeout
+        self.statement_cache_size = statement_cache_size
+        self.reset()
+
+    @property
+    def size(self):
+        """
+            Returns the number of connections open (idle or checked out).
+        """
+        return self._size
+
+    @property
+    def idle(self):
+        return len(self._idle)
+
+    def reset(self):
+        """
+            Forgets about every connection in the pool, without closing them.
+        """
+        self._pid = os.getpid()
+        self._condition = threading.Condition(threading.Lock())
+        self._idle = collections.deque()
+        self._size = 0
+        self.checkouts = 0
+        self.wait_time = 0.0
+        self.max_wait_time = 0.0
+        self._connections = set()
+        self._retired = StatementCache(0)
+
+    def stats(self):
+        """
+            Returns the size of the pool, along with how long checkouts have
+            spent waiting for a connection (in seconds).
+        """
+        with self._condition:
+            return {
+                'size': self._size,
+                'idle': len(self._idle),
+                'checkouts': self.checkouts,
+                'wait_time': self.wait_time,
+                'max_wait_time': self.max_wait_time,
+                'average_wait_time': self.wait_time / self.checkouts
+                if self.checkouts else 0.0,
+            }
+
+    def statement_stats(self):
+        """
+            Returns the number of statements cached, along with the hits,
+            misses and evictions of the statement caches of every connection
+            the pool has opened.
+        """
+        with self._condition:
+            caches = [connection.statements for connection in self._connections]
+            stats = self._retired.stats()
+
+        for cache in caches:
+            for key, value in cache.stats().items():
+                stats[key] += value
+
+        return stats
+
+    def create(self):
+        connection = PooledConnection(self, self.connect(),
+                                      self.statement_cache_size)
+
+        with self._condition:
+            self._connections.add(connection)
+
+        return connection
+
+    def retire(self, connection):
+        """
+            Stops tracking a connection that has been closed, keeping the
+            stats from its statement cache.
+        """
+        with self._condition:
+            if connection in self._connections:
+                self._connections.discard(connection)
+                for key in ('hits', 'misses', 'evictions'):
+                    setattr(self._retired, key, getattr(self._retired, key) +
+                            getattr(connection.statements, key))
+
+    def expired(self, connection, now):
+        return self.recycle is not None and now - connection.created > self.recycle
+
+    def checkout(self):
+        """
+            Returns an open connection from the pool, creating one if none
+            are idle and the pool isn't full yet.
+        """
+        if self._pid != os.getpid():
+            self.reset()
+
+        start = time.time()
+        connection = None
+
+        with self._condition:
+            while True:
+                if self._idle:
+                    connection = self._idle.pop()
+                    break
+                elif self._size < self.max_size + self.overflow:
+                    self._size += 1
+                    break
+
+                remaining = self.timeout - (time.time() - start)
+                if remaining <= 0:
+                    raise PoolTimeoutException(
+                        'Timed out waiting for a connection after {0} '
+                        'seconds.'.format(self.timeout))
+
+                self._condition.wait(remaining)
+
+            waited = time.time() - start
+            self.checkouts += 1
+            self.wait_time += waited
+            self.max_wait_time = max(self.max_wait_time, waited)
+
+        try:
+            now = time.time()
+            if connection is not None and (self.expired(connection, now) or (
+                    self.pre_ping and now - connection.last_used > self.ping_after
+                    and not connection.ping())):
+                connection.discard()
+                connection = None
+
+            if connection is None:
+                connection = self.create()
+        except Exception:
+            with self._condition:
+                self._size -= 1
+                self._condition.notify()
+            raise
+
+        connection.checked_out = True
+        connection.last_used = time.time()
+
+        return connection
+
+    def checkin(self, connection):
+        """
+            Returns a connection to the pool, rolling back anything that was
+            left uncommitted.
+        """
+        connection.checked_out = False
+
+        # Connections checked out before a fork belong to the parent.
+        if self._pid != os.getpid():
+            return
+
+        if connection.is_dirty:
+            try:
+                connection.rollback()
+            except Exception:
+                connection.is_dirty = True
+
+        now = time.time()
+        connection.last_used = now
+        discard = []
+
+        with self._condition:
+            if connection.is_dirty or self._size > self.max_size or \
+                    self.expired(connection, now):
+                discard.append(connection)
+                self._size -= 1
+            else:
+                self._idle.append(connection)
+
+            # Idle connections are only ever taken from the end of the
+            # queue, so the ones which have been idle the longest are at the
+            # start of it.
+            while self._idle and self._size > self.min_size and \
+                    self.idle_timeout is not None and \
+                    now - self._idle[0].last_used > self.idle_timeout:
+                discard.append(self._idle.popleft())
+                self._size -= 1
+
+            self._condition.notify(len(discard) + 1)
+
+        for item in discard:
+            item.discard()
+
+    def fill(self):
+        """
+            Opens connections until there are at least `min_size` open.
+        """
+        while True:
+            with self._condition:
+                if self._size >= self.min_size:
+                    return
+                self._size += 1
+
+            try:
+                connection = self.create()
+            except Exception:
+                with self._condition:
+                    self._size -= 1
+                raise
+
+            with self._condition:
+                self._idle.appendleft(connection)
+                self._condition.notify()
+
+    def dispose(self):
+        """
+            Closes every idle connection in the pool.
+        """
+        with self._condition:
+            idle = list(self._idle)
+            self._idle.clear()
+            self._size -= len(idle)
+
+        for connection in idle:
+            connection.discard()
@@ -0,0 +1,62 @@
+import importlib
+import threading
+
+
+class ModelRegistry(object):
+    """
+        Keeps track of every model class defined, by name and by its full
+        dotted path (`module.ClassName`), so that relationships given the name
+        of their target (see Relationship.target) can find it without
+        importing anything if it has already been defined, and only import the
+        module holding it the first time the relationship is used otherwise.
+    """
+    def __init__(self):
+        self._models = {}
+        self._lock = threading.Lock()
+
+    def __contains__(self, name):
+        return name in self._models
+
+    def register(self, cls):
+        path = '{0}.{1}'.format(cls.__module__, cls.__name__)
+
+        with self._lock:
+            self._models[path] = cls
+            # A bare name is only usable while it isn't ambiguous.
+            if self._models.get(cls.__name__, cls) is not cls:
+                self._models[cls.__name__] = None
+            else:
+                self._models[cls.__name__] = cls
+
+    def resolve(self, name, import_from=None):
+        """
+            Returns the model class called `name`, which can be a bare class
+            name, or a full dotted path.  The model is looked up in
+            `import_from` (a module path) first if given, which is imported if
+            the model hasn't been defined yet.
+        """
+        if import_from:
+            path = '{0}.{1}'.format(import_from, name)
+        elif '.' in name:
+            path = name
+            import_from, name = name.rsplit('.', 1)
+        else:
+            path = None
+
+        if path is not None:
+            cls = self._models.get(path)
+            if cls is None:
+                cls = getattr(importlib.import_module(import_from), name)
+            return cls
+
+        cls = self._models.get(name)
+        if cls is None:
+            raise Exception('Model `{0}` is {1}, use its full path or set '
+                            '`import_from`.'.format(
+                                name, 'ambiguous' if name in self._models
+                                else 'not defined'))
+
+        return cls
+
+
+registry = ModelRegistry()
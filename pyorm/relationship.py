@@ -1,9 +1,19 @@
+import weakref
+
+from pyorm.field import Integer
+from pyorm.loader import BatchLoader
+from pyorm.registry import registry
+from pyorm.token import *
+
+
 class UnboundRelationship(object):
     idx = 0
 
-    def __init__(self, cls, **kwargs):
+    def __init__(self, cls, *args, **kwargs):
         self.field_type = cls
+        self.args = args
         self.kwargs = kwargs
+        self.target = None
         UnboundRelationship.idx += 1
         self.idx = UnboundRelationship.idx
 
@@ -11,31 +21,131 @@ class UnboundRelationship(object):
         kwargs = dict(self.kwargs)
         kwargs.update({'_name': name, '_trans_name': trans_name,
                        '_owner': owner})
-        instance = self.field_type(**kwargs)
+        instance = self.field_type(*self.args, **kwargs)
         instance.idx = self.idx
         instance.unbound_field = self
         setattr(owner.r, name, instance)
 
+        # Relationships without filters map `<name>_id` on the owner to the
+        # target, so that field needs to exist on the owner as well.
+        for local, remote in instance.keys:
+            if not hasattr(owner.c, local) and not instance.filters:
+                Integer(unsigned=True, null=True).bind(
+                    name=local, trans_name=local, owner=owner)
+
 
 class MetaRelationship(type):
     """
         Returns an unbound relationhsip if we don't know all the information
         about the field yet.
     """
-    def __call__(cls, **kwargs):
+    def __call__(cls, *args, **kwargs):
         if len({'_trans_name', '_owner', '_name'} & set(kwargs.keys())) == 3:
             instance = cls.__new__(cls)
-            instance.__init__(**kwargs)
+            instance.__init__(*args, **kwargs)
             return instance
         else:
-            return UnboundRelationship(cls, **kwargs)
+            return UnboundRelationship(cls, *args, **kwargs)
 
 
 class Relationship(object):
     __metaclass__ = MetaRelationship
 
-    def __init__(self, model=None, import_dir=None, expression=None, **kwargs):
-        pass
+    @property
+    def target(self):
+        """
+            Returns the model class this relationship points to.  Models given
+            by name are looked up in the model registry (see pyorm.registry)
+            the first time they are needed, importing them from `import_from`
+            if they haven't been defined yet.  The class found is kept on the
+            unbound relationship, so it is only looked up once per model class.
+        """
+        if isinstance(self._target, basestring):
+            unbound = getattr(self, 'unbound_field', None)
+
+            if unbound is not None and unbound.target is not None:
+                self._target = unbound.target
+            else:
+                self._target = registry.resolve(self._target, self.import_from)
+                if unbound is not None:
+                    unbound.target = self._target
+
+        return self._target
+
+    @property
+    def keys(self):
+        """
+            Returns a list of (local field, remote field) pairs used to match
+            rows on the owner to rows on the target model.
+
+            When no filters are defined, the relationship maps
+            `<name>_id` on the owner to `id` on the target.  When filters are
+            defined, each equality between a column on the owner and a column
+            on this relationship becomes a key pair, for example:
+                filter=[C.field1 == C.relationship2.extra_id]
+
+            would map `field1` on the owner to `extra_id` on the target.
+        """
+        if not self.filters:
+            return [('{0}_id'.format(self.trans_name), 'id')]
+
+        keys = []
+        for expression in self.filters:
+            tokens = [token for token in expression.tokens
+                      if token.type != T_OPR or token.value not in (OP_OPAR, OP_CPAR)]
+
+            if len(tokens) == 3 and tokens[0].type == T_COL and \
+                    tokens[1].type == T_OPR and tokens[1].value == OP_EQ and \
+                    tokens[2].type == T_COL:
+                columns = [tokens[0].value._path, tokens[2].value._path]
+
+                local = [path for path in columns if len(path) == 1]
+                remote = [path for path in columns
+                          if len(path) == 2 and path[0] == self.name]
+
+                if len(local) == 1 and len(remote) == 1:
+                    keys.append((local[0][0], remote[0][1]))
+
+        return keys
+
+    @property
+    def model(self):
+        """
+            Returns an instance of the target model containing the rows
+            related to the owner's current row.
+
+            The first time this is accessed for a given batch of the owner's
+            result set, the related rows for every row in that batch are pulled
+            back in a single query, and cached on the owner's result set so
+            that any other RecordProxy objects (or clones) iterating over the
+            same result set will reuse them.
+        """
+        owner = self.owner
+        loader = owner._loaders.get(self.name)
+
+        if loader is None:
+            loader = BatchLoader(self, batch_size=owner.Meta.lazy_batch_size)
+            owner._loaders[self.name] = loader
+
+        queries = loader.queries
+        model = loader.load(owner._records, owner.current_idx)
+
+        if loader.queries != queries:
+            detector = getattr(owner.session, 'nplusone', None)
+            if detector is not None:
+                detector.record(loader.scope, loader.path)
+
+        return model
+
+    def __init__(self, model=None, import_from=None, filter=None, join='inner',
+                 **kwargs):
+        self.name = kwargs.get('_name')
+        self.trans_name = kwargs.get('_trans_name')
+        self.owner = weakref.proxy(kwargs['_owner'])
+        self.import_from = import_from
+        self.filters = list(filter or [])
+        self.join = join
+        self._target = model
 
 
 class OneToOne(Relationship):
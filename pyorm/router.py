@@ -0,0 +1,113 @@
+import random
+import threading
+import time
+
+
+class ServerState(object):
+    """
+        The load and health of a single server, as seen by the Router.
+    """
+    def __init__(self):
+        self.latency = None
+        self.in_flight = 0
+        self.failures = 0
+        self.ejected_until = 0
+
+    def healthy(self, now):
+        return self.ejected_until <= now
+
+    def load(self):
+        """
+            Returns the expected wait for a new query on this server, servers
+            that haven't been used yet are tried first.
+        """
+        return (self.latency or 0.0) * (self.in_flight + 1)
+
+
+class Router(object):
+    """
+        Picks which of a list of servers a query should be sent to.
+
+        The router keeps a moving average of the time queries take on each
+        server (weighted by `alpha`), along with the number of queries
+        currently running on it, and sends each query to the healthy server
+        with the lowest expected wait (average latency multiplied by the
+        number of queries that would be running on it).
+
+        A server that fails `max_failures` times in a row is ejected for
+        `cooldown` seconds, during which it is only used if every other
+        server has been ejected as well.
+    """
+    def __init__(self, alpha=0.2, cooldown=30, max_failures=3):
+        self.alpha = alpha
+        self.cooldown = cooldown
+        self.max_failures = max_failures
+        self._servers = {}
+        self._lock = threading.Lock()
+
+    def state(self, server):
+        if server not in self._servers:
+            self._servers[server] = ServerState()
+
+        return self._servers[server]
+
+    def choose(self, servers):
+        """
+            Returns the least loaded healthy server out of the list passed.
+        """
+        if isinstance(servers, basestring):
+            return servers
+        elif len(servers) == 1:
+            return servers[0]
+
+        now = time.time()
+        with self._lock:
+            states = [(server, self.state(server)) for server in servers]
+            healthy = [(server, state) for server, state in states
+                       if state.healthy(now)] or states
+
+            lowest = min(state.load() for server, state in healthy)
+            return random.choice([server for server, state in healthy
+                                  if state.load() == lowest])
+
+    def start(self, server):
+        """
+            Records the start of a query on `server`, returning the time it
+            started, to be passed to Router.finish().
+        """
+        with self._lock:
+            self.state(server).in_flight += 1
+
+        return time.time()
+
+    def finish(self, server, start, failed=False):
+        """
+            Records the end of a query on `server`, ejecting the server if it
+            has failed too many times in a row.
+        """
+        now = time.time()
+
+        with self._lock:
+            state = self.state(server)
+            state.in_flight -= 1
+
+            if failed:
+                state.failures += 1
+                if state.failures >= self.max_failures:
+                    state.ejected_until = now + self.cooldown
+                    state.failures = 0
+            else:
+                state.failures = 0
+                elapsed = now - start
+                if state.latency is None:
+                    state.latency = elapsed
+                else:
+                    state.latency += self.alpha * (elapsed - state.latency)
+
+    def eject(self, server, cooldown=None):
+        """
+            Stops sending queries to `server` for `cooldown` seconds.
+        """
+        with self._lock:
+            self.state(server).ejected_until = time.time() + (
+                self.cooldown if cooldown is None else cooldown)
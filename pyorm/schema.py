@@ -0,0 +1,269 @@
+import collections
+import functools
+import numbers
+import threading
+import weakref
+
+
+# A column, either declared by a field on a model or read from the database.
+# `default` is only used when creating the column, and is None for live
+# columns.
+ColumnDef = collections.namedtuple(
+    'ColumnDef', ('name', 'type', 'null', 'autoincrement', 'default'))
+
+# An index other than the primary key, with the names of its columns in order.
+IndexDef = collections.namedtuple('IndexDef', ('name', 'columns', 'unique'))
+
+# A table, `columns` is an OrderedDict of ColumnDef and `indexes` a dict of
+# IndexDef, both by name, and `primary_key` a tuple of column names.
+TableDef = collections.namedtuple(
+    'TableDef', ('name', 'columns', 'indexes', 'primary_key'))
+
+
+def declared(model, dialect):
+    """
+        Returns the TableDef declared by the model (a class or an instance),
+        taken from its fields (including those added for its relationships)
+        and its Indexes.  Indexes are named `<table>_<name>`, since index
+        names need to be unique across the database for some servers.
+    """
+    instance = model() if isinstance(model, type) else model
+    table = instance.Meta.db_table
+
+    fields = sorted(vars(instance.c).values(), key=lambda field: field.idx)
+    names = dict((field.name, field.trans_name) for field in fields)
+    columns = collections.OrderedDict()
+
+    for field in fields:
+        default = field.default
+        if not isinstance(default, (numbers.Number, basestring)):
+            default = None
+
+        columns[field.trans_name] = ColumnDef(
+            field.trans_name, dialect.column_type(field), field.null,
+            getattr(field, 'autoincrement', False), default)
+
+    indexes = {}
+    for name in instance.Indexes._unbound:
+        index = getattr(instance.Indexes, name)
+        if index.primary:
+            continue
+
+        index_name = '{0}_{1}'.format(table, index.name)
+        indexes[index_name] = IndexDef(
+            index_name, tuple(names.get(field, field) for field in index.fields),
+            index.unique)
+
+    primary_key = tuple(names.get(name, name) for name in type(instance)._primary_key)
+
+    return TableDef(table, columns, indexes, primary_key)
+
+
+class SchemaCache(object):
+    """
+        Holds the live tables of each server (see Dialect.introspect()), which
+        are read the first time they are needed, using one query for the
+        columns and one for the indexes of every table, and kept until the
+        server is invalidated (which Migration.run() does).
+    """
+    def __init__(self, session):
+        self.session = weakref.proxy(session)
+        self._tables = {}
+        self._lock = threading.Lock()
+
+    def tables(self, server):
+        """
+            Returns the live TableDefs on `server`, by name.
+        """
+        tables = self._tables.get(server)
+
+        if tables is None:
+            tables = self.session.dialect(server).introspect(
+                functools.partial(self.session.run, server))
+
+            with self._lock:
+                self._tables[server] = tables
+
+        return tables
+
+    def indexes(self, server, table):
+        """
+            Returns the names of the live indexes on `table` on `server`.
+        """
+        live = self.tables(server).get(table)
+        return set() if live is None else set(live.indexes)
+
+    def invalidate(self, server=None):
+        with self._lock:
+            if server is None:
+                self._tables = {}
+            else:
+                self._tables.pop(server, None)
+
+
+class TableDiff(object):
+    """
+        The changes needed to bring the `live` table (None if it doesn't
+        exist) in line with the `table` declared by a model.  Columns and
+        indexes that are no longer declared are only dropped if `drop` is
+        set.  Changed indexes are dropped and created again.
+
+        Column types are compared using Dialect.normalize_type(), and the
+        primary key columns are only compared by type, since not every server
+        reports them as NOT NULL.
+
+        A NOT NULL column can only be added to an existing table if it has a
+        default to fill in the rows already there, so the statements for
+        adding one without a default are refused (see TableDiff.statements()).
+    """
+    def __init__(self, dialect, table, live=None, drop=False):
+        self.table = table
+        self.create = live is None
+        self.add_columns = []
+        self.alter_columns = []
+        self.drop_columns = []
+        self.add_indexes = []
+        self.drop_indexes = []
+
+        if live is None:
+            return
+
+        for name, column in table.columns.items():
+            current = live.columns.get(name)
+
+            if current is None:
+                self.add_columns.append(column)
+            elif dialect.normalize_type(column.type) != \
+                    dialect.normalize_type(current.type) or (
+                    column.null != current.null and name not in table.primary_key):
+                self.alter_columns.append(column)
+
+        for name, index in sorted(table.indexes.items()):
+            current = live.indexes.get(name)
+
+            if current is None:
+                self.add_indexes.append(index)
+            elif current.columns != index.columns or current.unique != index.unique:
+                self.drop_indexes.append(current)
+                self.add_indexes.append(index)
+
+        if drop:
+            self.drop_columns = [column for name, column in live.columns.items()
+                                 if name not in table.columns]
+            self.drop_indexes.extend(index for name, index in sorted(live.indexes.items())
+                                     if name not in table.indexes)
+
+    def __nonzero__(self):
+        return bool(self.create or self.add_columns or self.alter_columns or
+                    self.drop_columns or self.add_indexes or self.drop_indexes)
+
+    __bool__ = __nonzero__
+
+    def statements(self, dialect):
+        """
+            Returns the statements making the changes, which for an existing
+            table are batched into as few statements as the server allows
+            (see Dialect.alter_table()).
+        """
+        if not self.create:
+            for column in self.add_columns:
+                if not (column.null or column.autoincrement or
+                        column.default is not None):
+                    raise Exception(
+                        'The column `{0}` can not be added to `{1}` without a '
+                        'default, since it is NOT NULL.  Give the field a '
+                        'default, or set null=True.'.format(
+                            column.name, self.table.name))
+
+            return dialect.alter_table(self)
+
+        return [dialect.create_table(self.table)] + [
+            dialect.create_index(self.table.name, index)
+            for name, index in sorted(self.table.indexes.items())]
+
+
+class Migration(object):
+    """
+        Brings the tables for `models` in line with their fields,
+        relationships and indexes on every server they write to (see
+        Meta.write_server, which can list a whole cluster of shards).
+
+        The live tables on each server are read once per session (see
+        SchemaCache), so the statements needed for every model on a server
+        are found using two queries, and the changes to each table are sent
+        as a single ALTER TABLE where the server allows it.  New tables are
+        created so that tables referenced by a relationship are created
+        before the tables referencing them (see UnitOfWork.order()).
+
+        The statements for each server are run in one transaction, which is
+        committed once every server's statements have run, or rolled back
+        if any of them fail.  MySQL (and SQLite, through the sqlite3 module)
+        commit each schema change straight away though, so those can't be
+        rolled back.
+    """
+    def __init__(self, session, models, drop=False):
+        self.session = session
+        self.models = session.unit_of_work.order(models)
+        self.drop = drop
+
+    def diffs(self):
+        """
+            Returns the TableDiffs with changes for each server, in the order
+            the models should be created in.
+        """
+        diffs = collections.OrderedDict()
+
+        for model in self.models:
+            instance = model(session=self.session)
+
+            for server in self.session.servers(instance, 'write_server'):
+                dialect = self.session.dialect(server)
+                table = declared(instance, dialect)
+                diff = TableDiff(dialect, table, self.session.schema.tables(
+                    server).get(table.name), self.drop)
+
+                if diff:
+                    diffs.setdefault(server, []).append(diff)
+
+        return diffs
+
+    def statements(self, diffs=None):
+        """
+            Returns the statements to run on each server, for `diffs` (from
+            Migration.diffs()) or for every change needed.
+        """
+        diffs = self.diffs() if diffs is None else diffs
+        statements = collections.OrderedDict()
+
+        for server, server_diffs in diffs.items():
+            dialect = self.session.dialect(server)
+            statements[server] = [sql for diff in server_diffs
+                                  for sql in diff.statements(dialect)]
+
+        return statements
+
+    def run(self, diffs=None):
+        """
+            Runs the statements for `diffs` (or every change needed) and
+            commits them, returning the statements run on each server.
+        """
+        if self.session.is_dirty:
+            raise Exception('The session has uncommitted changes, commit or '
+                            'roll them back before running a migration.')
+
+        statements = self.statements(diffs)
+
+        try:
+            for server, server_statements in statements.items():
+                for sql in server_statements:
+                    self.session.run(server, sql)
+
+            self.session.commit()
+        except Exception:
+            self.session.rollback()
+            raise
+        finally:
+            for server in statements:
+                self.session.schema.invalidate(server)
+
+        return statements
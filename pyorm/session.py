@@ -0,0 +1,665 @@
+import contextlib
+import functools
+import importlib
+import threading
+import time
+import weakref
+
+from pyorm.advisor import IndexAdvisor
+from pyorm.cache import QueryCache
+from pyorm.dialect import Dialect, MySQLDialect, PostgreSQLDialect, SQLiteDialect
+from pyorm.events import Instrumentation
+from pyorm.identity import IdentityMap
+from pyorm.memory import FetchBudget, usage
+from pyorm.nplusone import NPlusOneDetector
+from pyorm.pool import Pool
+from pyorm.router import Router
+from pyorm.schema import SchemaCache
+from pyorm.slowlog import SlowQueryLog
+from pyorm.stats import QueryStats
+from pyorm.unitofwork import UnitOfWork
+
+
+try:
+    import contextvars
+except ImportError:
+    contextvars = None
+
+
+# used to define the default session used by models when first instantiated.
+# this can be overridden in the models by passing a session arguement to the
+# model when initialized, or for a block of code using Session.use().
+default_session = None
+
+
+if contextvars is not None:
+    _current = contextvars.ContextVar('pyorm_session', default=None)
+else:
+    _current = threading.local()
+
+
+def current_session():
+    """
+        Returns the session set by the innermost Session.use() block for the
+        current thread (or asyncio task), falling back on the default session.
+    """
+    if contextvars is not None:
+        session = _current.get()
+    else:
+        session = getattr(_current, 'session', None)
+
+    return session if session is not None else default_session
+
+
+class SessionDirtyException(Exception):
+    pass
+
+
+class Session(object):
+    """
+        The Session class is used to maintain a set of connections based on
+        a specific configuration.  The configuration itself should implement
+        attribute access, and it is assumed that the config is actually a
+        class itself.
+
+        The reason it assumes the config is a class, is so that it can pass
+        itself to the config's __init__ or __call__, allowing the config to
+        do things like toggle to a set of backup servers, and invalidating
+        the connections currently in use.
+
+        The config lists the servers available by name, each server being a
+        dict holding the name of the DB-API module used to connect to it
+        (`driver`), with the rest of the entries passed to the driver's
+        connect() function:
+            class Config(object):
+                servers = {
+                    'main': {'driver': 'sqlite3', 'database': '/tmp/main.db'},
+                }
+                default_read_server = 'main'
+                default_write_server = 'main'
+
+                def __init__(self, session):
+                    pass
+
+        Models can read from (or write to) a list of servers, using
+        Meta.read_server and Meta.write_server, in which case the session's
+        router (see pyorm.router.Router, configured using the `router` dict
+        on the config) picks which one each query is sent to.
+
+        Query results for models with Meta.cache_ttl set are cached in the
+        session's QueryCache, which stores them in the `cache_backend` from
+        the config (an in-process LRU cache by default, see pyorm.cache).
+
+        Rows loaded through the session are tracked by primary key in its
+        IdentityMap (see pyorm.identity), so the same row is only held once.
+
+        Writes made through the session's models are collected in its
+        UnitOfWork (see pyorm.unitofwork), and sent to the servers in batches
+        when the session is flushed, which happens before every query and
+        every commit.
+
+        Listeners registered on the session's Instrumentation (or listed in
+        `listeners` on the config) are sent the timings for each phase of
+        every query (see pyorm.events).  Statistics for each query can be
+        collected using Session.enable_stats() (or by setting `collect_stats`
+        on the config, see pyorm.stats), and Session.enable_advisor() (or
+        `index_advisor` on the config) suggests indexes from the columns
+        those queries search by (see pyorm.advisor).
+
+        Queries taking longer than `slow_query_threshold` seconds (if set on
+        the config) are logged along with their plans (see pyorm.slowlog),
+        and relationships lazily loaded using more than `nplusone_threshold`
+        queries for one result set are reported (see pyorm.nplusone).
+
+        Setting `fetch_budget` on the config limits the bytes a single
+        query's rows can take up (see pyorm.memory.FetchBudget), and
+        Session.memory_report() lists the result sets loaded through the
+        session which are still in use, along with their size.
+
+        The tables on each server are read once into the session's
+        SchemaCache, which migrations use to work out the changes needed
+        for a set of models (see pyorm.schema.Migration).
+    """
+    # Maps the DB-API modules to the dialect used to write queries for them.
+    dialects = {
+        'sqlite3': SQLiteDialect,
+        'pysqlite2.dbapi2': SQLiteDialect,
+        'MySQLdb': MySQLDialect,
+        'pymysql': MySQLDialect,
+        'psycopg2': PostgreSQLDialect,
+    }
+
+    @property
+    def is_dirty(self):
+        """
+            Returns whether the session has pending writes, or any of the
+            currently open connections have uncommitted changes.
+        """
+        dirty = bool(len(self.unit_of_work))
+
+        for connection in self.connections:
+            if connection.is_dirty:
+                dirty = True
+
+        return dirty
+
+    @property
+    def connections(self):
+        """
+            Returns the connections held by the session, which are the ones
+            with uncommitted changes.
+        """
+        return list(self._held.values())
+
+    @property
+    def config(self):
+        """
+            Returns the current configuration for this session, returns
+            None if one hasn't been specified yet.
+        """
+        return getattr(self, '_config', None)
+
+    @config.setter
+    def config(self, config):
+        """
+            Attempts to change the config file in use on a session, if the
+            session has already been used to push data to the servers, but
+            the transaction has not been committed, raises an exception.
+        """
+        if self.is_dirty:
+            raise SessionDirtyException()
+
+        self._config_class = config
+        self._config = config(self)
+
+    def __init__(self, config, default=False):
+        """
+            The session object takes two parameters, the config file to be
+            used, and whether or not this session should become the default
+            session. If the default session is already set and is marked as
+            dirty, raises an exception.
+        """
+        # pull in the global default_session var, so we can modify it.
+        # The purpose of this var is to maintain state for multiple
+        # models, after the initial declaration, so this actually
+        # makes sense here.
+        global default_session
+
+        self._held = {}
+        self._written = set()
+        self._pools = {}
+        self._lock = threading.Lock()
+        self.unit_of_work = UnitOfWork()
+        self.config = config
+        self.router = Router(**getattr(self.config, 'router', {}))
+        self.cache = QueryCache(getattr(self.config, 'cache_backend', None))
+        self.identity = IdentityMap()
+        self.schema = SchemaCache(self)
+        self.instrumentation = Instrumentation(getattr(self.config, 'listeners', ()))
+        self.stats = None
+        self.advisor = None
+        self.slow_queries = None
+
+        threshold = getattr(self.config, 'slow_query_threshold', None)
+        if threshold is not None:
+            self.slow_queries = SlowQueryLog(
+                threshold, redact=getattr(self.config, 'slow_query_redact', False),
+                explain=getattr(self.config, 'slow_query_explain', True))
+
+        self.nplusone = None
+        self.fetch_budget = None
+        self._result_sets = weakref.WeakSet()
+
+        budget = getattr(self.config, 'fetch_budget', None)
+        if budget is not None:
+            self.fetch_budget = FetchBudget(
+                budget, action=getattr(self.config, 'fetch_budget_action', 'raise'))
+
+        threshold = getattr(self.config, 'nplusone_threshold', None)
+        if threshold is not None:
+            self.nplusone = NPlusOneDetector(
+                threshold, sample_rate=getattr(self.config, 'nplusone_sample_rate', 1.0),
+                action=getattr(self.config, 'nplusone_action', 'warn'))
+
+        if getattr(self.config, 'collect_stats', False):
+            self.enable_stats()
+
+        if getattr(self.config, 'index_advisor', False):
+            self.enable_advisor()
+
+        if default:
+            if not getattr(default_session, 'is_dirty', False):
+                default_session = self
+            else:
+                raise SessionDirtyException()
+
+    @contextlib.contextmanager
+    def use(self):
+        """
+            Makes this the session used by models created without a session
+            inside of the block, for the current thread (or asyncio task) only:
+                with session.use():
+                    SampleModel.filters(C.field1 == 1).get()
+
+            This allows each thread or task to work with its own session
+            (and transaction) without them interfering with each other.
+        """
+        if contextvars is not None:
+            token = _current.set(self)
+            try:
+                yield self
+            finally:
+                _current.reset(token)
+        else:
+            previous = getattr(_current, 'session', None)
+            _current.session = self
+            try:
+                yield self
+            finally:
+                _current.session = previous
+
+    def track(self, model):
+        """
+            Adds a model's result set to the ones listed by memory_report().
+        """
+        self._result_sets.add(model)
+
+    def memory_report(self):
+        """
+            Returns the approximate bytes held by each result set loaded
+            through the session which is still in use (see
+            Model.memory_usage()), the largest first.  Rows shared between
+            result sets (see pyorm.identity) are only counted once.
+        """
+        report = []
+        seen = set()
+        models = sorted(list(self._result_sets), key=lambda model: -len(model._records))
+
+        for model in models:
+            entry = usage(model, seen)
+            entry['model'] = model.Meta.verbose_name
+            report.append(entry)
+
+        report.sort(key=lambda entry: entry['total'], reverse=True)
+        return report
+
+    def start_event(self, model=None):
+        """
+            Returns a new QueryEvent for a query on `model` if the query needs
+            to be timed (for the session's listeners, or the slow query log),
+            otherwise None.
+        """
+        return self.instrumentation.start(
+            model, force=self.slow_queries is not None)
+
+    def enable_stats(self):
+        """
+            Starts collecting statistics for the queries run through the
+            session, returning the QueryStats holding them.
+        """
+        with self._lock:
+            if self.stats is None:
+                self.stats = QueryStats()
+                self.instrumentation.listen(self.stats)
+
+        return self.stats
+
+    def disable_stats(self):
+        with self._lock:
+            if self.stats is not None:
+                self.instrumentation.remove(self.stats)
+                self.stats = None
+
+    def enable_advisor(self, redact=False):
+        """
+            Starts recording how the queries run through the session search
+            their tables, returning the IndexAdvisor suggesting the indexes
+            to add or drop (see pyorm.advisor).
+        """
+        with self._lock:
+            if self.advisor is None:
+                self.advisor = IndexAdvisor(redact=redact)
+                self.instrumentation.listen(self.advisor)
+
+        return self.advisor
+
+    def disable_advisor(self):
+        with self._lock:
+            if self.advisor is not None:
+                self.instrumentation.remove(self.advisor)
+                self.advisor = None
+
+    def server(self, name):
+        """
+            Returns the settings for the server called `name`.
+        """
+        try:
+            return self.config.servers[name]
+        except (AttributeError, KeyError):
+            raise Exception('Server `{0}` is not configured.'.format(name))
+
+    def servers(self, model, server_type):
+        """
+            Returns the list of servers the model uses for `server_type`
+            (`read_server` or `write_server`), falling back on the defaults
+            from the config.
+        """
+        servers = getattr(model.Meta, server_type, None) or getattr(
+            self.config, 'default_{0}'.format(server_type))
+
+        if isinstance(servers, basestring):
+            return [servers]
+
+        return list(servers)
+
+    def read_server(self, model):
+        """
+            Returns the name of the server the model reads from.
+
+            While the session has uncommitted writes on one of the model's
+            write servers, reads go to that server, so the changes are
+            visible.  Otherwise the router picks the least loaded of the
+            model's read servers.
+        """
+        for server in self.servers(model, 'write_server'):
+            if server in self._held:
+                return server
+
+        return self.router.choose(self.servers(model, 'read_server'))
+
+    def write_server(self, model):
+        """
+            Returns the name of the server the model writes to, which is
+            the server holding the session's uncommitted writes if there is
+            one.
+        """
+        servers = self.servers(model, 'write_server')
+
+        for server in servers:
+            if server in self._held:
+                return server
+
+        return self.router.choose(servers)
+
+    def dialect(self, name):
+        """
+            Returns the dialect used to write queries for the server `name`.
+        """
+        return self.dialects.get(self.server(name)['driver'], Dialect)()
+
+    def connect(self, name):
+        """
+            Opens a new connection to the server `name`, outside of the pool.
+        """
+        settings = dict(self.server(name))
+        driver = importlib.import_module(settings.pop('driver'))
+        settings.pop('pool', None)
+
+        return driver.connect(**settings)
+
+    def pool(self, name):
+        """
+            Returns the connection pool for the server `name`, the pool's
+            settings (see pyorm.pool.Pool) can be set using the `pool` entry
+            of the server's config:
+                'main': {'driver': 'sqlite3', 'database': '/tmp/main.db',
+                         'pool': {'max_size': 10, 'overflow': 0}}
+
+            The pool's `min_size` connections are opened when it is created.
+        """
+        pool = self._pools.get(name)
+
+        if pool is None:
+            with self._lock:
+                pool = self._pools.get(name)
+                if pool is None:
+                    pool = Pool(functools.partial(self.connect, name),
+                                **self.server(name).get('pool', {}))
+                    pool.fill()
+                    self._pools[name] = pool
+
+        return pool
+
+    def checkout(self, name):
+        """
+            Returns a connection to the server `name`.  If the session is
+            holding a connection to the server with uncommitted changes,
+            that connection is returned, so that the changes are visible.
+        """
+        connection = self._held.get(name)
+
+        if connection is None:
+            connection = self.pool(name).checkout()
+
+        return connection
+
+    def release(self, name, connection):
+        """
+            Returns the connection to the pool, unless it has uncommitted
+            changes, in which case the session holds onto it until it is
+            committed or rolled back.
+        """
+        if connection.is_dirty:
+            self._held[name] = connection
+        elif self._held.get(name) is not connection:
+            connection.close()
+
+    def execute(self, name, sql, literals=(), tables=(), ttl=None, event=None):
+        """
+            Runs the statement on the server `name`, returning the labels of
+            the columns returned along with the rows.
+
+            If `ttl` is set, the result is cached for `ttl` seconds, until one
+            of the `tables` the statement reads from is written to through
+            the session's cache.  Results aren't cached while the session has
+            uncommitted writes on the server, since those could be rolled
+            back, nor while any session sharing the cache has uncommitted
+            writes to one of the `tables` (see QueryCache.pending()).
+
+            The timings for the query are added to `event` if one is passed
+            (see Model.execute()), otherwise an event is sent to the session's
+            listeners once the query has run.
+        """
+        emit = event is None and self.instrumentation.enabled
+        if emit:
+            event = self.instrumentation.start()
+
+        if event is not None:
+            event.server, event.sql, event.literals = name, sql, literals
+
+        if ttl and name not in self._held:
+            if event is not None:
+                start = time.time()
+
+            key = self.cache.key(name, tables, sql, literals)
+            result = self.cache.get(key) if key is not None else None
+
+            if event is not None:
+                event.time('cache', start)
+                event.cached = result is not None
+                if result is not None:
+                    event.rows = len(result[1])
+
+            if result is None:
+                result = self.run(name, sql, literals, event=event)
+                if key is not None:
+                    self.cache.set(key, result, ttl)
+        else:
+            self.mark_written(sql)
+            result = self.run(name, sql, literals, event=event)
+
+        if emit:
+            self.instrumentation.emit(event)
+
+        return result
+
+    def execute_many(self, name, sql, rows):
+        """
+            Runs the write statement on the server `name` once for each list
+            of literals in `rows`.
+        """
+        event = self.instrumentation.start()
+        if event is not None:
+            event.server, event.sql = name, sql
+
+        self.mark_written(sql)
+        self.run(name, sql, rows, many=True, event=event)
+
+        if event is not None:
+            event.rows = len(rows)
+            self.instrumentation.emit(event)
+
+    def mark_written(self, sql):
+        """
+            Marks the table the statement writes to (if any) as having
+            uncommitted writes in the query cache until the session is
+            committed or rolled back, and drops its rows from the identity
+            map.
+        """
+        table = self.cache.written_table(sql)
+        if table is None:
+            return
+
+        self.cache.pending(table)
+        self.identity.invalidate(table)
+
+        with self._lock:
+            self._written.add(table)
+
+    def end_writes(self):
+        """
+            Bumps the cache generation of every table written to since the
+            last commit or rollback, once the writes are visible to (or
+            dropped for) every other session.
+        """
+        with self._lock:
+            tables, self._written = self._written, set()
+
+        self.cache.invalidate(*tables)
+
+    def run(self, name, sql, literals=(), many=False, event=None):
+        """
+            Runs the statement on the server `name`, without going through
+            the cache.  If `many` is set, `literals` holds a list of literals
+            for each time the statement is run, and no rows are returned.
+        """
+        start = self.router.start(name)
+
+        try:
+            connection = self.checkout(name)
+        except Exception:
+            self.router.finish(name, start, failed=True)
+            raise
+
+        if event is not None:
+            timer = event.time('checkout', start)
+
+        try:
+            if many:
+                cursor = connection.executemany(sql, literals)
+            else:
+                cursor = connection.execute(sql, literals)
+
+            if event is not None:
+                timer = event.time('execute', timer)
+
+            labels = [column[0] for column in cursor.description or ()]
+            if not labels:
+                rows = []
+            elif self.fetch_budget is not None:
+                rows = self.fetch_budget.fetch(cursor, sql)
+            else:
+                rows = cursor.fetchall()
+
+            connection.release_cursor(cursor)
+
+            if event is not None:
+                event.time('fetch', timer)
+                event.rows = len(rows)
+
+            # The plan is found while the connection is still checked out, so
+            # it is found using the same connection (and transaction).
+            if self.slow_queries is not None and not many:
+                self.slow_queries.record(self, connection, name, sql, literals,
+                                         time.time() - start, event)
+        except Exception as e:
+            # Only errors with the connection itself count against the
+            # server, not errors in the statement.
+            self.router.finish(name, start, failed=type(e).__name__ in (
+                'InterfaceError', 'OperationalError'))
+            raise
+        else:
+            self.router.finish(name, start)
+        finally:
+            self.release(name, connection)
+
+        return labels, rows
+
+    def flush(self):
+        """
+            Sends every pending write to the servers (without committing
+            them), returning the number of statements run.
+        """
+        if not len(self.unit_of_work):
+            return 0
+
+        return self.unit_of_work.flush(self)
+
+    def commit(self):
+        """
+            Commits any currently uncommitted changes, flushing any pending
+            writes first.
+        """
+        self.flush()
+
+        try:
+            for name, connection in list(self._held.items()):
+                if connection.is_dirty:
+                    connection.commit()
+
+                del self._held[name]
+                connection.close()
+        finally:
+            self.end_writes()
+
+    def rollback(self):
+        """
+            Rolls back any currently uncommitted changes, dropping any
+            pending writes.
+        """
+        self.unit_of_work.clear()
+
+        # Rows loaded since the changes were made could include them.
+        self.identity.invalidate()
+
+        try:
+            for name, connection in list(self._held.items()):
+                if connection.is_dirty:
+                    connection.rollback()
+
+                del self._held[name]
+                connection.close()
+        finally:
+            self.end_writes()
+
+    def statement_stats(self, name=None):
+        """
+            Returns the size, hits, misses and evictions of the statement
+            caches of the connections to the server `name` (or every server,
+            see pyorm.pool.StatementCache).
+        """
+        stats = {'size': 0, 'hits': 0, 'misses': 0, 'evictions': 0}
+        pools = [self.pool(name)] if name is not None else list(self._pools.values())
+
+        for pool in pools:
+            for key, value in pool.statement_stats().items():
+                stats[key] += value
+
+        return stats
+
+    def dispose(self):
+        """
+            Closes the idle connections in every pool.
+        """
+        for pool in self._pools.values():
+            pool.dispose()
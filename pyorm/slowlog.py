@@ -0,0 +1,93 @@
+import collections
+import logging
+import os
+import time
+import traceback
+
+
+logger = logging.getLogger('pyorm.slow_queries')
+
+# Frames from the modules in this directory are skipped when looking for the
+# code that ran a query.
+_package = os.path.dirname(os.path.abspath(__file__))
+
+
+def call_site():
+    """
+        Returns (filename, line, function) for the innermost frame outside of
+        pyorm, which is the code that caused the query to be run.
+    """
+    for filename, line, function, text in reversed(traceback.extract_stack()):
+        if os.path.dirname(os.path.abspath(filename)) != _package:
+            return filename, line, function
+
+    return None
+
+
+class SlowQueryLog(object):
+    """
+        Records the queries taking longer than `threshold` seconds to run,
+        along with the model (and python code) they were run for, how long
+        each phase of the query took (see pyorm.events), and the plan the
+        database used, found by running the dialect's EXPLAIN on the same
+        connection as soon as the query finishes.
+
+        The last `limit` slow queries are kept in `entries`, and each one is
+        logged to the `pyorm.slow_queries` logger.  If `redact` is set, the
+        literals sent with the queries are left out.
+
+        This is set up using `slow_query_threshold` on the session's config
+        (along with `slow_query_redact` and `slow_query_explain`).
+    """
+    def __init__(self, threshold, redact=False, explain=True, limit=100):
+        self.threshold = threshold
+        self.redact = redact
+        self.explain = explain
+        self.entries = collections.deque(maxlen=limit)
+
+    def record(self, session, connection, name, sql, literals, elapsed, event=None):
+        """
+            Records the query if it is slow, returning the entry recorded (or
+            None if the query wasn't slow).
+        """
+        if elapsed < self.threshold:
+            return None
+
+        plan = None
+        if self.explain and sql.lstrip()[:6].upper() == 'SELECT':
+            plan = self.plan(session.dialect(name), connection, sql, literals)
+
+        entry = {
+            'time': time.time(),
+            'server': name,
+            'model': getattr(event, 'model', None),
+            'sql': sql,
+            'literals': None if self.redact else list(literals),
+            'elapsed': elapsed,
+            'phases': dict(getattr(event, 'phases', {})),
+            'call_site': call_site(),
+            'plan': plan,
+        }
+
+        self.entries.append(entry)
+        logger.warning(
+            'Slow query (%.3fs) for %s on %s at %s: %s %s\n%s', elapsed,
+            entry['model'], name, entry['call_site'], sql,
+            '[redacted]' if self.redact else entry['literals'], plan)
+
+        return entry
+
+    def plan(self, dialect, connection, sql, literals):
+        """
+            Returns the rows of the plan for the query, or None if the plan
+            couldn't be found.
+        """
+        try:
+            cursor = connection.cursor()
+            try:
+                cursor.execute(dialect.explain(sql), list(literals))
+                return [tuple(row) for row in cursor.fetchall()]
+            finally:
+                cursor.close()
+        except Exception:
+            return None
@@ -0,0 +1,152 @@
+import json
+import math
+import threading
+
+from pyorm.events import normalize
+
+
+class Histogram(object):
+    """
+        Streaming histogram of latencies, holding a count for each bucket
+        rather than every value, so it stays small however many values are
+        added.  Bucket boundaries grow by `precision` each time (5% by
+        default), so percentiles are accurate to within that much.
+    """
+    def __init__(self, precision=0.05, minimum=1e-6):
+        self.precision = precision
+        self.minimum = minimum
+        self.count = 0
+        self.total = 0.0
+        self.max = 0.0
+        self._base = math.log(1 + precision)
+        self._buckets = {}
+
+    def bucket(self, value):
+        if value <= self.minimum:
+            return 0
+
+        return int(math.ceil(math.log(value / self.minimum) / self._base))
+
+    def add(self, value):
+        bucket = self.bucket(value)
+        self._buckets[bucket] = self._buckets.get(bucket, 0) + 1
+        self.count += 1
+        self.total += value
+        self.max = max(self.max, value)
+
+    @property
+    def mean(self):
+        return self.total / self.count if self.count else 0.0
+
+    def percentile(self, percent):
+        """
+            Returns the value `percent` percent of the values are at or below
+            (the upper bound of its bucket).
+        """
+        if not self.count:
+            return 0.0
+
+        rank = max(int(math.ceil(self.count * percent / 100.0)), 1)
+        seen = 0
+
+        for bucket in sorted(self._buckets):
+            seen += self._buckets[bucket]
+            if seen >= rank:
+                return min(self.minimum * (1 + self.precision) ** bucket, self.max)
+
+        return self.max
+
+
+class QueryStats(object):
+    """
+        Collects statistics for the queries run through a session, grouped by
+        the fingerprint of their sql (see pyorm.events.fingerprint()), so that
+        each query is counted once however many times it is run, similar to
+        pg_stat_statements:
+            stats = session.enable_stats()
+            ...
+            print(stats.to_text())
+
+        For each query this keeps the number of calls, the rows returned, the
+        latency (total, mean, 95th and 99th percentiles) and the ratio of
+        calls answered by the query cache.
+    """
+    def __init__(self, precision=0.05):
+        self.precision = precision
+        self._queries = {}
+        self._lock = threading.Lock()
+
+    def __call__(self, event):
+        if event.sql is None:
+            return
+
+        key = event.fingerprint
+
+        with self._lock:
+            query = self._queries.get(key)
+
+            if query is None:
+                query = self._queries[key] = {
+                    'query': normalize(event.sql),
+                    'model': event.model,
+                    'rows': 0,
+                    'cache_hits': 0,
+                    'latency': Histogram(self.precision)}
+
+            query['rows'] += event.rows
+            query['cache_hits'] += 1 if event.cached else 0
+            query['latency'].add(event.elapsed)
+
+    def __len__(self):
+        return len(self._queries)
+
+    def reset(self):
+        with self._lock:
+            self._queries = {}
+
+    def snapshot(self):
+        """
+            Returns the statistics for each query, the queries taking up the
+            most time first.
+        """
+        with self._lock:
+            queries = []
+
+            for key, query in self._queries.items():
+                latency = query['latency']
+                queries.append({
+                    'fingerprint': key,
+                    'query': query['query'],
+                    'model': query['model'],
+                    'calls': latency.count,
+                    'rows': query['rows'],
+                    'total_time': latency.total,
+                    'mean_time': latency.mean,
+                    'p95_time': latency.percentile(95),
+                    'p99_time': latency.percentile(99),
+                    'max_time': latency.max,
+                    'cache_hit_ratio': float(query['cache_hits']) / latency.count})
+
+        queries.sort(key=lambda query: query['total_time'], reverse=True)
+        return queries
+
+    def to_json(self, **kwargs):
+        return json.dumps(self.snapshot(), **kwargs)
+
+    def to_text(self, limit=None):
+        """
+            Returns a table of the `limit` queries taking up the most time,
+            with the times in milliseconds.
+        """
+        lines = ['{0:>8} {1:>10} {2:>10} {3:>10} {4:>10} {5:>8} {6:>6}  {7}'.format(
+            'calls', 'total', 'mean', 'p95', 'p99', 'rows', 'cache', 'query')]
+
+        for query in self.snapshot()[:limit]:
+            lines.append(
+                '{calls:>8} {0:>10.3f} {1:>10.3f} {2:>10.3f} {3:>10.3f} {rows:>8} '
+                '{4:>6.0%}  {query}'.format(
+                    query['total_time'] * 1000, query['mean_time'] * 1000,
+                    query['p95_time'] * 1000, query['p99_time'] * 1000,
+                    query['cache_hit_ratio'], **query))
+
+        return '\n'.join(lines)
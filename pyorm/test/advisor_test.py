@@ -0,0 +1,234 @@
+import functools
+import unittest
+import warnings
+
+from pyorm.advisor import IndexAdvisor, access, candidate, covering_index, serves
+from pyorm.column import Column as C
+from pyorm.dialect import Dialect, MySQLDialect, PostgreSQLDialect
+from pyorm.field import Char, Integer
+from pyorm.indexes import Index, Unique
+from pyorm.model import Model
+from pyorm.schema import Migration
+from pyorm.session import Session
+from pyorm.test import helpers
+
+
+class MockConfig(helpers.SingleConnectionConfig):
+    index_advisor = True
+
+
+class MockOrder(Model):
+    customer_id = Integer()
+    status = Integer()
+    total = Integer()
+    code = Char(length=10)
+
+    class Indexes:
+        code = Unique('code')
+        total = Index('total')
+
+
+class MockListing(Model):
+    category = Integer()
+    price = Integer()
+    title = Char(length=40)
+    sku = Char(length=10)
+
+    class Indexes:
+        listing = Index('category', 'price')
+        sku = Unique('sku')
+
+
+class AccessTestCase(unittest.TestCase):
+    def test_access(self):
+        model = MockOrder().filters(
+            C.customer_id == 3, C.total > 10, C.status == C.total).order(-C.total)
+        pattern = access(model)
+
+        self.assertEqual(pattern.table, 'mockorder')
+        self.assertEqual(pattern.equality, ('customer_id',))
+        self.assertEqual(pattern.range, ('total',))
+        self.assertEqual(pattern.order, (('total', True),))
+        self.assertEqual(candidate(pattern), ('customer_id', 'total'))
+
+    def test_serves(self):
+        pattern = access(MockOrder().filters(C.customer_id == 3, C.status == 1)
+                         .order(C.total))
+
+        self.assertEqual(candidate(pattern), ('customer_id', 'status', 'total'))
+        self.assertEqual(serves(('status', 'customer_id', 'total'), pattern), 3)
+        self.assertEqual(serves(('customer_id', 'total'), pattern), 1)
+        self.assertEqual(serves(('total',), pattern), 0)
+
+
+class IndexAdvisorTestCase(unittest.TestCase):
+    def setUp(self):
+        self.session = Session(MockConfig)
+        Migration(self.session, [MockOrder]).run()
+
+    def tearDown(self):
+        self.session.dispose()
+
+    def query(self, *filters):
+        return list(MockOrder(session=self.session).filters(*filters))
+
+    def test_missing(self):
+        for i in range(3):
+            self.query(C.customer_id == i, C.status == 1)
+        self.query(C.code == 'a')
+        self.query(C.total > 5)
+
+        missing = self.session.advisor.missing()
+        self.assertEqual(len(missing), 1)
+        self.assertEqual(missing[0]['columns'], ('customer_id', 'status'))
+        self.assertEqual(missing[0]['index'],
+                         "customer_id_status = Index('customer_id', 'status')")
+        self.assertEqual(missing[0]['calls'], 3)
+        self.assertTrue(missing[0]['benefit'] > 0)
+
+    def test_unused(self):
+        order = MockOrder(session=self.session)
+        order.insert(customer_id=1, status=1, total=5, code='a')
+        self.session.commit()
+        self.query(C.customer_id == 1)
+
+        unused = self.session.advisor.suggestions()['unused']
+        self.assertEqual([(index['index'], index['writes']) for index in unused],
+                         [('total', 1)])
+
+        self.query(C.total == 5)
+        self.assertEqual(self.session.advisor.suggestions()['unused'], [])
+
+    def test_explain(self):
+        self.query(C.customer_id == 1, C.status == 2)
+        advisor = self.session.advisor
+        suggestion = advisor.missing()[0]
+
+        before = advisor.explain(self.session, suggestion)
+        self.assertIn('SCAN', str(before))
+
+        self.session.run('main', 'CREATE INDEX mockorder_customer_id_status ON '
+                                 'mockorder (customer_id, status)')
+        self.session.commit()
+
+        after = advisor.explain(self.session, suggestion)
+        self.assertIn('USING INDEX mockorder_customer_id_status', str(after))
+
+    def test_redact(self):
+        advisor = IndexAdvisor(redact=True)
+        self.session.disable_advisor()
+        self.session.instrumentation.listen(advisor)
+        self.session.advisor = advisor
+
+        self.query(C.customer_id == 1)
+        self.assertEqual(advisor.explain(self.session, advisor.missing()[0]), {})
+
+
+class CoveringIndexTestCase(unittest.TestCase):
+    def setUp(self):
+        self.query = MockListing().fields(C.price).filters(
+            C.category == 1).order(C.price)
+
+    def test_covering_index(self):
+        self.assertEqual(covering_index(self.query).name, 'listing')
+        self.assertEqual(covering_index(MockListing().fields(C.sku).filters(
+            C.sku == 'x')).name, 'sku')
+        self.assertIsNone(covering_index(self.query.fields(C.title)))
+        self.assertIsNone(covering_index(self.query.filters(C.title == 'a')))
+
+        # Without the primary key in the index, it has to be declared.
+        self.assertIsNone(covering_index(self.query, includes_primary_key=False))
+
+    def test_hints(self):
+        sql, literals = self.query.index_hints().compile()
+        self.assertEqual(sql, 'SELECT "mocklisting"."price" AS "price", '
+                              '"mocklisting"."id" AS "id" FROM "mocklisting" '
+                              'INDEXED BY "mocklisting_listing" WHERE '
+                              '("mocklisting"."category" = ?) '
+                              'ORDER BY "mocklisting"."price"')
+
+        sql, literals = self.query.index_hints().compile(MySQLDialect())
+        self.assertIn('FROM `mocklisting` USE INDEX (`mocklisting_listing`) WHERE', sql)
+
+        sql, literals = self.query.index_hints().compile(PostgreSQLDialect())
+        self.assertIn('FROM "mocklisting" WHERE', sql)
+        self.assertIn('"sku"', sql)
+
+    def test_disabled(self):
+        sql, literals = self.query.compile()
+        self.assertNotIn('INDEXED BY', sql)
+        self.assertIn('"mocklisting"."sku" AS "sku"', sql)
+
+        MockListing.Meta.index_hints = True
+        try:
+            self.assertIn('INDEXED BY', MockListing().fields(C.price).compile()[0])
+            sql, literals = MockListing().fields(C.price).index_hints(False).compile()
+            self.assertNotIn('INDEXED BY', sql)
+        finally:
+            MockListing.Meta.index_hints = False
+
+    def test_not_covered(self):
+        sql, literals = self.query.fields(C.title).index_hints().compile()
+        self.assertNotIn('INDEXED BY', sql)
+        self.assertIn('"mocklisting"."sku" AS "sku"', sql)
+
+        # Every field is selected unless specific fields are requested.
+        sql, literals = MockListing().filters(C.category == 1).index_hints().compile()
+        self.assertNotIn('INDEXED BY', sql)
+
+    def test_covering_scan(self):
+        session = Session(MockConfig)
+        self.addCleanup(session.dispose)
+        session.disable_advisor()
+        Migration(session, [MockListing]).run()
+
+        listing = MockListing(session=session)
+        listing.insert(category=1, price=5, title='a', sku='x')
+        session.commit()
+
+        query = self.query.index_hints()
+        sql, literals = query.compile()
+        plan = session.run('main', Dialect().explain(sql), literals)
+        self.assertIn('COVERING INDEX mocklisting_listing', str(plan))
+
+        listings = MockListing(session=session).fields(C.price).filters(
+            C.category == 1).index_hints()
+        rows = list(listings)
+        self.assertEqual(rows[0].price, 5)
+
+        # The unique key left out of the query is loaded when it's needed.
+        with warnings.catch_warnings(record=True) as caught:
+            warnings.simplefilter('always')
+            self.assertEqual(rows[0].sku, 'x')
+        self.assertEqual(len(caught), 1)
+
+    def test_missing_index(self):
+        session = Session(MockConfig)
+        self.addCleanup(session.dispose)
+        session.disable_advisor()
+        Migration(session, [MockListing]).run()
+        session.run('main', 'DROP INDEX mocklisting_listing')
+        session.commit()
+        session.schema.invalidate()
+
+        listing = MockListing(session=session)
+        listing.insert(category=1, price=5, title='a', sku='x')
+        session.commit()
+
+        # Without the index on the server, the query is sent without a hint.
+        live_indexes = functools.partial(session.schema.indexes, 'main')
+        sql, literals = Dialect().select(self.query.index_hints(), live_indexes)
+        self.assertNotIn('INDEXED BY', sql)
+        self.assertIn('"mocklisting"."sku" AS "sku"', sql)
+
+        listings = MockListing(session=session).fields(C.price).filters(
+            C.category == 1).index_hints()
+        self.assertEqual([row.price for row in listings], [5])
+
+        session.run('main', 'CREATE INDEX mocklisting_listing ON '
+                            'mocklisting (category, price)')
+        session.commit()
+        session.schema.invalidate()
+
+        sql, literals = Dialect().select(self.query.index_hints(), live_indexes)
+        self.assertIn('INDEXED BY "mocklisting_listing"', sql)
@@ -0,0 +1,207 @@
+import os
+import shutil
+import tempfile
+import time
+import unittest
+
+from pyorm.cache import LRUCache, QueryCache
+from pyorm.field import Char
+from pyorm.model import Model
+from pyorm.session import Session
+from pyorm.test import helpers
+
+
+class LRUCacheTestCase(unittest.TestCase):
+    def test_get_set(self):
+        cache = LRUCache()
+        self.assertEqual(cache.get('a'), None)
+
+        cache.set('a', 1)
+        self.assertEqual(cache.get('a'), 1)
+
+        cache.delete('a')
+        self.assertEqual(cache.get('a'), None)
+
+    def test_max_size(self):
+        cache = LRUCache(max_size=2)
+        cache.set('a', 1)
+        cache.set('b', 2)
+        cache.get('a')
+        cache.set('c', 3)
+
+        self.assertEqual(len(cache), 2)
+        self.assertEqual((cache.get('a'), cache.get('b'), cache.get('c')),
+                         (1, None, 3))
+
+    def test_ttl(self):
+        cache = LRUCache()
+        cache.set('a', 1, ttl=60)
+        cache.set('b', 2, ttl=60)
+        cache._values['b'] = (2, time.time() - 1)
+
+        self.assertEqual((cache.get('a'), cache.get('b')), (1, None))
+
+
+class QueryCacheTestCase(unittest.TestCase):
+    def test_key(self):
+        cache = QueryCache(LRUCache())
+        key = cache.key('main', ['a', 'b'], 'SELECT 1', [1])
+
+        self.assertEqual(key, cache.key('main', ['b', 'a'], 'SELECT 1', [1]))
+        self.assertNotEqual(key, cache.key('main', ['a', 'b'], 'SELECT 1', [2]))
+        self.assertNotEqual(key, cache.key('other', ['a', 'b'], 'SELECT 1', [1]))
+
+        cache.invalidate('b')
+        self.assertNotEqual(key, cache.key('main', ['a', 'b'], 'SELECT 1', [1]))
+
+    def test_pending(self):
+        cache = QueryCache(LRUCache())
+        key = cache.key('main', ['a'], 'SELECT 1', [])
+
+        cache.pending('a')
+        self.assertEqual(cache.key('main', ['a'], 'SELECT 1', []), None)
+        self.assertNotEqual(cache.key('main', ['b'], 'SELECT 1', []), None)
+
+        cache.invalidate('a')
+        self.assertNotIn(cache.key('main', ['a'], 'SELECT 1', []), (key, None))
+
+    def test_lost_generation(self):
+        cache = QueryCache(LRUCache())
+        key = cache.key('main', ['a'], 'SELECT 1', [])
+        cache.backend.delete('pyorm:table:a')
+
+        self.assertNotEqual(key, cache.key('main', ['a'], 'SELECT 1', []))
+
+    def test_written_table(self):
+        cache = QueryCache(LRUCache())
+        self.assertEqual(cache.written_table('INSERT INTO "book" (id) VALUES (?)'), 'book')
+        self.assertEqual(cache.written_table('insert ignore into book(id) values (1)'), 'book')
+        self.assertEqual(cache.written_table('REPLACE INTO `book` VALUES (1)'), 'book')
+        self.assertEqual(cache.written_table('UPDATE book SET id = 1'), 'book')
+        self.assertEqual(cache.written_table('DELETE FROM book'), 'book')
+        self.assertEqual(cache.written_table('TRUNCATE TABLE book'), 'book')
+        self.assertEqual(cache.written_table('SELECT * FROM book'), None)
+
+
+class MockConfig(helpers.MockConfig):
+    def __init__(self, session):
+        self.cache_backend = LRUCache()
+
+
+class MockCachedItem(Model):
+    name = Char(length=20)
+
+    class Meta:
+        cache_ttl = 60
+
+
+class MockUncachedItem(Model):
+    name = Char(length=20)
+    planned = []
+
+    class Meta:
+        db_table = 'mockcacheditem'
+
+    def tables(self):
+        MockUncachedItem.planned.append(self.Meta.db_table)
+        return super(MockUncachedItem, self).tables()
+
+
+class SessionCacheTestCase(unittest.TestCase):
+    def setUp(self):
+        self.session = Session(MockConfig)
+        self.session.execute(
+            'main', 'CREATE TABLE mockcacheditem (id INTEGER PRIMARY KEY, name TEXT)')
+        self.session.execute(
+            'main', 'INSERT INTO mockcacheditem (name) VALUES (?)', ['one'])
+        self.session.commit()
+
+    def names(self):
+        return [row.name for row in MockCachedItem(session=self.session)]
+
+    def test_cached(self):
+        self.assertEqual(self.names(), ['one'])
+        self.assertEqual(self.names(), ['one'])
+        self.assertEqual((self.session.cache.hits, self.session.cache.misses), (1, 1))
+
+    def test_invalidated_by_write(self):
+        self.assertEqual(self.names(), ['one'])
+        self.session.execute(
+            'main', 'INSERT INTO mockcacheditem (name) VALUES (?)', ['two'])
+
+        # Not cached while the write is uncommitted.
+        self.assertEqual(self.names(), ['one', 'two'])
+        self.session.rollback()
+
+        self.assertEqual(self.names(), ['one'])
+        self.assertEqual(self.session.cache.hits, 0)
+
+    def test_invalidated_by_truncate(self):
+        self.assertEqual(self.names(), ['one'])
+        MockCachedItem(session=self.session).truncate()
+        self.session.commit()
+
+        self.assertEqual(self.names(), [])
+        self.assertEqual(self.session.cache.hits, 0)
+
+    def test_uncached_model(self):
+        model = Model(session=self.session)
+        self.assertEqual(model.Meta.cache_ttl, None)
+
+        # Without a ttl, the tables read from aren't worked out.
+        del MockUncachedItem.planned[:]
+        names = [row.name for row in MockUncachedItem(session=self.session)]
+        self.assertEqual(names, ['one'])
+        self.assertEqual(MockUncachedItem.planned, [])
+        self.assertEqual(self.session.cache.misses, 0)
+
+
+class SharedCacheTestCase(unittest.TestCase):
+    def setUp(self):
+        self.directory = tempfile.mkdtemp()
+        backend = LRUCache()
+
+        class Config(helpers.MockConfig):
+            servers = {'main': {'driver': 'sqlite3', 'database': os.path.join(
+                self.directory, 'test.db')}}
+            cache_backend = backend
+
+        self.writer = Session(Config)
+        self.reader = Session(Config)
+        self.writer.execute(
+            'main', 'CREATE TABLE mockcacheditem (id INTEGER PRIMARY KEY, name TEXT)')
+        self.writer.execute(
+            'main', 'INSERT INTO mockcacheditem (name) VALUES (?)', ['one'])
+        self.writer.commit()
+
+    def tearDown(self):
+        self.writer.rollback()
+        self.writer.dispose()
+        self.reader.dispose()
+        shutil.rmtree(self.directory)
+
+    def names(self):
+        return [row.name for row in MockCachedItem(session=self.reader)]
+
+    def test_uncommitted_write(self):
+        self.assertEqual(self.names(), ['one'])
+        self.writer.execute('main', 'UPDATE mockcacheditem SET name = ?', ['two'])
+
+        # The other session doesn't cache the table while the write is open.
+        self.assertEqual(self.names(), ['one'])
+        self.assertEqual(self.names(), ['one'])
+        self.assertEqual(self.reader.cache.hits, 0)
+
+        self.writer.commit()
+        self.assertEqual(self.names(), ['two'])
+        self.assertEqual(self.names(), ['two'])
+        self.assertEqual(self.reader.cache.hits, 1)
+
+    def test_rollback(self):
+        self.writer.execute('main', 'UPDATE mockcacheditem SET name = ?', ['two'])
+        self.assertEqual(self.names(), ['one'])
+        self.writer.rollback()
+
+        self.assertEqual(self.names(), ['one'])
+        self.assertEqual(self.names(), ['one'])
+        self.assertEqual(self.reader.cache.hits, 1)
@@ -317,3 +317,19 @@ class ColumnTestCase(unittest.TestCase):
         self.assertEqual(exp.op, OP_GT)
         self.assertEqual(exp._tokens[0].type, T_COL)
         self.assertEqual(exp._tokens[-1].type, T_COL)
+
+    def test_neg(self):
+        exp = -Column.test
+        self.assertEqual(type(exp), Expression)
+        self.assertEqual(exp.op, OP_DESC)
+        self.assertEqual(exp._tokens[0].type, T_COL)
+
+        exp = -exp
+        self.assertEqual(exp.op, OP_ASC)
+        self.assertEqual(exp._tokens[0].type, T_COL)
+
+    def test_pos(self):
+        exp = +Column.test
+        self.assertEqual(type(exp), Expression)
+        self.assertEqual(exp.op, OP_ASC)
+        self.assertEqual(exp._tokens[0].type, T_COL)
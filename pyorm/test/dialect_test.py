@@ -0,0 +1,121 @@
+import unittest
+
+from pyorm.column import Column as C
+from pyorm.dialect import Dialect, MySQLDialect
+from pyorm.expression import Expression
+from pyorm.field import Integer
+from pyorm.model import Model
+from pyorm.relationship import OneToOne
+from pyorm.token import *
+
+
+class MockAuthor(Model):
+    name = Integer()
+
+
+class MockBook(Model):
+    title = Integer()
+    class_ = Integer()
+    author = OneToOne(MockAuthor)
+
+    class Meta:
+        db_table = 'book'
+
+
+class DialectTestCase(unittest.TestCase):
+    def setUp(self):
+        self.dialect = Dialect()
+        self.model = MockBook()
+
+    def test_quote(self):
+        self.assertEqual(self.dialect.quote('test'), '"test"')
+        self.assertEqual(self.dialect.quote('te"st'), '"te""st"')
+        self.assertEqual(MySQLDialect().quote('test'), '`test`')
+
+    def test_column(self):
+        self.assertEqual(self.dialect.column(self.model, C.class_),
+                         '"book"."class"')
+        self.assertEqual(self.dialect.column(self.model, C.author.name),
+                         '"author"."name"')
+        self.assertEqual(self.dialect.column(self.model, C.name, ('author',)),
+                         '"author"."name"')
+
+    def test_expression(self):
+        sql, literals = self.dialect.expression(
+            self.model, (C.title * 3) + 4 == C.class_)
+        self.assertEqual(sql, '((("book"."title" * ?) + ?) = "book"."class")')
+        self.assertEqual(literals, [3, 4])
+
+    def test_expression_in(self):
+        sql, literals = self.dialect.expression(self.model, C.title == [1, 2])
+        self.assertEqual(sql, '("book"."title" IN (?, ?))')
+        self.assertEqual(literals, [1, 2])
+
+        sql, literals = self.dialect.expression(self.model, C.title != [])
+        self.assertEqual(sql, '("book"."title" NOT IN (NULL))')
+        self.assertEqual(literals, [])
+
+    def test_expression_null(self):
+        sql, literals = self.dialect.expression(self.model, C.title == None)
+        self.assertEqual(sql, '("book"."title" IS NULL)')
+        self.assertEqual(literals, [])
+
+    def test_select_all_fields(self):
+        sql, literals = self.dialect.select(self.model)
+        self.assertEqual(
+            sql, 'SELECT "book"."id" AS "id", "book"."title" AS "title", '
+            '"book"."class" AS "class_", "book"."author_id" AS "author_id" '
+            'FROM "book"')
+
+    def test_select_join(self):
+        sql, literals = self.dialect.select(
+            self.model.fields(C.title, C.author.name).filters(C.title > 1))
+        self.assertEqual(
+            sql, 'SELECT "book"."title" AS "title", "author"."name" AS "author.name", '
+            '"book"."id" AS "id" FROM "book" INNER JOIN "mockauthor" AS "author" ON '
+            '"author"."id" = "book"."author_id" WHERE ("book"."title" > ?)')
+        self.assertEqual(literals, [1])
+
+    def test_select_semi_join(self):
+        sql, literals = self.dialect.select(
+            self.model.fields(C.title).filters(C.author.name == 'x', C.title > 1))
+        self.assertEqual(
+            sql, 'SELECT "book"."title" AS "title", "book"."id" AS "id" FROM "book" WHERE '
+            '("book"."title" > ?) AND EXISTS (SELECT 1 FROM "mockauthor" AS '
+            '"author" WHERE "author"."id" = "book"."author_id" AND '
+            '("author"."name" = ?))')
+        self.assertEqual(literals, [1, 'x'])
+
+    def test_select_clauses(self):
+        model = self.model.fields(C.title, total=Expression(C.title, op=OP_ADD))
+        model = model.group(C.title).having(C.title > 2).order(C.title)
+        sql, literals = self.dialect.select(model)
+        self.assertEqual(
+            sql, 'SELECT "book"."title" AS "title", "book"."id" AS "id", '
+            '("book"."title") AS "total" FROM "book" GROUP BY "book"."title" HAVING ("book"."title" > ?) '
+            'ORDER BY "book"."title"')
+        self.assertEqual(literals, [2])
+
+    def test_select_order_direction(self):
+        model = self.model.fields(C.title).order(-C.title, +C.class_, C.id)
+        sql, literals = self.dialect.select(model)
+        self.assertEqual(
+            sql, 'SELECT "book"."title" AS "title", "book"."id" AS "id" FROM "book" '
+            'ORDER BY "book"."title" DESC, "book"."class" ASC, "book"."id"')
+
+    def test_select_limit(self):
+        model = self.model.fields(C.title)
+        sql, literals = self.dialect.select(model[10:30])
+        self.assertTrue(sql.endswith('FROM "book" LIMIT ? OFFSET ?'))
+        self.assertEqual(literals, [20, 10])
+
+        sql, literals = self.dialect.select(model[:5])
+        self.assertTrue(sql.endswith('FROM "book" LIMIT ?'))
+        self.assertEqual(literals, [5])
+
+        sql, literals = self.dialect.select(model[5:])
+        self.assertTrue(sql.endswith('FROM "book" LIMIT -1 OFFSET ?'))
+        self.assertEqual(literals, [5])
+
+        sql, literals = MySQLDialect().select(model[5:])
+        self.assertTrue(sql.endswith('LIMIT 18446744073709551615 OFFSET %s'))
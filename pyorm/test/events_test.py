@@ -0,0 +1,93 @@
+import unittest
+
+from pyorm.column import Column as C
+from pyorm.events import Instrumentation, QueryEvent, fingerprint, normalize
+from pyorm.field import Char, Integer
+from pyorm.model import Model
+from pyorm.session import Session
+from pyorm.test.helpers import SingleConnectionConfig
+
+
+class MockPlayer(Model):
+    name = Char(length=20)
+    score = Integer()
+
+    class Meta:
+        verbose_name = 'Player'
+
+
+class FingerprintTestCase(unittest.TestCase):
+    def test_normalize(self):
+        self.assertEqual(
+            normalize('SELECT  *\n FROM t WHERE a IN (?, ?, ?) AND b = 1'),
+            'SELECT * FROM t WHERE a IN (...) AND b = ?')
+        self.assertEqual(normalize("SELECT * FROM t1 WHERE a = 'it''s'"),
+                         'SELECT * FROM t1 WHERE a = ?')
+
+    def test_fingerprint(self):
+        self.assertEqual(fingerprint('SELECT * FROM t WHERE a IN (?, ?)'),
+                         fingerprint('SELECT * FROM t WHERE a IN (?)'))
+        self.assertNotEqual(fingerprint('SELECT a FROM t'),
+                            fingerprint('SELECT b FROM t'))
+
+
+class InstrumentationTestCase(unittest.TestCase):
+    def test_disabled(self):
+        instrumentation = Instrumentation()
+        self.assertEqual(instrumentation.start(), None)
+
+        events = []
+        instrumentation.listen(events.append)
+        self.assertTrue(isinstance(instrumentation.start('Player'), QueryEvent))
+
+        instrumentation.remove(events.append)
+        self.assertFalse(instrumentation.enabled)
+
+
+class SessionInstrumentationTestCase(unittest.TestCase):
+    def setUp(self):
+        self.session = Session(SingleConnectionConfig)
+        self.session.execute(
+            'main', 'CREATE TABLE mockplayer (id INTEGER PRIMARY KEY, name TEXT, '
+            'score INTEGER)')
+        self.session.execute(
+            'main', 'INSERT INTO mockplayer (name, score) VALUES (?, ?), (?, ?)',
+            ['one', 1, 'two', 2])
+        self.session.commit()
+
+        self.events = []
+        self.session.instrumentation.listen(self.events.append)
+
+    def tearDown(self):
+        self.session.dispose()
+
+    def test_model_phases(self):
+        model = MockPlayer(session=self.session).filters(C.score > 0).get()
+
+        self.assertEqual(len(self.events), 1)
+        event = self.events[0]
+        self.assertEqual((event.model, event.server, event.rows),
+                         ('Player', 'main', 2))
+        self.assertEqual(sorted(event.phases), sorted(
+            ['flatten', 'compile', 'checkout', 'execute', 'fetch', 'convert']))
+        self.assertEqual(event.fingerprint, fingerprint(event.sql))
+        self.assertEqual(event.literals, [0])
+
+        # Values were converted up front, so they aren't converted again.
+        self.assertEqual(model._records[0].converted['name'], 'one')
+
+    def test_session_execute(self):
+        self.session.execute('main', 'SELECT 1')
+
+        self.assertEqual(len(self.events), 1)
+        self.assertEqual(self.events[0].model, None)
+        self.assertEqual(self.events[0].rows, 1)
+
+    def test_map(self):
+        model = MockPlayer(session=self.session).order(C.id)
+        model.map(dict, {'player': C.name, 'kind': 'player'})
+
+        self.assertEqual(list(model), [{'player': 'one', 'kind': 'player'},
+                                       {'player': 'two', 'kind': 'player'}])
+        self.assertEqual(list(self.events[-1].phases), ['map'])
+        self.assertEqual(self.events[-1].rows, 2)
@@ -0,0 +1,20 @@
+class MockConfig(object):
+    """
+        Session config for a single in-memory sqlite server called `main`.
+        Tests needing other settings subclass it.
+    """
+    servers = {'main': {'driver': 'sqlite3', 'database': ':memory:'}}
+    default_read_server = 'main'
+    default_write_server = 'main'
+
+    def __init__(self, session):
+        pass
+
+
+class SingleConnectionConfig(MockConfig):
+    """
+        Each connection to an in-memory database gets a database of its own,
+        so the pool is limited to one connection for tests creating tables.
+    """
+    servers = {'main': {'driver': 'sqlite3', 'database': ':memory:',
+                        'pool': {'max_size': 1, 'overflow': 0}}}
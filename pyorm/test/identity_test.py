@@ -0,0 +1,107 @@
+import gc
+import unittest
+
+from pyorm.column import Column as C
+from pyorm.field import Char, Integer
+from pyorm.identity import IdentityMap, Row
+from pyorm.model import Model
+from pyorm.session import Session
+from pyorm.test.helpers import MockConfig
+
+
+class MockUser(Model):
+    name = Char(length=20)
+    age = Integer()
+
+
+class IdentityMapTestCase(unittest.TestCase):
+    def test_merge(self):
+        identity = IdentityMap()
+        row = Row(id=1, name='one')
+        row.converted['name'] = 'one'
+
+        self.assertTrue(identity.merge('user', (1,), row) is row)
+        self.assertTrue(identity.get('user', (1,)) is row)
+
+        merged = identity.merge('user', (1,), Row(id=1, name='uno'))
+        self.assertTrue(merged is row)
+        self.assertEqual(row['name'], 'uno')
+        self.assertEqual(row.converted, {})
+
+    def test_weak(self):
+        identity = IdentityMap()
+        identity.merge('user', (1,), Row(id=1))
+        gc.collect()
+
+        self.assertEqual(identity.get('user', (1,)), None)
+        self.assertEqual(len(identity), 0)
+
+    def test_invalidate(self):
+        identity = IdentityMap()
+        rows = [Row(id=1), Row(id=2)]
+        identity.merge('user', (1,), rows[0])
+        identity.merge('other', (1,), rows[1])
+
+        identity.invalidate('user')
+        self.assertEqual(identity.get('user', (1,)), None)
+        self.assertTrue(identity.get('other', (1,)) is rows[1])
+
+        identity.invalidate()
+        self.assertEqual(len(identity), 0)
+
+
+class SessionIdentityTestCase(unittest.TestCase):
+    def setUp(self):
+        self.session = Session(MockConfig)
+        self.session.execute(
+            'main', 'CREATE TABLE mockuser (id INTEGER PRIMARY KEY, name TEXT, age INTEGER)')
+        self.session.execute(
+            'main', 'INSERT INTO mockuser (name, age) VALUES (?, ?), (?, ?), (?, ?)',
+            ['one', 1, 'two', 2, 'three', 3])
+        self.session.commit()
+
+        self.queries = []
+        execute = self.session.run
+
+        def run(name, sql, literals=(), **kwargs):
+            self.queries.append(sql)
+            return execute(name, sql, literals, **kwargs)
+
+        self.session.run = run
+
+    def test_shared_rows(self):
+        first = MockUser(session=self.session).get()
+        second = MockUser(session=self.session).filters(C.age > 1).get()
+
+        self.assertTrue(first._records[1] is second._records[0])
+
+    def test_get_by_pk(self):
+        # The rows only stay in the identity map while they are in use.
+        users = MockUser(session=self.session).get()
+        self.assertEqual(len(users._records), 3)
+        user = MockUser(session=self.session).get_by_pk(2)
+
+        self.assertEqual(user.name, 'two')
+        self.assertEqual(len(self.queries), 1)
+
+        user = MockUser(session=self.session).get_by_pk((5,))
+        self.assertEqual(user, None)
+        self.assertEqual(len(self.queries), 2)
+
+    def test_get_many(self):
+        user = MockUser(session=self.session).get_by_pk(3)
+        self.assertEqual(user.name, 'three')
+        users = MockUser(session=self.session).get_many([3, 1, 4])
+
+        self.assertEqual([row.name for row in users], ['three', 'one'])
+        self.assertEqual(len(self.queries), 2)
+        self.assertTrue(self.queries[1].endswith('WHERE ("mockuser"."id" IN (?, ?))'))
+        self.assertRaises(Exception, MockUser(session=self.session).get_many, [(1, 2)])
+
+    def test_invalidated_by_write(self):
+        user = MockUser(session=self.session).get_by_pk(1)
+        self.session.execute('main', 'UPDATE mockuser SET name = ? WHERE id = 1', ['uno'])
+
+        self.assertEqual(MockUser(session=self.session).get_by_pk(1).name, 'uno')
+        self.assertEqual(user.name, 'one')
+        self.session.rollback()
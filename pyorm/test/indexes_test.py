@@ -1,6 +1,8 @@
 import unittest
 
-from pyorm.indexes import MetaIndexes
+from pyorm.field import Char
+from pyorm.indexes import Index, MetaIndexes, Unique
+from pyorm.model import Model
 
 class MockGeneric(object):
     def __init__(self, hash_value=None):
@@ -71,3 +73,38 @@ class MetaIndexesTestCase(unittest.TestCase):
         indexes = self.MockMetaIndexes(_owner=mock_owner)
 
         self.assertEqual(id(mock_owner), id(indexes._owner_ref()))
+
+    def test_collected_on_creation(self):
+        class MockModel(Model):
+            name = Char(length=255)
+
+            class Indexes:
+                name_ = Index('name')
+
+        self.assertIn('_unbound', MockModel.Indexes.__dict__)
+        self.assertEqual(sorted(MockModel.Indexes._unbound), ['name_', 'pk'])
+        self.assertEqual(MockModel.Indexes.name_.name, 'name')
+        self.assertEqual(MockModel().Indexes.name_.name, 'name')
+        self.assertNotIn('__getattribute__', MetaIndexes.__dict__)
+
+
+class IndexTestCase(unittest.TestCase):
+    def test_auto_primary_key(self):
+        class MockModel(Model):
+            name = Char(length=255)
+
+        self.assertEqual(MockModel._primary_key, ('id',))
+        self.assertEqual(MockModel._unique_keys, [])
+
+    def test_unique_keys(self):
+        class MockModel(Model):
+            name = Char(length=255)
+            slug = Char(length=255)
+
+            class Indexes:
+                slug = Unique('slug')
+                name = Index('name', unique=True)
+                lookup = Index('name', 'slug')
+
+        self.assertEqual(MockModel._primary_key, ('id',))
+        self.assertEqual(sorted(MockModel._unique_keys), [('name',), ('slug',)])
@@ -0,0 +1,108 @@
+import unittest
+
+from pyorm.column import Column as C
+from pyorm.field import Integer
+from pyorm.join import JoinPlanner
+from pyorm.model import Model
+from pyorm.relationship import OneToOne
+
+
+class MockPublisher(Model):
+    name = Integer()
+
+
+class MockAuthor(Model):
+    name = Integer()
+    publisher = OneToOne(MockPublisher)
+
+
+class MockTag(Model):
+    label = Integer()
+
+
+class MockBook(Model):
+    title = Integer()
+    author = OneToOne(MockAuthor)
+    tag = OneToOne(MockTag, filter=[C.title == C.tag.label])
+
+
+class JoinPlannerTestCase(unittest.TestCase):
+    def test_no_joins(self):
+        root = JoinPlanner(MockBook().filters(C.title == 1)).plan()
+        self.assertEqual(list(root.children), [])
+        self.assertEqual(len(root.filters), 1)
+
+    def test_unreferenced_relationships_dropped(self):
+        root = JoinPlanner(MockBook().fields(C.title)).plan()
+        self.assertEqual(list(root.children), [])
+
+    def test_referenced_in_fields(self):
+        root = JoinPlanner(MockBook().fields(C.author.name)).plan()
+        self.assertEqual(list(root.children), ['author'])
+        self.assertFalse(root.children['author'].semi)
+
+    def test_nested_paths(self):
+        model = MockBook().order(C.author.publisher.name)
+        root = JoinPlanner(model).plan()
+        self.assertEqual([node.path for node in root],
+                         [('author',), ('author', 'publisher')])
+        self.assertFalse([node for node in root if node.semi])
+
+    def test_filter_only_becomes_semi_join(self):
+        model = MockBook().filters(C.title == 1, C.author.name == 2)
+        root = JoinPlanner(model).plan()
+
+        self.assertTrue(root.children['author'].semi)
+        self.assertEqual(len(root.children['author'].filters), 1)
+        self.assertEqual(len(root.filters), 1)
+
+    def test_filter_and_order_stays_join(self):
+        model = MockBook().filters(C.author.name == 2).order(C.author.name)
+        root = JoinPlanner(model).plan()
+
+        self.assertFalse(root.children['author'].semi)
+        self.assertEqual(len(root.filters), 1)
+
+    def test_filter_across_relationships_stays_join(self):
+        model = MockBook().filters((C.author.name == 2) | (C.tag.label == 3))
+        root = JoinPlanner(model).plan()
+
+        self.assertFalse(root.children['author'].semi)
+        self.assertFalse(root.children['tag'].semi)
+
+    def test_nested_semi_join(self):
+        model = MockBook().filters(C.author.publisher.name == 2).order(C.author.name)
+        root = JoinPlanner(model).plan()
+        author = root.children['author']
+
+        self.assertFalse(author.semi)
+        self.assertTrue(author.children['publisher'].semi)
+        self.assertEqual(root.filters, [])
+
+    def test_left_join_not_semi(self):
+        model = MockBook().join('author', join_type='left').filters(
+            C.author.name == None)
+        root = JoinPlanner(model).plan()
+
+        self.assertFalse(root.children['author'].semi)
+        self.assertEqual(root.children['author'].join, 'left')
+
+    def test_explicit_inner_join_unreferenced(self):
+        root = JoinPlanner(MockBook().join('author')).plan()
+        self.assertTrue(root.children['author'].semi)
+        self.assertEqual(root.children['author'].filters, [])
+
+    def test_explicit_left_join_unreferenced(self):
+        root = JoinPlanner(MockBook().join('author', join_type='left')).plan()
+        self.assertEqual(list(root.children), [])
+
+    def test_auto_filters(self):
+        model = MockBook()
+        model.Meta.auto_filters = [C.author.name == 1]
+        root = JoinPlanner(model).plan()
+
+        self.assertTrue(root.children['author'].semi)
+
+    def test_unknown_relationship(self):
+        model = MockBook().fields(C.missing.name)
+        self.assertRaises(AttributeError, JoinPlanner(model).plan)
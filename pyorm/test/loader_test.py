@@ -0,0 +1,171 @@
+import unittest
+
+from pyorm.column import Column as C
+from pyorm.field import Char
+from pyorm.loader import BatchLoader, DeferredLoader
+from pyorm.model import Model
+from pyorm.relationship import OneToOne
+from pyorm.token import *
+
+
+class MockChild(Model):
+    rows = [
+        {'id': 1, 'name': 'one'},
+        {'id': 2, 'name': 'two'},
+        {'id': 3, 'name': 'three'},
+    ]
+    queries = []
+
+    def get(self):
+        keys = self._filters.literals[0]
+        MockChild.queries.append(keys)
+        self._records = [row for row in MockChild.rows if row['id'] in keys]
+        self.result_loaded = True
+
+
+class MockParent(Model):
+    child = OneToOne(MockChild)
+    named_child = OneToOne(MockChild, filter=[C.child_name == C.named_child.name])
+
+    def get(self):
+        self._records = [
+            {'id': 1, 'child_id': 1, 'child_name': 'two'},
+            {'id': 2, 'child_id': 2, 'child_name': 'three'},
+            {'id': 3, 'child_id': 1, 'child_name': 'one'},
+            {'id': 4, 'child_id': None, 'child_name': None},
+        ]
+        self.result_loaded = True
+
+
+class RelationshipKeysTestCase(unittest.TestCase):
+    def test_default_keys(self):
+        model = MockParent()
+        self.assertEqual(model.r.child.keys, [('child_id', 'id')])
+
+    def test_filter_keys(self):
+        model = MockParent()
+        self.assertEqual(model.r.named_child.keys, [('child_name', 'name')])
+
+
+class BatchLoaderTestCase(unittest.TestCase):
+    def setUp(self):
+        MockChild.queries = []
+
+    def test_single_query_per_iteration(self):
+        model = MockParent()
+        names = []
+
+        for row in model:
+            names.append([record['name'] for record in row.child._records])
+
+        self.assertEqual(names, [['one'], ['two'], ['one'], []])
+        self.assertEqual(MockChild.queries, [[1, 2]])
+
+    def test_batch_size(self):
+        model = MockParent()
+        model.Meta.lazy_batch_size = 2
+
+        for row in model:
+            row.child
+
+        self.assertEqual(MockChild.queries, [[1, 2], [1]])
+
+    def test_cache_shared_with_record_proxies(self):
+        model = MockParent()
+        rows = list(model)
+
+        # rows[0] is no longer the current row, so it clones the model, but
+        # the clone should share the loaded relationship with the original.
+        self.assertEqual(rows[3].child._records, [])
+        self.assertEqual(rows[0].child._records, [MockChild.rows[0]])
+        self.assertEqual(len(MockChild.queries), 1)
+
+    def test_filters_single_key(self):
+        model = MockParent()
+        loader = BatchLoader(model.r.child)
+        expression = loader.filters(['id'], set([(2,), (1,)]))
+
+        self.assertEqual(expression.literals, [[1, 2]])
+        self.assertEqual(expression._tokens[0].value._path, ['id'])
+
+    def test_filters_multiple_keys(self):
+        model = MockParent()
+        loader = BatchLoader(model.r.child)
+        expression = loader.filters(['a', 'b'], set([(1, 2), (3, 4)]))
+
+        self.assertEqual(expression.op, OP_OR)
+        self.assertEqual(expression.literals, [1, 2, 3, 4])
+
+    def test_batch(self):
+        model = MockParent()
+        loader = BatchLoader(model.r.child, batch_size=2)
+        records = range(5)
+
+        self.assertEqual(loader.batch(records, 0), (0, 2))
+        self.assertEqual(loader.batch(records, 3), (2, 4))
+        self.assertEqual(loader.batch(records, 4), (4, 5))
+
+        loader.batch_size = None
+        self.assertEqual(loader.batch(records, 4), (0, 5))
+
+
+class MockDocument(Model):
+    title = Char(length=255)
+    body = Char(deferred=True)
+    queries = []
+    rows = [
+        {'id': 1, 'title': 'one', 'body': 'body one'},
+        {'id': 2, 'title': 'two', 'body': 'body two'},
+        {'id': 3, 'title': 'three', 'body': 'body three'},
+    ]
+
+    def get(self):
+        names = [token.value._path[0] for token in self._fields._tokens
+                 if token.type == T_COL]
+        keys = self._filters.literals[0] if self._filters._tokens else None
+        MockDocument.queries.append((names, keys))
+
+        self._records = [
+            dict((name, row[name]) for name in names or ['id', 'title'])
+            for row in MockDocument.rows if keys is None or row['id'] in keys]
+        self.result_loaded = True
+
+
+class DeferredLoaderTestCase(unittest.TestCase):
+    def setUp(self):
+        MockDocument.queries = []
+
+    def test_deferred_field(self):
+        model = MockDocument()
+        self.assertEqual(model._primary_key, ('id',))
+        self.assertTrue(model.c.body.deferred)
+        self.assertFalse(model.c.title.deferred)
+
+    def test_defer(self):
+        model = MockDocument()
+        deferred = model.defer(C.title)
+        self.assertEqual(model._deferred, set())
+        self.assertEqual(deferred._deferred, set(['title']))
+        self.assertRaises(Exception, model.defer, C.rel.title)
+
+    def test_single_query_per_batch(self):
+        model = MockDocument()
+        bodies = [row.body for row in model]
+
+        self.assertEqual(bodies, ['body one', 'body two', 'body three'])
+        self.assertEqual(MockDocument.queries, [
+            ([], None), (['id', 'body'], [1, 2, 3])])
+
+    def test_batch_size(self):
+        model = MockDocument()
+        model.Meta.lazy_batch_size = 2
+        bodies = [row.body for row in model]
+
+        self.assertEqual(bodies, ['body one', 'body two', 'body three'])
+        self.assertEqual(MockDocument.queries[1:], [
+            (['id', 'body'], [1, 2]), (['id', 'body'], [3])])
+
+    def test_no_primary_key(self):
+        model = MockDocument()
+        model._primary_key = ()
+        self.assertRaises(Exception, DeferredLoader, model, 'body')
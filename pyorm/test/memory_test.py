@@ -0,0 +1,93 @@
+import unittest
+import warnings
+
+from pyorm.column import Column as C
+from pyorm.field import Char
+from pyorm.memory import FetchBudget, MemoryBudgetException, MemoryBudgetWarning, row_size
+from pyorm.model import Model
+from pyorm.session import Session
+from pyorm.test import helpers
+
+
+class MockConfig(helpers.MockConfig):
+    fetch_budget = 50000
+
+
+class MockLine(Model):
+    text = Char(length=100)
+
+
+class MockCursor(object):
+    def __init__(self, rows):
+        self.rows = rows
+
+    def fetchmany(self, size):
+        chunk, self.rows = self.rows[:size], self.rows[size:]
+        return chunk
+
+
+class FetchBudgetTestCase(unittest.TestCase):
+    def test_under_budget(self):
+        rows = [(i, 'x' * 10) for i in range(100)]
+        self.assertEqual(FetchBudget(10 ** 6, chunk_size=30).fetch(MockCursor(rows)), rows)
+
+    def test_over_budget(self):
+        rows = [(i, 'x' * 1000) for i in range(100)]
+        cursor = MockCursor(rows)
+
+        self.assertRaises(MemoryBudgetException,
+                          FetchBudget(10000, chunk_size=10).fetch, cursor)
+        # The query is stopped before all of the rows are fetched.
+        self.assertEqual(len(cursor.rows), 90)
+
+        with warnings.catch_warnings(record=True) as caught:
+            warnings.simplefilter('always')
+            fetched = FetchBudget(10000, action='warn', chunk_size=10).fetch(
+                MockCursor(rows))
+
+        self.assertEqual(len(fetched), 100)
+        self.assertEqual([warning.category for warning in caught], [MemoryBudgetWarning])
+
+
+class MemoryUsageTestCase(unittest.TestCase):
+    def setUp(self):
+        self.session = Session(MockConfig)
+        self.session.execute('main', 'CREATE TABLE mockline (id INTEGER PRIMARY KEY, text TEXT)')
+        for i in range(20):
+            self.session.execute('main', 'INSERT INTO mockline (text) VALUES (?)',
+                                 ['line {0}'.format(i) * 10])
+        self.session.commit()
+
+    def tearDown(self):
+        self.session.dispose()
+
+    def test_usage(self):
+        lines = MockLine(session=self.session).get()
+        usage = lines.memory_usage()
+
+        self.assertEqual(usage['rows'], 20)
+        self.assertEqual(usage['records'], sum(row_size(row) for row in lines._records))
+        self.assertEqual(usage['converted'], 0)
+
+        [line.text for line in lines]
+        usage = lines.memory_usage()
+        self.assertTrue(usage['converted'] > 0)
+        self.assertTrue(usage['fields'] > 0)
+        self.assertEqual(usage['total'], usage['records'] + usage['converted'] +
+                         usage['fields'])
+
+    def test_report(self):
+        lines = MockLine(session=self.session).get()
+        some = MockLine(session=self.session).filters(C.id < 5).get()
+
+        report = self.session.memory_report()
+        self.assertEqual([entry['rows'] for entry in report], [20, 4])
+        # The rows are shared through the identity map, so aren't counted twice.
+        self.assertEqual(report[1]['records'], 0)
+
+        del lines, some
+        self.assertEqual(self.session.memory_report(), [])
+
+    def test_budget(self):
+        self.session.fetch_budget.max_bytes = 1000
+        self.assertRaises(MemoryBudgetException, MockLine(session=self.session).get)
@@ -175,3 +175,16 @@ class MetaTestCase(unittest.TestCase):
 
         self.assertEqual(self.MockMeta.auto_filters, [])
         self.assertEqual(meta.auto_filters, [1, 2, 3])
+
+    def test_instance_lazy_batch_size_undefined(self):
+        mock_owner = MockOwner()
+        meta = self.MockMeta(_owner=mock_owner)
+
+        self.assertEqual(meta.lazy_batch_size, 500)
+
+    def test_instance_lazy_batch_size_defined(self):
+        self.MockMeta.lazy_batch_size = None
+        mock_owner = MockOwner()
+        meta = self.MockMeta(_owner=mock_owner)
+
+        self.assertEqual(meta.lazy_batch_size, None)
@@ -1,9 +1,13 @@
 import inspect
 import unittest
 
-from pyorm.model import MetaModel, Model, RecordProxy, clones, results_loaded
+from pyorm.column import Column as C
+from pyorm.identity import Row
+from pyorm.model import (FieldDescriptor, MetaModel, Model, RecordProxy,
+                         RelationshipDescriptor, clones, results_loaded)
 from pyorm.field import Integer
 from pyorm.relationship import OneToOne
+from pyorm.token import *
 
 
 class MockModel(Model):
@@ -27,13 +31,27 @@ class PropertiesTestCase(unittest.TestCase):
 
 class RecordProxyTestCase(unittest.TestCase):
     def test_init(self):
-        pass
+        model = MockModel()
+        proxy = RecordProxy(model=model, idx=3)
+        self.assertEqual(proxy._idx, 3)
+        self.assertFalse(proxy._cloned)
 
     def test_getattr_same_idx(self):
-        pass
+        model = MockModel()
+        model.current_idx = 1
+        proxy = RecordProxy(model=model, idx=1)
+        self.assertEqual(proxy.current_idx, 1)
+        self.assertFalse(proxy._cloned)
 
     def test_getattr_different_idx(self):
-        pass
+        model = MockModel()
+        model._records = [{}, {}]
+        model.current_idx = 1
+        proxy = RecordProxy(model=model, idx=0)
+        self.assertEqual(proxy.current_idx, 0)
+        self.assertTrue(proxy._cloned)
+        self.assertEqual(model.current_idx, 1)
+        self.assertTrue(proxy._records is model._records)
 
 
 class MetaModelTestCase(unittest.TestCase):
@@ -72,6 +90,71 @@ class MetaModelTestCase(unittest.TestCase):
         self.assertFalse(inspect.isclass(model.c.test_))
 
 
+class MockDescribedModel(Model):
+    group = Integer()
+    status = Integer()
+    parent = OneToOne('MockDescribedModel')
+
+
+class DescriptorTestCase(unittest.TestCase):
+    def loaded(self):
+        model = MockDescribedModel()
+        model._records = [Row(id=1, group=2, status=3, parent_id=None)]
+        model.result_loaded = True
+        return model
+
+    def test_installed(self):
+        descriptors = MockDescribedModel._descriptors
+
+        self.assertIsInstance(MockDescribedModel.__dict__['status'], FieldDescriptor)
+        self.assertIsInstance(descriptors['parent'], RelationshipDescriptor)
+        self.assertIn('parent_id', descriptors)
+        self.assertIn('id', descriptors)
+
+    def test_method_names_skipped(self):
+        self.assertNotIn('group', MockDescribedModel._descriptors)
+        self.assertTrue(callable(MockDescribedModel().group))
+
+    def test_cls_access(self):
+        class MockFreshModel(Model):
+            status = Integer()
+            parent = OneToOne(MockDescribedModel)
+
+        # The descriptors are installed with the class, before any instance
+        # exists, and class level access is the same before and after.
+        self.assertEqual(sorted(MockFreshModel._descriptors),
+                         ['id', 'parent', 'parent_id', 'status'])
+        self.assertTrue(hasattr(MockFreshModel.status, 'bind'))
+        self.assertRaises(AttributeError, getattr, MockFreshModel, 'parent_id')
+
+        MockFreshModel()
+        self.assertTrue(hasattr(MockFreshModel.status, 'bind'))
+        self.assertRaises(AttributeError, getattr, MockFreshModel, 'parent_id')
+
+    def test_read_write(self):
+        model = self.loaded()
+        self.assertEqual(model.status, 3)
+        self.assertEqual(model.c.group.value, 2)
+
+        model.status = 5
+        self.assertEqual(model.status, 5)
+        self.assertEqual(model.c.status.value, 5)
+        self.assertNotIn('status', model.__dict__)
+
+    def test_relationship_write(self):
+        model = self.loaded()
+        with self.assertRaises(Exception):
+            model.parent = 1
+
+    def test_instance_field(self):
+        model = self.loaded()
+        model.extra = Integer()
+        model.extra = 4
+
+        self.assertNotIn('extra', MockDescribedModel._descriptors)
+        self.assertEqual(model.c.extra._value, 4)
+
+
 class ModelTestCase(unittest.TestCase):
     def test_copy(self):
         # Returns a new copy of the model with any results in the fields
@@ -151,7 +234,11 @@ class ModelTestCase(unittest.TestCase):
         # Test adding a `order by` parameter. If the expression uses a relationship
         # which has not yet been joined, add it to the eager load set and add
         # the unique columns for that model to the list of data pulled back.
-        pass
+        model = MockModel()
+        ordered = model.order(C.test_)
+        self.assertNotEqual(id(model), id(ordered))
+        self.assertEqual(len(model._order._tokens), 0)
+        self.assertEqual(ordered._order._tokens[0].value._path, ['test_'])
 
     def test_group(self):
         # Test adding a `group by` parameter. If the expression uses a relationship
@@ -162,7 +249,15 @@ class ModelTestCase(unittest.TestCase):
     def test_join(self):
         # Modify a relationship in place (useful for switching between an inner
         # and left/right/outer join type on the fly).
-        pass
+        model = MockModel()
+        joined = model.join('testr_', join_type='left')
+        self.assertEqual(model.r.testr_.join, 'inner')
+        self.assertEqual(joined.r.testr_.join, 'left')
+        self.assertEqual(joined._joined_tables, ['testr_'])
+
+        joined = model.join('extra', model=MockModel, filters=[C.test_ == C.extra.test_])
+        self.assertFalse(hasattr(model.r, 'extra'))
+        self.assertEqual(joined.r.extra.keys, [('test_', 'test_')])
 
     def test_map(self):
         # Add a mapping object, and the mapping dict to be used for every iteration.
@@ -244,3 +339,112 @@ class ModelTestCase(unittest.TestCase):
         # Should trigger a create on the database connection that this model
         # is set to write to.
         pass
+
+
+class MockPagedModel(Model):
+    score = Integer()
+    rows = [{'id': idx, 'score': idx // 3} for idx in range(1, 11)]
+
+    def get(self):
+        self._records = MockPagedModel.rows[
+            self._offset or 0:(self._offset or 0) + (self._limit or 100)]
+        self.result_loaded = True
+
+
+class PaginationTestCase(unittest.TestCase):
+    def test_slice(self):
+        model = MockPagedModel()
+        sliced = model[10:30]
+        self.assertEqual((model._offset, model._limit), (None, None))
+        self.assertEqual((sliced._offset, sliced._limit), (10, 20))
+
+        sliced = sliced[5:]
+        self.assertEqual((sliced._offset, sliced._limit), (15, 15))
+
+        sliced = sliced[:50]
+        self.assertEqual((sliced._offset, sliced._limit), (15, 15))
+
+        sliced = model[5:][:2]
+        self.assertEqual((sliced._offset, sliced._limit), (5, 2))
+
+    def test_slice_invalid(self):
+        model = MockPagedModel()
+        self.assertRaises(Exception, model.__getitem__, slice(0, 10, 2))
+        self.assertRaises(Exception, model.__getitem__, slice(-5, None))
+        self.assertRaises(Exception, model.__getitem__, -1)
+
+    def test_index(self):
+        model = MockPagedModel()
+        self.assertEqual(model[3].id, 4)
+        self.assertRaises(IndexError, model.__getitem__, 20)
+
+    def test_len_reversed(self):
+        model = MockPagedModel()[:3]
+        self.assertEqual(len(model), 3)
+        self.assertEqual([row.id for row in reversed(model)], [3, 2, 1])
+
+    def test_paginate_first_page(self):
+        model = MockPagedModel().order(-C.score).paginate_after(size=5)
+        self.assertEqual(model._limit, 5)
+        self.assertEqual(len(model._filters._tokens), 0)
+        self.assertEqual([token.value._path for token in model._order._tokens
+                          if token.type == T_COL], [['id']])
+
+    def test_paginate_after(self):
+        model = MockPagedModel().order(-C.score)
+        first_page = model[:2]
+        page = model.paginate_after(list(first_page)[1], 5)
+        sql, literals = page.compile()
+
+        self.assertTrue(sql.endswith(
+            'WHERE (("mockpagedmodel"."score" <= ?) AND ((("mockpagedmodel"."score" < ?)) OR '
+            '(("mockpagedmodel"."score" = ?) AND ("mockpagedmodel"."id" > ?)))) '
+            'ORDER BY "mockpagedmodel"."score" DESC, "mockpagedmodel"."id" LIMIT ?'))
+        self.assertEqual(literals, [0, 0, 0, 2, 5])
+
+    def test_paginate_after_dict(self):
+        model = MockPagedModel().order(C.id)
+        page = model.paginate_after({'id': 7}, 5)
+        sql, literals = page.compile()
+
+        self.assertTrue(sql.endswith(
+            'WHERE ((("mockpagedmodel"."id" > ?))) ORDER BY "mockpagedmodel"."id" LIMIT ?'))
+        self.assertEqual(literals, [7, 5])
+
+    def test_paginate_invalid(self):
+        model = MockPagedModel().order(C.score)
+        self.assertRaises(Exception, model.paginate_after, {'id': 1}, 5)
+        self.assertRaises(Exception, model.paginate_after, {'id': 1, 'score': None}, 5)
+        self.assertRaises(Exception, MockPagedModel().order(C.score * 2).paginate_after)
+
+    def test_iter_chunks(self):
+        queries = []
+
+        class MockChunkedModel(MockPagedModel):
+            def get(self):
+                after = self._filters.literals[-1] if self._filters._tokens else 0
+                queries.append((after, self._limit))
+                self._records = [row for row in MockPagedModel.rows
+                                 if row['id'] > after][:self._limit]
+                self.result_loaded = True
+
+        model = MockChunkedModel().order(-C.score)[2:4]
+        chunks = [[row.id for row in chunk] for chunk in model.iter_chunks(4)]
+
+        self.assertEqual(chunks, [[1, 2, 3, 4], [5, 6, 7, 8], [9, 10]])
+        self.assertEqual(queries, [(0, 4), (4, 4), (8, 4)])
+
+        chunks = [[row.id for row in chunk] for chunk in model.iter_chunks(5)]
+        self.assertEqual(chunks, [[1, 2, 3, 4, 5], [6, 7, 8, 9, 10]])
+        self.assertEqual(queries[3:], [(0, 5), (5, 5), (10, 5)])
+
+    def test_iter_chunks_sql(self):
+        model = MockPagedModel().fields(C.score).filters(C.score > 1)
+        chunk = next(model.iter_chunks(3))
+        sql, literals = chunk.paginate_after({'id': 3}, 3).compile()
+
+        self.assertEqual(
+            sql, 'SELECT "mockpagedmodel"."score" AS "score", "mockpagedmodel"."id" AS "id" '
+            'FROM "mockpagedmodel" WHERE ("mockpagedmodel"."score" > ?) AND '
+            '((("mockpagedmodel"."id" > ?))) ORDER BY "mockpagedmodel"."id" LIMIT ?')
+        self.assertEqual(literals, [1, 3, 3])
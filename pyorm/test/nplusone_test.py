@@ -0,0 +1,106 @@
+import unittest
+import warnings
+
+from pyorm.column import Column as C
+from pyorm.field import Char, Integer
+from pyorm.model import Model
+from pyorm.nplusone import NPlusOneDetector, NPlusOneException, NPlusOneWarning
+from pyorm.relationship import OneToOne
+from pyorm.session import Session
+from pyorm.test import helpers
+
+
+class MockConfig(helpers.MockConfig):
+    nplusone_threshold = 2
+    nplusone_action = 'raise'
+
+
+class MockCity(Model):
+    name = Char(length=20)
+
+
+class MockStreet(Model):
+    name = Char(length=20)
+    city_id = Integer()
+    city = OneToOne(MockCity, filter=[C.city_id == C.city.id])
+
+
+class MockHouse(Model):
+    street_id = Integer()
+    street = OneToOne(MockStreet, filter=[C.street_id == C.street.id])
+
+
+class DetectorTestCase(unittest.TestCase):
+    def test_threshold(self):
+        detector = NPlusOneDetector(threshold=2)
+        scope = detector.scope()
+
+        with warnings.catch_warnings(record=True) as caught:
+            warnings.simplefilter('always')
+            for i in range(5):
+                detector.record(scope, ('House', 'street', 'city'))
+
+        self.assertEqual(len(caught), 1)
+        self.assertTrue(issubclass(caught[0].category, NPlusOneWarning))
+        self.assertEqual(detector.reports[0]['queries'], 3)
+        self.assertEqual(detector.reports[0]['suggestion'],
+                         "House.prefetch('street.city')")
+
+    def test_sampling(self):
+        reports = []
+        detector = NPlusOneDetector(threshold=0, sample_rate=0.0,
+                                    action=reports.append)
+        detector.record(detector.scope(), ('House', 'street'))
+        detector.record(None, ('House', 'street'))
+        self.assertEqual(reports, [])
+
+
+class SessionDetectorTestCase(unittest.TestCase):
+    def setUp(self):
+        self.session = Session(MockConfig)
+        for sql in ('CREATE TABLE mockcity (id INTEGER PRIMARY KEY, name TEXT)',
+                    'CREATE TABLE mockstreet (id INTEGER PRIMARY KEY, name TEXT, '
+                    'city_id INTEGER)',
+                    'CREATE TABLE mockhouse (id INTEGER PRIMARY KEY, street_id INTEGER)'):
+            self.session.execute('main', sql)
+
+        for i in range(1, 5):
+            self.session.execute('main', 'INSERT INTO mockcity (id, name) VALUES (?, ?)',
+                                 [i, 'city{0}'.format(i)])
+            self.session.execute('main', 'INSERT INTO mockstreet VALUES (?, ?, ?)',
+                                 [i, 'street{0}'.format(i), i])
+            self.session.execute('main', 'INSERT INTO mockhouse VALUES (?, ?)', [i, i])
+        self.session.commit()
+
+        self.queries = []
+        run = self.session.run
+
+        def record(name, sql, literals=(), **kwargs):
+            self.queries.append(sql)
+            return run(name, sql, literals, **kwargs)
+
+        self.session.run = record
+
+    def tearDown(self):
+        self.session.dispose()
+
+    def cities(self, houses):
+        return [[city.name for street in house.street for city in street.city]
+                for house in houses]
+
+    def test_nested_lazy_loads(self):
+        houses = MockHouse(session=self.session).order(C.id)
+
+        self.assertRaises(NPlusOneException, self.cities, houses)
+        self.assertEqual(self.session.nplusone.reports[0]['path'],
+                         'MockHouse.street.city')
+
+    def test_prefetch(self):
+        houses = MockHouse(session=self.session).order(C.id).prefetch(
+            'street', 'street.city')
+
+        self.assertEqual(self.cities(houses),
+                         [['city1'], ['city2'], ['city3'], ['city4']])
+        self.assertEqual(len(self.queries), 3)
+        self.assertRaises(Exception, MockHouse(session=self.session).prefetch(
+            'missing').get)
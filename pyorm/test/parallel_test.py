@@ -0,0 +1,72 @@
+import os
+import shutil
+import sqlite3
+import tempfile
+import unittest
+
+from pyorm.column import Column as C
+from pyorm.field import Integer
+from pyorm.model import Model
+from pyorm.parallel import partitions
+from pyorm.session import Session
+from pyorm.test import helpers
+
+
+class MockConfig(helpers.MockConfig):
+    servers = {}
+
+
+class MockScore(Model):
+    score = Integer()
+
+
+class PartitionsTestCase(unittest.TestCase):
+    def test_partitions(self):
+        self.assertEqual(partitions(1, 10, 3), [(1, 5), (5, 9), (9, 11)])
+        self.assertEqual(partitions(1, 10, 5), [(1, 3), (3, 5), (5, 7), (7, 9), (9, 11)])
+        self.assertEqual(partitions(5, 6, 4), [(5, 6), (6, 7)])
+        self.assertEqual(partitions(5, 5, 4), [(5, 6)])
+
+
+class ParallelGetTestCase(unittest.TestCase):
+    def setUp(self):
+        self.directory = tempfile.mkdtemp()
+        database = os.path.join(self.directory, 'test.db')
+        MockConfig.servers = {'main': {'driver': 'sqlite3', 'database': database}}
+
+        connection = sqlite3.connect(database)
+        connection.execute(
+            'CREATE TABLE mockscore (id INTEGER PRIMARY KEY, score INTEGER)')
+        connection.executemany(
+            'INSERT INTO mockscore (id, score) VALUES (?, ?)',
+            [(idx, idx * 10) for idx in range(1, 101)])
+        connection.commit()
+        connection.close()
+
+        self.session = Session(MockConfig)
+
+    def tearDown(self):
+        shutil.rmtree(self.directory)
+
+    def test_parallel_get(self):
+        columns = MockScore(session=self.session).parallel_get(workers=3)
+
+        self.assertEqual(list(columns.keys()), ['id', 'score'])
+        self.assertEqual(columns['id'], list(range(1, 101)))
+        self.assertEqual(columns['score'], [idx * 10 for idx in range(1, 101)])
+
+    def test_parallel_get_filters(self):
+        model = MockScore(session=self.session).fields(C.score)
+        columns = model.filters(C.score > 900).parallel_get(
+            workers=2, partition=C.score)
+
+        self.assertEqual(columns['score'], [910, 920, 930, 940, 950, 960, 970,
+                                            980, 990, 1000])
+
+    def test_parallel_get_empty(self):
+        model = MockScore(session=self.session).filters(C.score < 0)
+        self.assertEqual(model.parallel_get(workers=2), {})
+
+    def test_parallel_get_sliced(self):
+        model = MockScore(session=self.session)[:10]
+        self.assertRaises(Exception, model.parallel_get, 2)
@@ -0,0 +1,217 @@
+import sqlite3
+import threading
+import unittest
+
+from pyorm.pool import Pool, PoolTimeoutException, writes
+
+
+class PoolTestCase(unittest.TestCase):
+    def setUp(self):
+        self.connected = []
+
+    def connect(self):
+        connection = sqlite3.connect(':memory:', check_same_thread=False)
+        self.connected.append(connection)
+        return connection
+
+    def test_reuse(self):
+        pool = Pool(self.connect)
+        connection = pool.checkout()
+        connection.close()
+
+        self.assertTrue(pool.checkout() is connection)
+        self.assertEqual(len(self.connected), 1)
+        self.assertEqual(pool.size, 1)
+
+    def test_overflow(self):
+        pool = Pool(self.connect, max_size=1, overflow=1, timeout=0)
+        first = pool.checkout()
+        second = pool.checkout()
+
+        self.assertRaises(PoolTimeoutException, pool.checkout)
+        self.assertEqual(pool.size, 2)
+
+        # Overflow connections are closed as soon as they are returned.
+        second.close()
+        self.assertEqual((pool.size, pool.idle), (1, 0))
+        first.close()
+        self.assertEqual((pool.size, pool.idle), (1, 1))
+
+    def test_wait(self):
+        pool = Pool(self.connect, max_size=1, overflow=0, timeout=5)
+        connection = pool.checkout()
+
+        timer = threading.Timer(0.05, connection.close)
+        timer.start()
+
+        self.assertTrue(pool.checkout() is connection)
+        timer.join()
+
+        stats = pool.stats()
+        self.assertEqual(stats['checkouts'], 2)
+        self.assertTrue(stats['max_wait_time'] >= 0.04)
+        self.assertTrue(stats['average_wait_time'] > 0)
+
+    def test_fill(self):
+        pool = Pool(self.connect, min_size=2)
+        pool.fill()
+        self.assertEqual((pool.size, pool.idle), (2, 2))
+
+    def test_recycle(self):
+        pool = Pool(self.connect, recycle=60)
+        connection = pool.checkout()
+        connection.created -= 120
+        connection.close()
+
+        self.assertEqual(pool.size, 0)
+        self.assertFalse(pool.checkout() is connection)
+
+    def test_idle_timeout(self):
+        pool = Pool(self.connect, idle_timeout=60)
+        first = pool.checkout()
+        second = pool.checkout()
+        first.close()
+        first.last_used -= 120
+        second.close()
+
+        self.assertEqual((pool.size, pool.idle), (1, 1))
+        self.assertTrue(pool.checkout() is second)
+
+    def test_pre_ping(self):
+        pool = Pool(self.connect, ping_after=30)
+        connection = pool.checkout()
+        connection.close()
+        connection.connection.close()
+        connection.last_used -= 60
+
+        replacement = pool.checkout()
+        self.assertFalse(replacement is connection)
+        self.assertTrue(replacement.ping())
+        self.assertEqual(pool.size, 1)
+
+    def test_ping_after(self):
+        pool = Pool(MockConnection, ping_after=30)
+        connection = pool.checkout()
+        connection.close()
+
+        # Connections used recently are handed out without a ping.
+        self.assertTrue(pool.checkout() is connection)
+        self.assertEqual(connection.connection.cursors, [])
+        connection.close()
+
+        connection.last_used -= 60
+        self.assertTrue(pool.checkout() is connection)
+        self.assertEqual(connection.connection.cursors[0].executed, ['SELECT 1'])
+
+    def test_dirty_checkin(self):
+        pool = Pool(self.connect)
+        connection = pool.checkout()
+        connection.execute('CREATE TABLE test (id INTEGER)')
+        connection.commit()
+        connection.execute('INSERT INTO test VALUES (?)', [1])
+        self.assertTrue(connection.is_dirty)
+        connection.close()
+
+        connection = pool.checkout()
+        self.assertFalse(connection.is_dirty)
+        self.assertEqual(
+            connection.execute('SELECT COUNT(*) FROM test').fetchall(), [(0,)])
+
+    def test_reads_stay_clean(self):
+        pool = Pool(self.connect)
+        connection = pool.checkout()
+        connection.execute('CREATE TABLE test (id INTEGER)')
+        connection.commit()
+
+        for sql in ('SELECT * FROM test',
+                    'WITH ids AS (SELECT id FROM test) SELECT * FROM ids',
+                    'EXPLAIN QUERY PLAN SELECT * FROM test'):
+            connection.execute(sql).fetchall()
+        self.assertFalse(connection.is_dirty)
+
+        connection.execute('WITH ids AS (SELECT 1) DELETE FROM test')
+        self.assertTrue(connection.is_dirty)
+
+    def test_writes(self):
+        self.assertTrue(writes('insert into test values (1)'))
+        self.assertTrue(writes('CREATE TABLE test (id INTEGER)'))
+        self.assertTrue(writes('EXPLAIN ANALYZE UPDATE test SET id = 1'))
+        self.assertFalse(writes('  select update_count from test'))
+        self.assertFalse(writes('EXPLAIN SELECT * FROM test'))
+
+    def test_fork(self):
+        pool = Pool(self.connect)
+        connection = pool.checkout()
+        connection.close()
+
+        # Pretend the pool was inherited from another process.
+        pool._pid = -1
+        self.assertFalse(pool.checkout() is connection)
+        self.assertEqual(pool.size, 1)
+        self.assertEqual(pool.stats()['checkouts'], 1)
+
+
+class MockCursor(object):
+    def __init__(self, connection):
+        self.connection = connection
+        self.executed = []
+        self.closed = False
+
+    def execute(self, sql, literals=()):
+        self.executed.append(sql)
+
+    def fetchall(self):
+        return []
+
+    def close(self):
+        self.closed = True
+
+
+class MockConnection(object):
+    def __init__(self):
+        self.cursors = []
+
+    def cursor(self):
+        self.cursors.append(MockCursor(self))
+        return self.cursors[-1]
+
+    def close(self):
+        pass
+
+
+class StatementCacheTestCase(unittest.TestCase):
+    def test_reuse(self):
+        pool = Pool(MockConnection, pre_ping=False, statement_cache_size=2)
+        connection = pool.checkout()
+
+        first = connection.execute('SELECT 1')
+        connection.release_cursor(first)
+        self.assertFalse(first.closed)
+        self.assertTrue(connection.execute('SELECT 1') is first)
+        self.assertEqual(first.executed, ['SELECT 1', 'SELECT 1'])
+
+        second = connection.execute('SELECT 2')
+        connection.execute('SELECT 1')
+        connection.execute('SELECT 3')
+
+        # `SELECT 2` was the least recently used.
+        self.assertTrue(second.closed)
+        self.assertEqual(len(connection.connection.cursors), 3)
+        self.assertEqual(pool.statement_stats(), {
+            'size': 2, 'hits': 2, 'misses': 3, 'evictions': 1})
+
+        connection.close()
+        pool.dispose()
+        self.assertTrue(first.closed)
+        self.assertEqual(pool.statement_stats(), {
+            'size': 0, 'hits': 2, 'misses': 3, 'evictions': 1})
+
+    def test_disabled(self):
+        pool = Pool(MockConnection, pre_ping=False, statement_cache_size=0)
+        connection = pool.checkout()
+
+        first = connection.execute('SELECT 1')
+        connection.release_cursor(first)
+        self.assertTrue(first.closed)
+        self.assertFalse(connection.execute('SELECT 1') is first)
+        self.assertEqual(pool.statement_stats()['misses'], 0)
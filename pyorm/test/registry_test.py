@@ -0,0 +1,87 @@
+import unittest
+
+from pyorm.field import Char
+from pyorm.model import Model
+from pyorm.registry import ModelRegistry, registry
+from pyorm.relationship import OneToOne
+
+
+class MockOwner(Model):
+    name = Char(length=20)
+    pet = OneToOne('MockPet')
+    house = OneToOne('MockCity', import_from='pyorm.test.nplusone_test')
+
+
+class MockPet(Model):
+    name = Char(length=20)
+
+
+def mock_class(module, name):
+    return type(name, (object,), {'__module__': module})
+
+
+class ModelRegistryTestCase(unittest.TestCase):
+    def test_resolve_name(self):
+        models = ModelRegistry()
+        cls = mock_class('app.models', 'Author')
+        models.register(cls)
+
+        self.assertIs(models.resolve('Author'), cls)
+        self.assertIs(models.resolve('app.models.Author'), cls)
+        self.assertIs(models.resolve('Author', import_from='app.models'), cls)
+
+    def test_ambiguous_name(self):
+        models = ModelRegistry()
+        first = mock_class('app.models', 'Author')
+        second = mock_class('other.models', 'Author')
+        models.register(first)
+        models.register(second)
+
+        with self.assertRaises(Exception) as context:
+            models.resolve('Author')
+        self.assertIn('ambiguous', str(context.exception))
+
+        self.assertIs(models.resolve('Author', import_from='app.models'), first)
+        self.assertIs(models.resolve('other.models.Author'), second)
+
+    def test_not_defined(self):
+        with self.assertRaises(Exception) as context:
+            ModelRegistry().resolve('Author')
+        self.assertIn('not defined', str(context.exception))
+
+    def test_import_from(self):
+        models = ModelRegistry()
+        cls = models.resolve('MockCity', import_from='pyorm.test.nplusone_test')
+
+        from pyorm.test.nplusone_test import MockCity
+        self.assertIs(cls, MockCity)
+
+    def test_models_registered(self):
+        self.assertIs(registry.resolve('pyorm.test.registry_test.MockPet'), MockPet)
+
+    def test_relationship_target(self):
+        owner = MockOwner()
+        self.assertIs(owner.r.pet.target, MockPet)
+        self.assertEqual(owner.r.house.target.__name__, 'MockCity')
+
+        # The target is kept on the unbound relationship for later instances.
+        self.assertIs(MockOwner._unbound['pet'].target, MockPet)
+        self.assertIs(MockOwner().r.pet.target, MockPet)
+
+
+class BindingsTestCase(unittest.TestCase):
+    def test_bindings_cached(self):
+        bindings = MockOwner.bindings()
+        self.assertIs(MockOwner.bindings(), bindings)
+        self.assertEqual(sorted(name for name, trans_name, unbound in bindings),
+                         ['house', 'id', 'name', 'pet'])
+
+    def test_meta_options_reset(self):
+        self.assertEqual(MockPet().Meta.db_table, 'mockpet')
+        MockPet.Meta.db_table = 'pets'
+
+        try:
+            self.assertEqual(MockPet().Meta.db_table, 'pets')
+        finally:
+            MockPet.Meta.db_table = None
+        self.assertEqual(MockPet().Meta.db_table, 'MockPet')
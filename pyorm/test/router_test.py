@@ -0,0 +1,53 @@
+import unittest
+
+from pyorm.router import Router
+
+
+class RouterTestCase(unittest.TestCase):
+    def test_single_server(self):
+        router = Router()
+        self.assertEqual(router.choose('main'), 'main')
+        self.assertEqual(router.choose(['main']), 'main')
+
+    def test_latency(self):
+        router = Router(alpha=0.5)
+        router.state('slow').latency = 0.5
+        router.state('fast').latency = 0.1
+        self.assertEqual(router.choose(['slow', 'fast']), 'fast')
+
+        start = router.start('fast')
+        router.finish('fast', start - 0.3)
+        self.assertAlmostEqual(router.state('fast').latency, 0.2, places=2)
+
+    def test_unused_servers_first(self):
+        router = Router()
+        router.state('used').latency = 0.01
+        self.assertEqual(router.choose(['used', 'new']), 'new')
+
+    def test_in_flight(self):
+        router = Router()
+        router.state('a').latency = 0.1
+        router.state('b').latency = 0.15
+
+        router.start('a')
+        self.assertEqual(router.state('a').in_flight, 1)
+        self.assertEqual(router.choose(['a', 'b']), 'b')
+
+    def test_ejection(self):
+        router = Router(cooldown=60, max_failures=2)
+        router.state('a').latency = 0.1
+        router.state('b').latency = 0.5
+
+        router.finish('a', router.start('a'), failed=True)
+        self.assertEqual(router.choose(['a', 'b']), 'a')
+
+        router.finish('a', router.start('a'), failed=True)
+        self.assertEqual(router.choose(['a', 'b']), 'b')
+
+        # With every server ejected, they are all used again.
+        router.eject('b')
+        self.assertEqual(router.choose(['a', 'b']), 'a')
+
+        router.state('a').ejected_until = 0
+        router.state('b').ejected_until = 0
+        self.assertEqual(router.choose(['a', 'b']), 'a')
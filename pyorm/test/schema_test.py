@@ -0,0 +1,214 @@
+import unittest
+
+from pyorm.dialect import Dialect, MySQLDialect, PostgreSQLDialect
+from pyorm.field import Char, Decimal
+from pyorm.indexes import Index, Unique
+from pyorm.model import Model
+from pyorm.relationship import OneToOne
+from pyorm.schema import ColumnDef, IndexDef, Migration, TableDef, TableDiff, declared
+from pyorm.session import Session
+from pyorm.test.helpers import SingleConnectionConfig
+
+
+class MockPublisher(Model):
+    name = Char(length=20)
+
+
+class MockTitle(Model):
+    name = Char(length=40, null=True)
+    price = Decimal(precision=8, scale=2, default=0)
+    publisher = OneToOne(MockPublisher)
+
+    class Indexes:
+        name = Index('name')
+        lookup = Unique('publisher_id', 'name')
+
+
+def table(name, columns, indexes=(), primary_key=('id',)):
+    return TableDef(name, dict((column.name, column) for column in columns),
+                    dict((index.name, index) for index in indexes), primary_key)
+
+
+class DeclaredTestCase(unittest.TestCase):
+    def test_declared(self):
+        definition = declared(MockTitle, Dialect())
+
+        self.assertEqual(definition.name, 'mocktitle')
+        self.assertEqual(list(definition.columns),
+                         ['id', 'name', 'price', 'publisher_id'])
+        self.assertEqual(definition.columns['price'],
+                         ColumnDef('price', 'DECIMAL(8,2)', False, False, 0))
+        self.assertTrue(definition.columns['name'].null)
+        self.assertTrue(definition.columns['id'].autoincrement)
+        self.assertEqual(definition.primary_key, ('id',))
+        self.assertEqual(definition.indexes['mocktitle_lookup'], IndexDef(
+            'mocktitle_lookup', ('publisher_id', 'name'), True))
+
+    def test_column_types(self):
+        title = MockTitle()
+        self.assertEqual(MySQLDialect().column_type(title.c.id), 'INT UNSIGNED')
+        self.assertEqual(MySQLDialect().column_type(title.c.name), 'VARCHAR(40)')
+        self.assertEqual(PostgreSQLDialect().column_type(title.c.name),
+                         'character varying(40)')
+        self.assertEqual(MySQLDialect().normalize_type('int(10) unsigned'),
+                         'INT UNSIGNED')
+
+
+class TableDiffTestCase(unittest.TestCase):
+    def setUp(self):
+        self.declared = declared(MockTitle, Dialect())
+
+    def test_create(self):
+        diff = TableDiff(Dialect(), self.declared)
+
+        self.assertTrue(diff.create)
+        self.assertEqual(diff.statements(Dialect()), [
+            'CREATE TABLE "mocktitle" ("id" INTEGER NOT NULL PRIMARY KEY, '
+            '"name" VARCHAR(40), "price" DECIMAL(8,2) NOT NULL DEFAULT 0, '
+            '"publisher_id" INTEGER)',
+            'CREATE UNIQUE INDEX "mocktitle_lookup" ON "mocktitle" '
+            '("publisher_id", "name")',
+            'CREATE INDEX "mocktitle_name" ON "mocktitle" ("name")'])
+
+    def test_unchanged(self):
+        self.assertFalse(TableDiff(Dialect(), self.declared, self.declared))
+
+    def test_changes(self):
+        live = table('mocktitle', [
+            ColumnDef('id', 'integer', False, True, None),
+            ColumnDef('name', 'varchar(20)', True, False, None),
+            ColumnDef('old', 'TEXT', True, False, None),
+        ], [IndexDef('mocktitle_name', ('name', 'id'), False)])
+        diff = TableDiff(Dialect(), self.declared, live)
+
+        self.assertEqual([column.name for column in diff.add_columns],
+                         ['price', 'publisher_id'])
+        self.assertEqual([column.name for column in diff.alter_columns], ['name'])
+        self.assertEqual(diff.drop_columns, [])
+        self.assertEqual([index.name for index in diff.drop_indexes],
+                         ['mocktitle_name'])
+        self.assertEqual([index.name for index in diff.add_indexes],
+                         ['mocktitle_lookup', 'mocktitle_name'])
+
+        diff = TableDiff(Dialect(), self.declared, live, drop=True)
+        self.assertEqual([column.name for column in diff.drop_columns], ['old'])
+
+    def test_mysql_batched(self):
+        live = table('mocktitle', [
+            ColumnDef('id', 'int(10) unsigned', False, True, None),
+            ColumnDef('name', 'varchar(20)', True, False, None),
+            ColumnDef('price', 'decimal(8,2)', False, False, None),
+        ])
+        dialect = MySQLDialect()
+        diff = TableDiff(dialect, declared(MockTitle, dialect), live)
+
+        self.assertEqual(diff.statements(dialect), [
+            'ALTER TABLE `mocktitle` ADD COLUMN `publisher_id` INT UNSIGNED, '
+            'MODIFY COLUMN `name` VARCHAR(40), '
+            'ADD UNIQUE INDEX `mocktitle_lookup` (`publisher_id`, `name`), '
+            'ADD INDEX `mocktitle_name` (`name`)'])
+
+    def test_postgresql_batched(self):
+        live = table('mocktitle', [
+            ColumnDef('id', 'integer', False, True, None),
+            ColumnDef('name', 'character varying(20)', True, False, None),
+            ColumnDef('price', 'numeric(8,2)', False, False, None),
+            ColumnDef('publisher_id', 'integer', True, False, None),
+        ], [IndexDef('mocktitle_lookup', ('publisher_id', 'name'), True),
+            IndexDef('mocktitle_name', ('name',), False)])
+        dialect = PostgreSQLDialect()
+        diff = TableDiff(dialect, declared(MockTitle, dialect), live)
+
+        self.assertEqual(diff.statements(dialect), [
+            'ALTER TABLE "mocktitle" ALTER COLUMN "name" TYPE '
+            'character varying(40), ALTER COLUMN "name" DROP NOT NULL'])
+
+    def test_sqlite_alter_column(self):
+        live = table('mocktitle', [
+            ColumnDef('id', 'INTEGER', False, True, None),
+            ColumnDef('name', 'VARCHAR(20)', True, False, None),
+        ])
+        diff = TableDiff(Dialect(), self.declared, live)
+        self.assertRaises(Exception, diff.statements, Dialect())
+
+
+class MigrationTestCase(unittest.TestCase):
+    def setUp(self):
+        self.session = Session(SingleConnectionConfig)
+
+    def tearDown(self):
+        self.session.dispose()
+
+    def test_create_in_order(self):
+        migration = Migration(self.session, [MockTitle, MockPublisher])
+        statements = migration.run()['main']
+
+        self.assertTrue(statements[0].startswith('CREATE TABLE "mockpublisher"'))
+        self.assertTrue(statements[1].startswith('CREATE TABLE "mocktitle"'))
+
+        tables = self.session.schema.tables('main')
+        self.assertEqual(tables['mocktitle'], declared(MockTitle, Dialect())._replace(
+            columns=tables['mocktitle'].columns))
+        self.assertEqual(list(tables['mocktitle'].columns),
+                         ['id', 'name', 'price', 'publisher_id'])
+
+        # Nothing is left to change.
+        self.assertEqual(Migration(self.session, [MockTitle, MockPublisher]).diffs(), {})
+
+    def test_alter(self):
+        self.session.run('main', 'CREATE TABLE mocktitle (id INTEGER NOT NULL '
+                                 'PRIMARY KEY, name VARCHAR(40))')
+        self.session.run('main', "INSERT INTO mocktitle (id, name) VALUES (1, 'a')")
+        self.session.commit()
+
+        statements = Migration(self.session, [MockTitle]).run()['main']
+        self.assertEqual(statements, [
+            'ALTER TABLE "mocktitle" ADD COLUMN "price" DECIMAL(8,2) NOT NULL DEFAULT 0',
+            'ALTER TABLE "mocktitle" ADD COLUMN "publisher_id" INTEGER',
+            'CREATE UNIQUE INDEX "mocktitle_lookup" ON "mocktitle" '
+            '("publisher_id", "name")',
+            'CREATE INDEX "mocktitle_name" ON "mocktitle" ("name")'])
+        self.assertFalse(Migration(self.session, [MockTitle]).diffs())
+        self.assertEqual(self.session.run('main', 'SELECT price, publisher_id '
+                                                  'FROM mocktitle')[1], [(0, None)])
+
+    def test_add_not_null(self):
+        self.session.run('main', 'CREATE TABLE mockpublisher (id INTEGER NOT NULL '
+                                 'PRIMARY KEY)')
+        self.session.run('main', 'INSERT INTO mockpublisher (id) VALUES (1)')
+        self.session.commit()
+
+        # `name` is NOT NULL without a default, so the existing row has no
+        # value to take.
+        self.assertRaisesRegexp(Exception, 'without a default',
+                                Migration(self.session, [MockPublisher]).run)
+        self.session.schema.invalidate()
+        self.assertEqual(list(self.session.schema.tables('main')['mockpublisher'].columns),
+                         ['id'])
+
+    def test_schema_cached(self):
+        statements = []
+        run = self.session.run
+
+        def record(name, sql, literals=(), **kwargs):
+            statements.append(sql)
+            return run(name, sql, literals, **kwargs)
+
+        self.session.run = record
+        Migration(self.session, [MockTitle, MockPublisher]).diffs()
+        Migration(self.session, [MockTitle]).diffs()
+        self.assertEqual(len(statements), 2)
+
+    def test_model_create(self):
+        self.session.run('main', 'CREATE TABLE mockpublisher (id INTEGER NOT NULL '
+                                 'PRIMARY KEY)')
+        self.session.commit()
+
+        self.assertEqual(MockPublisher(session=self.session).create(), {})
+        statements = MockTitle(session=self.session).create()['main']
+        self.assertTrue(statements[0].startswith('CREATE TABLE "mocktitle"'))
+
+    def test_dirty_session(self):
+        self.session.run('main', 'CREATE TABLE other (id INTEGER)')
+        self.session.run('main', 'INSERT INTO other VALUES (1)')
+        self.assertRaises(Exception, Migration(self.session, [MockTitle]).run)
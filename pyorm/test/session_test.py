@@ -0,0 +1,209 @@
+import sqlite3
+import threading
+import unittest
+
+from pyorm import session
+from pyorm.column import Column as C
+from pyorm.dialect import MySQLDialect, SQLiteDialect
+from pyorm.field import Char
+from pyorm.model import Model
+from pyorm.session import Session, SessionDirtyException
+from pyorm.test import helpers
+
+
+class MockConfig(helpers.MockConfig):
+    servers = {
+        'main': {'driver': 'sqlite3', 'database': ':memory:'},
+        'mysql': {'driver': 'MySQLdb', 'host': 'localhost'},
+    }
+
+    def __init__(self, session):
+        self.session = session
+
+
+class MockModel(Model):
+    class Meta:
+        read_server = 'mysql'
+
+
+class MockReplicatedModel(Model):
+    class Meta:
+        read_server = ['replica1', 'replica2']
+        write_server = 'main'
+
+
+class MockDirtyConnection(object):
+    is_dirty = True
+
+
+class SessionTestCase(unittest.TestCase):
+    def tearDown(self):
+        session.default_session = None
+
+    def test_config(self):
+        instance = Session(MockConfig)
+        self.assertEqual(instance.config.session, instance)
+        self.assertEqual(instance.connections, [])
+
+    def test_default(self):
+        instance = Session(MockConfig, default=True)
+        self.assertEqual(session.default_session, instance)
+        self.assertEqual(Model().session, instance)
+
+        other = Session(MockConfig)
+        self.assertEqual(Model(session=other).session, other)
+        self.assertEqual(Model(session=other).clone().session, other)
+
+    def test_default_dirty(self):
+        instance = Session(MockConfig, default=True)
+        instance._held['main'] = MockDirtyConnection()
+        self.assertRaises(SessionDirtyException, Session, MockConfig, True)
+
+    def test_servers(self):
+        instance = Session(MockConfig)
+        self.assertEqual(instance.read_server(Model()), 'main')
+        self.assertEqual(instance.write_server(Model()), 'main')
+        self.assertEqual(instance.read_server(MockModel()), 'mysql')
+        self.assertTrue(isinstance(instance.dialect('main'), SQLiteDialect))
+        self.assertTrue(isinstance(instance.dialect('mysql'), MySQLDialect))
+        self.assertRaises(Exception, instance.server, 'missing')
+
+    def test_connect(self):
+        connection = Session(MockConfig).connect('main')
+        self.assertTrue(isinstance(connection, sqlite3.Connection))
+        connection.close()
+
+    def test_pool_min_size(self):
+        class MinSizeConfig(helpers.MockConfig):
+            servers = {'main': {'driver': 'sqlite3', 'database': ':memory:',
+                                'pool': {'min_size': 2}}}
+
+        instance = Session(MinSizeConfig)
+        self.addCleanup(instance.dispose)
+        instance.execute('main', 'SELECT 1')
+
+        pool = instance.pool('main')
+        self.assertEqual((pool.size, pool.idle), (2, 2))
+        self.assertEqual(pool.stats()['checkouts'], 1)
+
+
+class MockItem(Model):
+    name = Char(length=20)
+
+
+class SessionExecuteTestCase(unittest.TestCase):
+    def setUp(self):
+        self.session = Session(MockConfig)
+        self.session.execute(
+            'main', 'CREATE TABLE mockitem (id INTEGER PRIMARY KEY, name TEXT)')
+        self.session.commit()
+
+    def test_pooled(self):
+        pool = self.session.pool('main')
+        self.session.execute('main', 'SELECT 1')
+        self.session.execute('main', 'SELECT 1')
+
+        self.assertEqual(pool.size, 1)
+        self.assertEqual(pool.idle, 1)
+
+    def test_statement_cache(self):
+        for name in ('one', 'two', 'one'):
+            self.session.execute(
+                'main', 'SELECT id FROM mockitem WHERE name = ?', [name])
+
+        stats = self.session.statement_stats('main')
+        self.assertEqual((stats['hits'], stats['size']), (2, 2))
+        self.assertEqual(self.session.statement_stats()['hits'], 2)
+
+    def test_write_held_until_commit(self):
+        self.session.execute(
+            'main', 'INSERT INTO mockitem (name) VALUES (?)', ['one'])
+        self.assertTrue(self.session.is_dirty)
+        self.assertEqual(self.session.pool('main').idle, 0)
+
+        labels, rows = self.session.execute('main', 'SELECT name FROM mockitem')
+        self.assertEqual((labels, rows), (['name'], [('one',)]))
+
+        self.session.commit()
+        self.assertFalse(self.session.is_dirty)
+        self.assertEqual(self.session.pool('main').idle, 1)
+
+    def test_rollback(self):
+        self.session.execute(
+            'main', 'INSERT INTO mockitem (name) VALUES (?)', ['one'])
+        self.session.rollback()
+
+        self.assertFalse(self.session.is_dirty)
+        self.assertEqual(
+            self.session.execute('main', 'SELECT name FROM mockitem')[1], [])
+
+    def test_model_get(self):
+        self.session.execute(
+            'main', 'INSERT INTO mockitem (name) VALUES (?), (?)', ['one', 'two'])
+        model = MockItem(session=self.session)
+
+        self.assertEqual([row.name for row in model.order(-C.id)], ['two', 'one'])
+        self.assertEqual([row.name for row in model.filters(C.name == 'one')],
+                         ['one'])
+        self.assertEqual(model.filters(C.name == 'one').all()._records, [
+            {'id': 1, 'name': 'one'}, {'id': 2, 'name': 'two'}])
+        self.assertEqual(model.filters(C.name == 'two').one().id, 2)
+        self.assertEqual(model.fields(C.name).order(C.id).scalar(), 'one')
+        self.assertRaises(Exception, model.filters(C.id > 5).scalar)
+
+    def test_read_your_writes(self):
+        instance = Session(MockConfig)
+        model = MockReplicatedModel(session=instance)
+        instance.router.state('replica1').latency = 0.1
+        instance.router.state('replica2').latency = 0.2
+
+        self.assertEqual(instance.read_server(model), 'replica1')
+        self.assertEqual(instance.write_server(model), 'main')
+
+        instance.execute('main', 'CREATE TABLE test (id INTEGER)')
+        self.assertEqual(instance.read_server(model), 'main')
+
+        instance.commit()
+        self.assertEqual(instance.read_server(model), 'replica1')
+
+
+class CurrentSessionTestCase(unittest.TestCase):
+    def tearDown(self):
+        session.default_session = None
+
+    def test_use(self):
+        default = Session(MockConfig, default=True)
+        other = Session(MockConfig)
+
+        self.assertEqual(session.current_session(), default)
+        with other.use():
+            self.assertEqual(session.current_session(), other)
+            self.assertEqual(Model().session, other)
+
+            with default.use():
+                self.assertEqual(Model().session, default)
+
+            self.assertEqual(Model().session, other)
+            model = Model()
+
+        self.assertEqual(session.current_session(), default)
+
+        # Models keep the session that was current when they were created.
+        self.assertEqual(model.session, other)
+        self.assertEqual(model.clone().session, other)
+
+    def test_use_per_thread(self):
+        instance = Session(MockConfig)
+        seen = []
+
+        def worker():
+            seen.append(session.current_session())
+
+        with instance.use():
+            thread = threading.Thread(target=worker)
+            thread.start()
+            thread.join()
+
+            self.assertEqual(session.current_session(), instance)
+
+        self.assertEqual(seen, [None])
@@ -0,0 +1,66 @@
+import logging
+import unittest
+
+from pyorm.column import Column as C
+from pyorm.dialect import Dialect, MySQLDialect
+from pyorm.field import Char
+from pyorm.model import Model
+from pyorm.session import Session
+from pyorm.test import helpers
+
+
+class MockConfig(helpers.MockConfig):
+    slow_query_threshold = 0
+
+
+class MockRedactedConfig(MockConfig):
+    slow_query_redact = True
+
+
+class MockNote(Model):
+    body = Char(length=20)
+
+
+class SlowQueryLogTestCase(unittest.TestCase):
+    def setUp(self):
+        logging.getLogger('pyorm.slow_queries').disabled = True
+
+    def tearDown(self):
+        logging.getLogger('pyorm.slow_queries').disabled = False
+
+    def session(self, config=MockConfig):
+        session = Session(config)
+        session.execute('main', 'CREATE TABLE mocknote (id INTEGER PRIMARY KEY, body TEXT)')
+        session.commit()
+        session.slow_queries.entries.clear()
+        return session
+
+    def test_explain(self):
+        self.assertEqual(Dialect().explain('SELECT 1'), 'EXPLAIN QUERY PLAN SELECT 1')
+        self.assertEqual(MySQLDialect().explain('SELECT 1'), 'EXPLAIN SELECT 1')
+
+    def test_entry(self):
+        session = self.session()
+        MockNote(session=session).filters(C.id == 1).get()
+
+        entry = session.slow_queries.entries[-1]
+        self.assertEqual((entry['model'], entry['server']), ('MockNote', 'main'))
+        self.assertEqual(entry['literals'], [1])
+        self.assertTrue('execute' in entry['phases'])
+        self.assertEqual(entry['call_site'][0], __file__.replace('.pyc', '.py'))
+        self.assertTrue('mocknote' in ' '.join(str(row) for row in entry['plan']))
+
+    def test_redact(self):
+        session = self.session(MockRedactedConfig)
+        session.execute('main', 'SELECT * FROM mocknote WHERE body = ?', ['secret'])
+
+        entry = session.slow_queries.entries[-1]
+        self.assertEqual(entry['literals'], None)
+        self.assertTrue(entry['plan'])
+
+    def test_threshold(self):
+        session = self.session()
+        session.slow_queries.threshold = 60
+        session.execute('main', 'SELECT 1')
+
+        self.assertEqual(len(session.slow_queries.entries), 0)
@@ -0,0 +1,79 @@
+import json
+import unittest
+
+from pyorm.events import QueryEvent
+from pyorm.field import Char
+from pyorm.model import Model
+from pyorm.session import Session
+from pyorm.stats import Histogram, QueryStats
+from pyorm.test import helpers
+
+
+class MockConfig(helpers.MockConfig):
+    collect_stats = True
+
+
+class MockTag(Model):
+    name = Char(length=20)
+
+    class Meta:
+        cache_ttl = 60
+
+
+class HistogramTestCase(unittest.TestCase):
+    def test_percentiles(self):
+        histogram = Histogram(precision=0.01)
+        for value in range(1, 101):
+            histogram.add(value / 1000.0)
+
+        self.assertEqual(histogram.count, 100)
+        self.assertAlmostEqual(histogram.mean, 0.0505)
+        self.assertAlmostEqual(histogram.percentile(50), 0.050, delta=0.0005)
+        self.assertAlmostEqual(histogram.percentile(99), 0.099, delta=0.001)
+        self.assertEqual(histogram.percentile(100), 0.1)
+        self.assertEqual(Histogram().percentile(99), 0.0)
+
+
+class QueryStatsTestCase(unittest.TestCase):
+    def event(self, sql, elapsed, rows=1, cached=False):
+        event = QueryEvent('Tag')
+        event.sql, event.rows, event.cached = sql, rows, cached
+        event.phases['execute'] = elapsed
+        return event
+
+    def test_grouped_by_fingerprint(self):
+        stats = QueryStats()
+        stats(self.event('SELECT * FROM tag WHERE id IN (?, ?)', 0.01, rows=2))
+        stats(self.event('SELECT * FROM tag WHERE id IN (?)', 0.03, cached=True))
+        stats(self.event('SELECT COUNT(*) FROM tag', 0.001))
+        stats(QueryEvent('Tag'))
+
+        snapshot = stats.snapshot()
+        self.assertEqual(len(snapshot), 2)
+        self.assertEqual(snapshot[0]['query'], 'SELECT * FROM tag WHERE id IN (...)')
+        self.assertEqual((snapshot[0]['calls'], snapshot[0]['rows']), (2, 3))
+        self.assertAlmostEqual(snapshot[0]['total_time'], 0.04)
+        self.assertEqual(snapshot[0]['cache_hit_ratio'], 0.5)
+
+        self.assertEqual(json.loads(stats.to_json())[1]['calls'], 1)
+        self.assertEqual(len(stats.to_text(limit=1).splitlines()), 2)
+
+        stats.reset()
+        self.assertEqual(len(stats), 0)
+
+    def test_session(self):
+        session = Session(MockConfig)
+        session.execute('main', 'CREATE TABLE mocktag (id INTEGER PRIMARY KEY, name TEXT)')
+        session.commit()
+
+        for i in range(3):
+            list(MockTag(session=session))
+
+        query = [query for query in session.stats.snapshot()
+                 if query['model'] == 'MockTag'][0]
+        self.assertEqual(query['calls'], 3)
+        self.assertAlmostEqual(query['cache_hit_ratio'], 2 / 3.0)
+
+        session.disable_stats()
+        self.assertFalse(session.instrumentation.enabled)
+        session.dispose()
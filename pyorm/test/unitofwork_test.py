@@ -0,0 +1,205 @@
+import unittest
+
+from pyorm.column import Column as C
+from pyorm.dialect import Dialect, MySQLDialect, PostgreSQLDialect
+from pyorm.field import Char, Integer
+from pyorm.model import Model
+from pyorm.relationship import OneToOne
+from pyorm.session import Session
+from pyorm.unitofwork import UnitOfWork
+from pyorm.test.helpers import SingleConnectionConfig
+
+
+class MockAuthor(Model):
+    name = Char(length=20)
+
+
+class MockBook(Model):
+    title = Char(length=20)
+    pages = Integer()
+    author = OneToOne(MockAuthor)
+
+
+class MockReview(Model):
+    book_id = Integer()
+    score = Integer()
+    book = OneToOne(MockBook, filter=[C.book_id == C.book.id])
+
+
+class DialectWriteTestCase(unittest.TestCase):
+    def test_insert(self):
+        self.assertEqual(Dialect().insert('book', ('title', 'pages')),
+                         'INSERT INTO "book" ("title", "pages") VALUES (?, ?)')
+        self.assertEqual(Dialect().insert('book', ('title',), 'ignore'),
+                         'INSERT OR IGNORE INTO "book" ("title") VALUES (?)')
+        self.assertEqual(MySQLDialect().insert('book', ('title',), 'replace'),
+                         'REPLACE INTO `book` (`title`) VALUES (%s)')
+        self.assertRaises(Exception, PostgreSQLDialect().insert, 'book',
+                          ('title',), 'replace')
+
+    def test_update(self):
+        self.assertEqual(Dialect().update('book', ('title', 'pages'), ('id',)),
+                         'UPDATE "book" SET "title" = ?, "pages" = ? WHERE "id" = ?')
+
+    def test_delete(self):
+        self.assertEqual(Dialect().delete('book', ('id', 'part')),
+                         'DELETE FROM "book" WHERE "id" = ? AND "part" = ?')
+
+    def test_truncate(self):
+        self.assertEqual(Dialect().truncate('book'), 'DELETE FROM "book"')
+        self.assertEqual(MySQLDialect().truncate('book'), 'TRUNCATE TABLE `book`')
+        self.assertEqual(PostgreSQLDialect().truncate('book'), 'TRUNCATE TABLE "book"')
+
+
+class UnitOfWorkOrderTestCase(unittest.TestCase):
+    def test_order(self):
+        unit_of_work = UnitOfWork()
+
+        self.assertEqual(unit_of_work.order([MockReview, MockBook, MockAuthor]),
+                         [MockAuthor, MockBook, MockReview])
+        self.assertEqual(unit_of_work.order([MockBook, MockReview]),
+                         [MockBook, MockReview])
+
+
+class UnitOfWorkTestCase(unittest.TestCase):
+    def setUp(self):
+        self.session = Session(SingleConnectionConfig)
+        for sql in ('CREATE TABLE mockauthor (id INTEGER PRIMARY KEY, name TEXT)',
+                    'CREATE TABLE mockbook (id INTEGER PRIMARY KEY, title TEXT, '
+                    'pages INTEGER, author_id INTEGER)',
+                    'CREATE TABLE mockreview (id INTEGER PRIMARY KEY, '
+                    'book_id INTEGER, score INTEGER)'):
+            self.session.execute('main', sql)
+        self.session.commit()
+
+        self.statements = []
+        run = self.session.run
+
+        def record(name, sql, literals=(), many=False, **kwargs):
+            self.statements.append((sql, len(literals) if many else None))
+            return run(name, sql, literals, many, **kwargs)
+
+        self.session.run = record
+
+    def tearDown(self):
+        self.session.rollback()
+        self.session.dispose()
+
+    def books(self):
+        return [(row.id, row.title, row.pages)
+                for row in MockBook(session=self.session).order(C.id)]
+
+    def test_batched_inserts(self):
+        MockBook(session=self.session).insert(
+            {'id': 1, 'title': 'one', 'author_id': 1},
+            {'id': 2, 'title': 'two', 'author_id': 2})
+        MockReview(session=self.session).insert(book_id=1, score=5)
+        MockAuthor(session=self.session).insert({'id': 1, 'name': 'a'},
+                                                {'id': 2, 'name': 'b'})
+        MockBook(session=self.session).insert(id=3, title='three', pages=10)
+
+        self.assertTrue(self.session.is_dirty)
+        self.assertEqual(self.session.flush(), 4)
+        self.assertEqual(self.statements, [
+            ('INSERT INTO "mockauthor" ("id", "name") VALUES (?, ?)', 2),
+            ('INSERT INTO "mockbook" ("id", "title", "author_id") VALUES (?, ?, ?)', 2),
+            ('INSERT INTO "mockbook" ("id", "title", "pages") VALUES (?, ?, ?)', 1),
+            ('INSERT INTO "mockreview" ("book_id", "score") VALUES (?, ?)', 1)])
+
+        self.assertEqual(self.books(), [(1, 'one', None), (2, 'two', None),
+                                        (3, 'three', 10)])
+
+    def test_insert_from_fields(self):
+        book = MockBook(session=self.session)
+        book.title = 'one'
+        book.insert()
+
+        self.assertRaises(Exception, book.insert)
+        self.assertRaises(Exception, book.insert, missing=1)
+        self.assertEqual(self.books(), [(1, 'one', None)])
+
+    def test_update_and_delete(self):
+        MockBook(session=self.session).insert(
+            {'id': 1, 'title': 'one'}, {'id': 2, 'title': 'two'},
+            {'id': 3, 'title': 'three'})
+        MockAuthor(session=self.session).insert(id=1, name='a')
+        self.session.commit()
+        del self.statements[:]
+
+        for row in MockBook(session=self.session).filters(C.id < 3):
+            row.update(pages=100)
+
+        book = MockBook(session=self.session).filters(C.id == 3).get()
+        book.title = 'tres'
+        book.update()
+        self.assertEqual(book.title, 'tres')
+
+        MockBook(session=self.session).filters(C.id == 1).delete()
+        MockAuthor(session=self.session).delete()
+        self.session.commit()
+
+        self.assertFalse(self.session.is_dirty)
+        self.assertEqual([statement for statement in self.statements
+                          if statement[1] is not None], [
+            ('UPDATE "mockbook" SET "pages" = ? WHERE "id" = ?', 2),
+            ('UPDATE "mockbook" SET "title" = ? WHERE "id" = ?', 1),
+            ('DELETE FROM "mockbook" WHERE "id" = ?', 1),
+            ('DELETE FROM "mockauthor" WHERE "id" = ?', 1)])
+        self.assertEqual(self.books(), [(2, 'two', 100), (3, 'tres', None)])
+
+    def test_rollback_drops_pending(self):
+        MockBook(session=self.session).insert(title='one')
+        self.session.rollback()
+
+        self.assertFalse(self.session.is_dirty)
+        self.assertEqual(self.session.flush(), 0)
+        self.assertEqual(self.books(), [])
+
+    def test_updates_in_order(self):
+        MockBook(session=self.session).insert(id=1, title='one')
+        self.session.commit()
+
+        book = MockBook(session=self.session).filters(C.id == 1).get()
+        book.update(pages=1)
+        book.update(pages=2, title='two')
+        book.update(pages=3)
+        self.session.commit()
+
+        self.assertEqual(self.books(), [(1, 'two', 3)])
+
+    def test_reload(self):
+        MockBook(session=self.session).insert(id=1, title='one')
+        self.session.commit()
+
+        book = MockBook(session=self.session).filters(C.id == 1).get()
+        self.assertEqual(book.title, 'one')
+
+        self.session.run('main', 'UPDATE mockbook SET title = ? WHERE id = ?',
+                         ('uno', 1))
+        self.session.commit()
+
+        # The values read from the first result set aren't kept.
+        book.get()
+        self.assertEqual(book.title, 'uno')
+
+    def test_delete_and_insert_again(self):
+        MockBook(session=self.session).insert(id=1, title='one')
+        self.session.commit()
+
+        MockBook(session=self.session).filters(C.id == 1).delete()
+        MockBook(session=self.session).insert(id=1, title='again')
+        self.session.commit()
+
+        self.assertEqual(self.books(), [(1, 'again', None)])
+
+    def test_batches_in_order(self):
+        MockBook(session=self.session).insert(
+            {'id': 1, 'title': 'one'}, {'id': 2, 'title': 'two'})
+        MockBook(session=self.session).insert(id=3, title='three', pages=1)
+        MockBook(session=self.session).insert(id=4, title='four')
+        self.session.flush()
+
+        self.assertEqual(self.statements, [
+            ('INSERT INTO "mockbook" ("id", "title") VALUES (?, ?)', 2),
+            ('INSERT INTO "mockbook" ("id", "title", "pages") VALUES (?, ?, ?)', 1),
+            ('INSERT INTO "mockbook" ("id", "title") VALUES (?, ?)', 1)])
@@ -41,4 +41,7 @@ OP_OPAR = 20
 OP_CPAR = 21
 OP_COMMA = 22
 
+OP_ASC = 23
+OP_DESC = 24
+
 Token = collections.namedtuple('Token', ('type', 'value'))
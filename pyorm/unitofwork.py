@@ -0,0 +1,199 @@
+import collections
+import threading
+
+
+# A single pending write.  `columns` are the columns being set (inserts and
+# updates), `keys` the columns used to find the row (updates and deletes),
+# and `values` the values for both, in that order.
+Write = collections.namedtuple(
+    'Write', ('action', 'model', 'server', 'table', 'columns', 'keys', 'values'))
+
+
+class UnitOfWork(object):
+    """
+        Collects the writes made through a session's models (see
+        Model.insert(), Model.update() and Model.delete()), until the session
+        is flushed (see Session.flush(), which is run before every commit and
+        every query).
+
+        When flushed, the writes to each table are run in the order they were
+        made, and writes made one after the other to the same table with the
+        same columns are sent to the server as a single executemany() call,
+        rather than one statement per row.  Writes to different tables are
+        run in the order they were made as well, except that rows referenced
+        by a relationship are inserted before the rows referencing them, and
+        deleted after them.
+    """
+    # The kinds of insert, `ignore` and `replace` are variations on an
+    # insert (see Dialect.insert()).
+    inserts = ('insert', 'ignore', 'replace')
+
+    def __init__(self):
+        self._pending = []
+        self._parents = {}
+        self._lock = threading.Lock()
+
+    def __len__(self):
+        return len(self._pending)
+
+    def register(self, model, action, columns, values, keys=()):
+        """
+            Adds a write to `model`'s table, to be run on the next flush.
+        """
+        write = Write(action, type(model), model.session.write_server(model),
+                      model.Meta.db_table, tuple(columns), tuple(keys),
+                      tuple(values))
+
+        with self._lock:
+            self._pending.append(write)
+
+    def clear(self):
+        """
+            Drops every pending write.
+        """
+        with self._lock:
+            self._pending = []
+
+    def parents(self, cls):
+        """
+            Returns the model classes `cls` holds references to through its
+            relationships, which need their rows inserted first, along with the
+            model classes holding references to `cls`.
+        """
+        if cls not in self._parents:
+            parents, children = set(), set()
+            instance = cls()
+
+            for relationship in vars(instance.r).values():
+                target = relationship.target
+                if target is cls:
+                    continue
+
+                local = set(key[0] for key in relationship.keys)
+                remote = set(key[1] for key in relationship.keys)
+
+                if remote and remote == set(target._primary_key):
+                    parents.add(target)
+                elif local and local == set(cls._primary_key):
+                    children.add(target)
+
+            self._parents[cls] = (parents, children)
+
+        return self._parents[cls]
+
+    def depends(self, classes):
+        """
+            Returns the classes among `classes` that each class references,
+            by class.
+        """
+        depends = dict((cls, set()) for cls in classes)
+
+        for cls in depends:
+            parents, children = self.parents(cls)
+
+            for parent in parents:
+                if parent in depends:
+                    depends[cls].add(parent)
+
+            for child in children:
+                if child in depends:
+                    depends[child].add(cls)
+
+        return depends
+
+    def order(self, classes):
+        """
+            Sorts the model classes passed so that every class comes after the
+            classes it references.  Classes that reference each other are
+            left in the order they were passed.
+        """
+        classes = list(classes)
+        depends = self.depends(classes)
+
+        ordered = []
+        while classes:
+            ready = [cls for cls in classes if not depends[cls] - set(ordered)]
+            if not ready:
+                ready = classes[:1]
+
+            for cls in ready:
+                ordered.append(cls)
+                classes.remove(cls)
+
+        return ordered
+
+    def batches(self, writes):
+        """
+            Yields (action, server, table, columns, keys, rows) for each group
+            of writes that can be sent as a single statement, in the order
+            they should be run (see UnitOfWork).
+        """
+        depends = self.depends(set(write.model for write in writes))
+        referenced = dict((cls, set()) for cls in depends)
+        for cls, parents in depends.items():
+            for parent in parents:
+                referenced[parent].add(cls)
+
+        queues = collections.OrderedDict()
+        pending = collections.Counter()
+
+        for idx, write in enumerate(writes):
+            queues.setdefault((write.server, write.table),
+                              collections.deque()).append((idx, write))
+            pending[write.model, write.action] += 1
+
+        def ready(write):
+            if write.action in self.inserts:
+                return not any(pending[parent, action]
+                               for parent in depends[write.model]
+                               for action in self.inserts)
+            elif write.action == 'delete':
+                return not any(pending[child, 'delete']
+                               for child in referenced[write.model])
+            return True
+
+        while queues:
+            heads = [queue[0] for queue in queues.values()]
+            idx, write = min([head for head in heads if ready(head[1])] or heads)
+
+            # The writes following it to the same table with the same columns
+            # are sent along with it.
+            shape = (write.action, write.columns, write.keys)
+            queue = queues[write.server, write.table]
+            rows = []
+            while queue and (queue[0][1].action, queue[0][1].columns,
+                             queue[0][1].keys) == shape:
+                rows.append(queue.popleft()[1].values)
+                pending[write.model, write.action] -= 1
+
+            if not queue:
+                del queues[write.server, write.table]
+
+            yield (write.action, write.server, write.table, write.columns,
+                   write.keys, rows)
+
+    def flush(self, session):
+        """
+            Runs every pending write on `session`, returning the number of
+            statements sent.  If one of the writes fails, the rest are
+            dropped, and the session should be rolled back.
+        """
+        with self._lock:
+            writes, self._pending = self._pending, []
+
+        statements = 0
+
+        for action, server, table, columns, keys, rows in self.batches(writes):
+            dialect = session.dialect(server)
+
+            if action == 'update':
+                sql = dialect.update(table, columns, keys)
+            elif action == 'delete':
+                sql = dialect.delete(table, keys)
+            else:
+                sql = dialect.insert(table, columns, action)
+
+            session.execute_many(server, sql, rows)
+            statements += 1
+
+        return statements